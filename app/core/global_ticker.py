@@ -1,27 +1,137 @@
 import asyncio
+import inspect
 import time
+from app.core.metrics import profiler
 
 class GlobalTicker:
-    def __init__(self, fps=30):
+    """
+    모든 게임 세션(SoloGameSession, session_manager.GameSession 등)을 구동하는 단일 스케줄러.
+    - 드리프트 보정: sleep 길이를 '다음 틱 예정 시각(deadline)' 기준으로 계산
+    - 오버런 감지: 틱이 예정 시각을 넘기면 카운트/로그 후 밀린 틱은 건너뜀 (몰아서 실행 X)
+    - 예산 기반 분할: 한 틱의 처리 시간이 budget을 넘으면 남은 세션은 다음 틱으로 미룸
+      (라운드로빈 커서로 순서를 돌려서 특정 세션만 계속 밀리지 않게 함)
+    - 세션별 상한: update() 한 번이 session_budget을 넘긴 세션은 그 세션의 오버런으로 기록하고
+      다음 틱 한 번만 그 세션을 건너뜀 (느린 세션 하나 때문에 다른 세션들이 밀리지 않게)
+    세션은 update()만 구현하면 되며, 동기/비동기 모두 지원합니다.
+    update()가 값을 반환하면 구독 시 등록한 sink(state)로 전달됩니다 (예: 브로드캐스트).
+    샘플링된 틱은 tick / update / broadcast 구간 시간을 metrics.profiler에 기록합니다.
+    """
+    def __init__(self, fps=30, budget_ratio=0.8, session_budget_ratio=0.25):
         self.interval = 1 / fps
-        self.sessions = []
+        self.budget = self.interval * budget_ratio
+        self.session_budget = self.interval * session_budget_ratio
+        self.sessions = {} # session -> sink (등록 순서 유지)
+        self.session_overruns = {} # session -> 세션별 상한을 넘긴 횟수
+        self._benched = set() # 지난 틱에 상한을 넘겨 이번 틱을 건너뛸 세션
+        self._last_session_overrun_log = 0.0
+        self._cursor = 0
+        self._last_overrun_log = 0.0
+        self.stats = {
+            "ticks": 0,
+            "overruns": 0,          # 예정 시각을 넘긴 틱 수
+            "skipped_ticks": 0,     # 오버런으로 건너뛴 틱 수
+            "deferred_updates": 0,  # 예산 초과로 다음 틱으로 미룬 세션 업데이트 수
+            "session_overruns": 0,  # 세션별 상한을 넘긴 update() 수 (다음 틱에 그 세션만 건너뜀)
+            "errors": 0,
+            "last_tick_ms": 0.0,
+            "max_tick_ms": 0.0,
+        }
 
-    def subscribe(self, session):
+    def subscribe(self, session, sink=None):
         if session not in self.sessions:
-            self.sessions.append(session)
+            self.sessions[session] = sink
 
     def unsubscribe(self, session):
-        if session in self.sessions:
-            self.sessions.remove(session)
+        self.sessions.pop(session, None)
+        self.session_overruns.pop(session, None)
+        self._benched.discard(session)
+
+    def get_stats(self):
+        return {**self.stats, "sessions": len(self.sessions), "slow_sessions": len(self.session_overruns),
+                "interval_ms": self.interval * 1000, "session_budget_ms": self.session_budget * 1000}
+
+    def _session_overrun(self, session, elapsed: float):
+        """세션별 상한 초과 기록 + 다음 틱 한 번 건너뛰도록 표시"""
+        self.session_overruns[session] = self.session_overruns.get(session, 0) + 1
+        self.stats["session_overruns"] += 1
+        self._benched.add(session)
+        now = time.perf_counter()
+        if now - self._last_session_overrun_log >= 1.0:
+            self._last_session_overrun_log = now
+            print(f"⚠️ Session update overrun: {getattr(session, 'game_id', session)} took {elapsed * 1000:.1f}ms "
+                  f"(cap {self.session_budget * 1000:.1f}ms, overruns={self.session_overruns[session]})")
+
+    async def _update_session(self, session, sink):
+        try:
+            sampled = profiler.active
+            if sampled: started = time.perf_counter()
+            result = session.update()
+            if inspect.isawaitable(result):
+                result = await result
+            if sampled:
+                updated = time.perf_counter()
+                profiler.observe("update", updated - started)
+            if result is not None and sink:
+                sent = sink(result)
+                if inspect.isawaitable(sent):
+                    await sent
+                if sampled: profiler.observe("broadcast", time.perf_counter() - updated)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Error in session update: {e}")
+
+    async def run_tick(self):
+        """한 틱 실행. 예산을 넘기면 남은 세션은 다음 틱에 커서 위치부터 이어서 처리"""
+        tick_start = time.perf_counter()
+        sampled = profiler.sample()
+        entries = list(self.sessions.items())
+        count = len(entries)
+        if count:
+            start = self._cursor % count
+            processed = 0
+            for i in range(count):
+                # 최소 1개는 처리해야 진행이 보장됨
+                if processed and time.perf_counter() - tick_start > self.budget:
+                    self.stats["deferred_updates"] += count - processed
+                    break
+                session, sink = entries[(start + i) % count]
+                processed += 1
+                if session in self._benched:
+                    self._benched.discard(session)
+                    self.stats["deferred_updates"] += 1
+                    continue
+                started = time.perf_counter()
+                await self._update_session(session, sink)
+                elapsed = time.perf_counter() - started
+                if elapsed > self.session_budget:
+                    self._session_overrun(session, elapsed)
+            self._cursor = (start + processed) % count
+
+        elapsed = time.perf_counter() - tick_start
+        if sampled: profiler.observe("tick", elapsed)
+        elapsed_ms = elapsed * 1000
+        self.stats["ticks"] += 1
+        self.stats["last_tick_ms"] = elapsed_ms
+        self.stats["max_tick_ms"] = max(self.stats["max_tick_ms"], elapsed_ms)
 
     async def start(self):
         print(f"💓 Global Ticker 가동: {1/self.interval}Hz")
+        next_deadline = time.perf_counter()
         while True:
-            start_time = time.perf_counter()
-            if self.sessions:
-                await asyncio.gather(*(s.update() for s in self.sessions))
-            
-            elapsed = time.perf_counter() - start_time
-            await asyncio.sleep(max(0, self.interval - elapsed))
-
-ticker = GlobalTicker()
\ No newline at end of file
+            await self.run_tick()
+
+            next_deadline += self.interval
+            now = time.perf_counter()
+            if now > next_deadline:
+                # 오버런: 밀린 틱은 몰아서 돌리지 않고 현재 시각 기준으로 재정렬
+                missed = int((now - next_deadline) / self.interval)
+                self.stats["overruns"] += 1
+                self.stats["skipped_ticks"] += missed
+                if now - self._last_overrun_log >= 1.0:
+                    self._last_overrun_log = now
+                    print(f"⚠️ Tick overrun: {(now - next_deadline) * 1000:.1f}ms late "
+                          f"(sessions={len(self.sessions)}, total_overruns={self.stats['overruns']})")
+                next_deadline = now
+            await asyncio.sleep(max(0, next_deadline - now))
+
+ticker = GlobalTicker()
@@ -0,0 +1,145 @@
+# app/core/metrics.py
+import os
+import time
+import random
+
+# -------------------------------------------------------------------------
+# 구간별 틱 프로파일러 + Prometheus 텍스트 형식 출력
+# -------------------------------------------------------------------------
+# - RollingHistogram: 누적 버킷(Prometheus histogram) + 최근 window초 링 버퍼(분위수 추정)
+# - PhaseProfiler: PhaseTimer와 같은 begin()/mark(phase) 인터페이스로 구간별 히스토그램에 기록
+#     GlobalTicker가 틱마다 sample()로 이번 틱을 측정할지 정함 (sample_rate, 런타임 변경 가능)
+#     측정하지 않는 틱의 begin/mark는 플래그 확인만 하고 반환
+# - render_*(): /metrics 엔드포인트용 텍스트 (text/plain; version=0.0.4)
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("DICE_PROFILE_SAMPLE_RATE", "0.1"))
+
+# 초 단위 버킷 (50us ~ 100ms, 틱 예산 33ms 전후를 촘촘하게)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1)
+
+class RollingHistogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, window: float = 60.0, slots: int = 6):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # 시작 이후 누적 (마지막 = +Inf)
+        self.sum = 0.0
+        self.count = 0
+        self.slot_len = window / slots
+        self.ring = [[0] * (len(buckets) + 1) for _ in range(slots)] # 최근 window초 (slot_len초씩)
+        self.ring_epoch = [-1] * slots
+
+    def _bucket(self, value: float) -> int:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound: return i
+        return len(self.buckets)
+
+    def observe(self, value: float, now: float = None):
+        b = self._bucket(value)
+        self.counts[b] += 1
+        self.sum += value
+        self.count += 1
+        epoch = int((now if now is not None else time.monotonic()) / self.slot_len)
+        slot = epoch % len(self.ring)
+        if self.ring_epoch[slot] != epoch: # 오래된 칸 재사용
+            self.ring[slot] = [0] * (len(self.buckets) + 1)
+            self.ring_epoch[slot] = epoch
+        self.ring[slot][b] += 1
+
+    def window_counts(self, now: float = None) -> list:
+        epoch = int((now if now is not None else time.monotonic()) / self.slot_len)
+        total = [0] * (len(self.buckets) + 1)
+        for slot_epoch, counts in zip(self.ring_epoch, self.ring):
+            if 0 <= epoch - slot_epoch < len(self.ring):
+                for i, c in enumerate(counts): total[i] += c
+        return total
+
+    def quantile(self, q: float, now: float = None) -> float:
+        """최근 window초 분위수 (해당 버킷의 상한값, 데이터 없으면 0)"""
+        counts = self.window_counts(now)
+        n = sum(counts)
+        if n == 0: return 0.0
+        rank, seen = q * n, 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+class PhaseProfiler:
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.phases = {} # phase -> RollingHistogram
+        self.sample_rate = 0.0
+        self.set_sample_rate(sample_rate)
+        self.active = False # 이번 틱 측정 여부
+        self.sampled_ticks = 0
+        self._last = 0.0
+        self._rng = random.Random()
+
+    def set_sample_rate(self, rate: float):
+        self.sample_rate = min(1.0, max(0.0, float(rate)))
+
+    def sample(self) -> bool:
+        """틱 시작 시 호출: 이번 틱을 측정할지 결정"""
+        rate = self.sample_rate
+        self.active = rate >= 1.0 or (rate > 0.0 and self._rng.random() < rate)
+        if self.active: self.sampled_ticks += 1
+        return self.active
+
+    def observe(self, phase: str, seconds: float):
+        hist = self.phases.get(phase)
+        if hist is None:
+            hist = self.phases[phase] = RollingHistogram()
+        hist.observe(seconds)
+
+    # PhaseTimer 호환 인터페이스 (SoloGameSession.phase_timer)
+    def begin(self):
+        if self.active: self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        if not self.active: return
+        now = time.perf_counter()
+        self.observe(phase, now - self._last)
+        self._last = now
+
+    def get_stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "sampled_ticks": self.sampled_ticks,
+            "phases": {
+                phase: {"count": h.count, "mean_us": round(h.sum / h.count * 1e6, 2) if h.count else 0.0,
+                        "p50_us": round(h.quantile(0.5) * 1e6, 1), "p99_us": round(h.quantile(0.99) * 1e6, 1)}
+                for phase, h in self.phases.items()
+            },
+        }
+
+profiler = PhaseProfiler()
+
+# -------------------------------------------------------------
+# Prometheus 텍스트 형식
+# -------------------------------------------------------------
+def _labels(labels: dict) -> str:
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+def _num(value) -> str:
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metric(name: str, kind: str, help_text: str, samples: list) -> str:
+    """samples: [(labels dict, value)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {_num(value)}")
+    return "\n".join(lines)
+
+def render_histograms(name: str, help_text: str, histograms: dict, label: str) -> str:
+    """{label 값: RollingHistogram} -> histogram 메트릭 + 최근 window 분위수 gauge"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, h in histograms.items():
+        cumulative = 0
+        for bound, c in zip(h.buckets + (float("inf"),), h.counts):
+            cumulative += c
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{_num(bound)}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {_num(h.sum)}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {h.count}')
+    quantiles = [({label: key, "quantile": q}, h.quantile(float(q))) for key, h in histograms.items() for q in ("0.5", "0.99")]
+    return "\n".join(lines) + "\n" + render_metric(f"{name}_recent", "gauge", f"{help_text} (recent window quantiles)", quantiles)
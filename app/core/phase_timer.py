@@ -0,0 +1,41 @@
+# app/core/phase_timer.py
+import time
+
+# -------------------------------------------------------------------------
+# 구간별 시간 측정 (Phase Timer)
+# -------------------------------------------------------------------------
+# 게임 루프 한 스텝을 여러 구간(phase)으로 나눠 누적 시간을 잽니다.
+#   timer.begin()  -> 측정 시작
+#   timer.mark(p)  -> 직전 begin/mark부터 지금까지를 구간 p에 누적
+# 여러 세션이 하나의 PhaseTimer를 공유하면 전체 합계가 됩니다.
+# 측정하지 않을 때는 세션의 phase_timer가 None이라 비용이 없습니다.
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = {} # phase -> 누적 초
+        self.counts = {} # phase -> 측정 횟수
+        self._last = None
+
+    def begin(self):
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.totals[phase] = self.totals.get(phase, 0.0) + (now - self._last)
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        self._last = now
+
+    def reset(self):
+        self.totals.clear()
+        self.counts.clear()
+
+    def report(self) -> dict:
+        total = sum(self.totals.values()) or 1.0
+        return {
+            phase: {
+                "total_ms": round(seconds * 1000, 3),
+                "mean_us": round(seconds / self.counts[phase] * 1e6, 2),
+                "share": round(seconds / total, 4),
+            }
+            for phase, seconds in self.totals.items()
+        }
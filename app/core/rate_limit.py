@@ -0,0 +1,23 @@
+# app/core/rate_limit.py
+import time
+
+class TokenBucket:
+    """
+    토큰 버킷 속도 제한.
+    초당 rate개씩 최대 burst개까지 토큰이 차오르고, 요청 1개당 토큰 1개를 씁니다.
+    """
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def take(self, n: int = 1) -> int:
+        """n개 요청 중 허용되는 개수 (앞에서부터)"""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        allowed = min(n, int(self.tokens))
+        self.tokens -= allowed
+        return allowed
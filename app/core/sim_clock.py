@@ -0,0 +1,29 @@
+# app/core/sim_clock.py
+import time
+
+# -------------------------------------------------------------------------
+# 시뮬레이션 시계 (Time Source)
+# -------------------------------------------------------------------------
+# 게임 세션은 time.time()을 직접 호출하지 않고 clock.now()만 사용합니다.
+# 실서버에서는 MonotonicClock(벽시계), 테스트/벤치마크에서는 VirtualClock을
+# 주입하면 실제 시간보다 빠르게 시뮬레이션을 돌릴 수 있습니다.
+
+class MonotonicClock:
+    """실제 시간 기반 시계 (시스템 시간 변경에 영향받지 않는 monotonic 사용)"""
+    def now(self) -> float:
+        return time.monotonic()
+
+class VirtualClock:
+    """수동으로 진행시키는 가상 시계 (테스트, 헤드리스 시뮬레이션용)"""
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        self._now += seconds
+        return self._now
+
+# 기본 시계 (세션 생성 시 clock을 지정하지 않으면 사용)
+default_clock = MonotonicClock()
@@ -0,0 +1,40 @@
+# app/core/timer_wheel.py
+
+# -------------------------------------------------------------------------
+# 타이밍 휠 (Timing Wheel)
+# -------------------------------------------------------------------------
+# 정수 틱 단위 예약 큐. 틱 t에 예약된 항목은 slots[t % size]에 들어가므로
+# pop_due(t)는 해당 슬롯 하나만 확인합니다 (전체 예약을 훑지 않음).
+# 한 바퀴(size 틱) 이상 뒤의 예약은 같은 슬롯에 남아 있다가 도래할 때 꺼내집니다.
+# pop_due는 틱마다 빠짐없이 순서대로 호출해야 합니다.
+
+WHEEL_SIZE = 256
+
+class TimerWheel:
+    def __init__(self, size: int = WHEEL_SIZE):
+        self.size = size
+        self.slots = [[] for _ in range(size)]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, tick: int, item):
+        self.slots[tick % self.size].append((tick, item))
+        self.count += 1
+
+    def pop_due(self, tick: int) -> list:
+        """tick 이전에 도래한 항목을 예약 순서대로 꺼냄"""
+        slot = self.slots[tick % self.size]
+        if not slot: return []
+        due = [item for t, item in slot if t <= tick]
+        if len(due) != len(slot):
+            self.slots[tick % self.size] = [(t, item) for t, item in slot if t > tick]
+        else:
+            slot.clear()
+        self.count -= len(due)
+        return due
+
+    def items(self) -> list:
+        """남은 예약 전체 [(tick, item)] (틱 순서)"""
+        return sorted((entry for slot in self.slots for entry in slot), key=lambda e: e[0])
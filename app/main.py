@@ -1,46 +1,21 @@
 # app/main.py
 import asyncio
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.services.auth.auth_api import router as auth_router
 from app.services.dice_defense.dice_rest_api import router as dice_router, active_games
 from app.services.dice_defense.connection_manager import manager
+from app.services.dice_defense.shard_pool import shard_pool
+from app.services.dice_defense.session_lifecycle import lifecycle
+from app.services.dice_defense.lockstep import build_resync
+from app.services.dice_defense.modes.solo.game import SYNC_LOCKSTEP
 from app.services.mail.mail_api import router as mail_router
 from app.core.database import init_db
-
-# -------------------------------------------------------------------------
-# Global Game Loop (30Hz Ticker)
-# -------------------------------------------------------------------------
-async def game_loop():
-    """
-    서버 메모리에 존재하는 모든 활성 게임 세션(active_games)을 
-    1초에 30번(30Hz) 업데이트하고 상태를 브로드캐스팅합니다.
-    """
-    while True:
-        try:
-            # 딕셔너리 크기가 루프 도중 변경될 수 있으므로 키를 리스트로 복사하여 순회
-            game_ids = list(active_games.keys())
-            
-            for gid in game_ids:
-                session = active_games.get(gid)
-                if not session:
-                    continue
-                
-                # 1. 게임 로직 업데이트 (SP 회복, 몹 이동, 충돌 처리 등)
-                state_update = session.update()
-                
-                # 2. 변경된 상태가 있다면 해당 방의 클라이언트들에게 전송
-                # (최적화를 위해 매 틱마다 보내지 않고, 중요 이벤트나 일정 간격마다 보낼 수도 있음)
-                if state_update:
-                    await manager.broadcast(gid, state_update)
-                    
-        except Exception as e:
-            print(f"Error in global game loop: {e}")
-            
-        # 30Hz 유지를 위한 대기 (약 0.033초)
-        await asyncio.sleep(1/30)
+from app.core.global_ticker import ticker
+from app.core.metrics import profiler, render_metric, render_histograms
 
 # -------------------------------------------------------------------------
 # Lifespan Context Manager
@@ -51,19 +26,32 @@ async def lifespan(app: FastAPI):
     print(">>> Server Starting... Initializing Database...")
     init_db() # DB 테이블 생성
     
+    # 시뮬레이션 워커 프로세스 시작 (DICE_SIM_WORKERS > 0 인 경우에만)
+    shard_pool.start()
+    
     # 게임 루프 백그라운드 태스크 시작
-    game_loop_task = asyncio.create_task(game_loop())
+    # (SoloGameSession, session_manager 세션 모두 GlobalTicker 하나가 구동)
+    game_loop_task = asyncio.create_task(ticker.start())
     print(">>> Global Game Loop Started (30Hz)")
     
+    # 방치/종료된 세션 정리 태스크
+    reaper_task = asyncio.create_task(lifecycle.run())
+    # 소켓 하트비트 (응답 없는 연결 정리)
+    heartbeat_task = asyncio.create_task(manager.run_heartbeat())
+    
     yield
     
     # [Shutdown]
     print(">>> Server Shutting down...")
     game_loop_task.cancel() # 루프 종료
-    try:
-        await game_loop_task
-    except asyncio.CancelledError:
-        pass
+    reaper_task.cancel()
+    heartbeat_task.cancel()
+    for task in (game_loop_task, reaper_task, heartbeat_task):
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    shard_pool.stop()
     print(">>> Game Loop Stopped.")
 
 # -------------------------------------------------------------------------
@@ -89,47 +77,149 @@ app.include_router(mail_router, prefix="/api/mail", tags=["Mail"])
 # -------------------------------------------------------------------------
 # WebSocket Endpoint
 # -------------------------------------------------------------------------
-@app.websocket("/ws/game/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str):
+async def serve_game_socket(websocket: WebSocket, game_id: str, spectator: bool = False):
     """
-    클라이언트가 게임 세션에 접속할 때 연결되는 웹소켓 엔드포인트.
+    플레이어/관전자 공통 소켓 처리.
     1. 연결 수락 및 ConnectionManager에 등록
     2. 초기 게임 상태 전송
-    3. 클라이언트 입력(Spawn, Merge 등) 수신 및 처리
+    3. 클라이언트 입력(Spawn, Merge 등) 수신 -> 속도 제한 후 세션 입력 큐에 넣음 (관전자는 프로토콜 제어 메시지만)
+       입력은 명령 1개(dict) 또는 여러 개의 배열(list)로 보낼 수 있음
     4. 연결 종료 처리
     """
-    # 게임 세션 존재 확인
-    if game_id not in active_games:
+    # 게임 세션 존재 확인 (메모리에 없으면 휴면 스냅샷에서 복원 시도)
+    if game_id not in active_games and not lifecycle.restore(game_id):
         await websocket.close(code=4004, reason="Game session not found")
         return
 
     session = active_games[game_id]
     
-    # 연결 수락
-    await manager.connect(game_id, websocket)
+    # 연결 수락 (소켓별 프로토콜 협상)
+    # ?delta=1 -> 델타 인코딩된 STATE_DELTA, ?proto=bin -> 바이너리 STATE 프레임
+    use_delta = websocket.query_params.get("delta") == "1"
+    use_binary = websocket.query_params.get("proto") == "bin"
+    await manager.connect(game_id, websocket, delta=use_delta, binary=use_binary, spectator=spectator)
+    lifecycle.on_protocols(game_id)
+    # 정지 상태였다면 재개 (관전자는 재개하지 않음: 플레이어가 없는 동안 목숨이 깎이지 않도록 INIT만 받음)
+    if not spectator:
+        lifecycle.on_attach(game_id)
     
     try:
-        # 접속 성공 시 초기 전체 상태(INIT) 전송
-        await websocket.send_json(session.get_initial_state())
+        # 접속 성공 시 초기 전체 상태(INIT) 전송 (송신 큐 경유)
+        init_state = session.get_initial_state()
+        if spectator:
+            init_state = {**init_state, "spectator": True}
+        manager.send_personal(game_id, websocket, init_state)
+        # 락스텝 세션: 이후 입력만 받아 직접 시뮬레이션하도록 현재 전체 상태 전송
+        lockstep = getattr(session, "sync_mode", None) == SYNC_LOCKSTEP
+        if lockstep:
+            manager.send_personal(game_id, websocket, await build_resync(session))
         
         # 클라이언트 메시지 수신 루프
         while True:
             data = await websocket.receive_json()
+            manager.touch(game_id, websocket) # 어떤 메시지든 살아있다는 신호
+            
+            # 하트비트 응답 / 델타 프로토콜 제어 메시지
+            mtype = data.get("type") if isinstance(data, dict) else None
+            if mtype == "PONG":
+                continue
+            if mtype == "ACK":
+                manager.ack(game_id, websocket, data.get("seq"))
+                continue
+            if mtype == "RESYNC":
+                if not lockstep:
+                    manager.request_keyframe(game_id, websocket)
+                elif manager.admit_resync(game_id, websocket): # 상태 해시 불일치 -> 전체 상태 재전송
+                    manager.send_personal(game_id, websocket, await build_resync(session))
+                continue
             
-            # 입력 처리 (게임 세션 내부 로직 호출)
-            session.process_command(data)
+            # 관전자는 읽기 전용 (게임 입력 무시)
+            if spectator:
+                continue
             
-            # 참고: 상태 업데이트는 game_loop에서 주기적으로 브로드캐스트되므로
-            # 여기서는 입력을 처리하고 상태값만 변경해두면 됩니다.
+            # 입력은 바로 적용하지 않고 세션 입력 큐에 넣음 -> 다음 틱 시작 시 일괄 적용
+            # (상태 업데이트는 GlobalTicker에서 주기적으로 브로드캐스트)
+            commands = data if isinstance(data, list) else [data]
+            for command in manager.admit_commands(game_id, websocket, commands):
+                if isinstance(command, dict):
+                    session.enqueue(command)
             
     except WebSocketDisconnect:
         print(f"Client disconnected from game {game_id}")
-        manager.disconnect(game_id, websocket)
-        # 플레이어가 나갔을 때의 로직 (게임 일시정지, 패배 처리 등) 추가 가능
     except Exception as e:
         print(f"WebSocket Error: {e}")
+    finally:
         manager.disconnect(game_id, websocket)
+        lifecycle.on_protocols(game_id)
+        # 남은 소켓이 없으면 세션 일시정지 (틱 비용 0, IDLE_TTL 후 정리)
+        lifecycle.on_detach(game_id)
+
+@app.websocket("/ws/game/{game_id}")
+async def websocket_endpoint(websocket: WebSocket, game_id: str):
+    """클라이언트가 게임 세션에 접속할 때 연결되는 웹소켓 엔드포인트"""
+    await serve_game_socket(websocket, game_id)
+
+@app.websocket("/ws/spectate/{game_id}")
+async def spectate_endpoint(websocket: WebSocket, game_id: str):
+    """진행 중인 게임을 읽기 전용으로 관전하는 웹소켓 엔드포인트 (같은 프레임을 공유하므로 관전자당 비용이 작음)"""
+    await serve_game_socket(websocket, game_id, spectator=True)
 
 @app.get("/")
 def read_root():
-    return {"message": "Playground V3 API is running!"}
\ No newline at end of file
+    return {"message": "Playground V3 API is running!"}
+
+@app.get("/debug/connections")
+def connection_stats():
+    """게임별 / 소켓별 송신 큐 깊이와 폐기된 프레임 수, 살아있는 / 강제 정리된 연결 수"""
+    return {**manager.get_summary(), "games": manager.get_stats()}
+
+@app.get("/debug/sessions")
+def session_stats():
+    """상태별(running/paused/finished) 게임 세션 수"""
+    return lifecycle.get_stats()
+
+@app.get("/debug/profiler")
+def profiler_stats():
+    """구간별 틱 시간 요약 (최근 window 분위수)"""
+    return profiler.get_stats()
+
+@app.post("/debug/profiler")
+def set_profiler(payload: dict = Body(...)):
+    """틱 샘플링 비율 변경 (0 = 끔, 1 = 모든 틱)"""
+    profiler.set_sample_rate(payload.get("sample_rate", profiler.sample_rate))
+    return {"sample_rate": profiler.sample_rate}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 텍스트 형식 메트릭 (구간별 틱 히스토그램, 세션/엔티티/투사체 수, 오버런)"""
+    tick = ticker.get_stats()
+    sessions = lifecycle.get_stats()
+    load = lifecycle.get_load()
+    conns = [c for conns in manager.get_stats().values() for c in conns]
+    blocks = [
+        render_histograms("dice_phase_seconds", "Time spent per tick phase (sampled ticks)", profiler.phases, "phase"),
+        render_metric("dice_profiler_sample_rate", "gauge", "Fraction of ticks profiled", [({}, profiler.sample_rate)]),
+        render_metric("dice_ticks_total", "counter", "Global ticks run", [({}, tick["ticks"])]),
+        render_metric("dice_tick_overruns_total", "counter", "Ticks that missed their deadline", [({}, tick["overruns"])]),
+        render_metric("dice_tick_skipped_total", "counter", "Ticks skipped after overruns", [({}, tick["skipped_ticks"])]),
+        render_metric("dice_tick_deferred_updates_total", "counter", "Session updates deferred by the tick budget", [({}, tick["deferred_updates"])]),
+        render_metric("dice_tick_session_overruns_total", "counter", "Session updates that exceeded the per-session cap", [({}, tick["session_overruns"])]),
+        render_metric("dice_tick_errors_total", "counter", "Session update errors", [({}, tick["errors"])]),
+        render_metric("dice_ticker_sessions", "gauge", "Sessions subscribed to the global ticker", [({}, tick["sessions"])]),
+        render_metric("dice_sessions", "gauge", "Game sessions in memory by status",
+                      [({"status": k}, v) for k, v in sessions.items() if not k.endswith("_total")]),
+        render_metric("dice_sessions_hibernated_total", "counter", "Sessions hibernated to disk", [({}, sessions["hibernated_total"])]),
+        render_metric("dice_sessions_restored_total", "counter", "Sessions restored from disk", [({}, sessions["restored_total"])]),
+        render_metric("dice_sessions_failed_total", "counter", "Sessions lost to a crashed simulation worker", [({}, sessions["failed_total"])]),
+        render_metric("dice_entities", "gauge", "Live entities across sessions", [({}, load["entities"])]),
+        render_metric("dice_projectiles", "gauge", "Live projectiles across sessions", [({}, load["projectiles"])]),
+        render_metric("dice_session_commands", "gauge", "Client commands by result across sessions in memory",
+                      [({"result": k}, v) for k, v in load["commands"].items()]),
+        render_metric("dice_commands_rate_limited_total", "counter", "Client commands dropped by the per-socket token bucket",
+                      [({}, manager.rate_limited_total)]),
+        render_metric("dice_connections", "gauge", "Open game sockets", [({}, len(conns))]),
+        render_metric("dice_connections_reaped_total", "counter", "Sockets evicted by the server",
+                      [({"reason": k}, v) for k, v in manager.reaped.items()]),
+        render_metric("dice_send_queue_depth", "gauge", "Queued frames across sockets", [({}, sum(c["queue_depth"] for c in conns))]),
+    ]
+    return "\n".join(blocks) + "\n"
\ No newline at end of file
@@ -0,0 +1,183 @@
+# app/services/dice_defense/balance_sim.py
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from app.services.dice_defense.dice import DICE_CLASS_MAP
+from app.services.dice_defense.game_data import WAVE_TABLES
+from app.services.dice_defense.headless import ScriptedPlayer, SPAWN_POLICIES, MERGE_POLICIES
+from app.services.dice_defense.modes.solo.game import SoloGameSession, SIM_FPS, FIXED_DT, STATUS_FINISHED
+
+# -------------------------------------------------------------------------
+# 몬테카를로 밸런스 시뮬레이터
+# -------------------------------------------------------------------------
+# 덱 x 클래스 레벨 x 봇 전략 조합마다 헤드리스 솔로 게임을 runs판씩 프로세스 풀에서 돌리고
+# 주사위별 DPS, 생존 시간/웨이브, SP 곡선을 집계해서 CSV로 저장합니다.
+#   python -m app.services.dice_defense.balance_sim --deck-size 3 --class-levels 1,5,10 --runs 50 --out balance/
+# - 게임 1판 = 작업 1개 (시드 = seed + run 번호, 같은 설정이면 항상 같은 결과)
+# - 네트워크 직렬화 없이 _step()만 돌리므로 실시간보다 수백 배 빠름
+# - 결과 파일 (long format, 스프레드시트/pandas에서 바로 피벗 가능)
+#     summary.csv   조합별 판 수, 평균 생존 시간/웨이브, 게임 오버 비율
+#     dice_dps.csv  조합별 주사위 DPS (초과 데미지 제외, 독 지속 데미지 포함)
+#     sp_curve.csv  조합별 SP_SAMPLE_INTERVAL초 간격 평균 SP
+
+MAX_SECONDS = 300        # 한 판 최대 게임 시간 (이때까지 버티면 생존으로 집계)
+SP_SAMPLE_INTERVAL = 10  # SP 곡선 샘플 간격 (초)
+DEFAULT_STRATEGIES = ("greedy/greedy", "greedy/none")
+
+def simulable_dice() -> list:
+    """전투 로직이 구현된 주사위 (DICE_DATA 중 DICE_CLASS_MAP에 있는 것)"""
+    return sorted(DICE_CLASS_MAP)
+
+def deck_matrix(deck_size: int, dice_ids: list = None) -> list:
+    return [list(deck) for deck in itertools.combinations(dice_ids or simulable_dice(), deck_size)]
+
+def simulate_game(job: dict) -> dict:
+    """게임 1판 실행 (워커 프로세스에서 호출되므로 모듈 최상위 함수)"""
+    spawn, merge = job["strategy"].split("/")
+    deck = job["deck"]
+    session = SoloGameSession(0, list(deck), class_levels={d: job["class_level"] for d in deck},
+                              projectile_mode=job.get("projectile_mode"), seed=job["seed"], wave_table=job.get("wave_table"))
+    damage = session.track_damage()
+    player = ScriptedPlayer(session, spawn=spawn, merge=merge, action_interval=job.get("action_interval", 0.5))
+    max_ticks = int(job.get("max_seconds", MAX_SECONDS) * SIM_FPS)
+    sample_ticks = SP_SAMPLE_INTERVAL * SIM_FPS
+
+    sp_curve = []
+    while session.tick < max_ticks and session.status != STATUS_FINISHED:
+        player.act()
+        session._step(FIXED_DT)
+        if session.tick % sample_ticks == 0:
+            sp_curve.append(session.sp)
+    return {
+        "key": job["key"],
+        "survived_s": session.sim_time,
+        "wave": session.wave,
+        "game_over": session.status == STATUS_FINISHED,
+        "damage": damage,
+        "sp_curve": sp_curve,
+    }
+
+def build_jobs(decks: list, class_levels: list, strategies: list, runs: int, seed: int = 0,
+               max_seconds: float = MAX_SECONDS, projectile_mode: str = None, wave_table: str = None) -> list:
+    jobs = []
+    for deck, level, strategy in itertools.product(decks, class_levels, strategies):
+        key = ("+".join(deck), level, strategy)
+        for run in range(runs):
+            jobs.append({"key": key, "deck": deck, "class_level": level, "strategy": strategy,
+                         "seed": seed + run, "max_seconds": max_seconds, "projectile_mode": projectile_mode,
+                         "wave_table": wave_table})
+    return jobs
+
+def aggregate(results: list) -> dict:
+    """게임별 결과 -> 조합별 집계 {key: {...}}"""
+    groups = {}
+    for r in results:
+        g = groups.setdefault(tuple(r["key"]), {"games": 0, "survived_s": 0.0, "wave": 0, "game_over": 0,
+                                                "damage": {}, "sp_sum": [], "sp_n": []})
+        g["games"] += 1
+        g["survived_s"] += r["survived_s"]
+        g["wave"] += r["wave"]
+        g["game_over"] += r["game_over"]
+        for dice_id, dmg in r["damage"].items():
+            g["damage"][dice_id] = g["damage"].get(dice_id, 0) + dmg
+        for i, sp in enumerate(r["sp_curve"]): # 일찍 끝난 판은 그 이후 샘플에서 빠짐
+            if i == len(g["sp_sum"]):
+                g["sp_sum"].append(0.0)
+                g["sp_n"].append(0)
+            g["sp_sum"][i] += sp
+            g["sp_n"][i] += 1
+
+    summary = {}
+    for key, g in groups.items():
+        total_time = g["survived_s"] or 1.0
+        summary[key] = {
+            "games": g["games"],
+            "mean_survived_s": round(g["survived_s"] / g["games"], 2),
+            "mean_wave": round(g["wave"] / g["games"], 2),
+            "game_over_rate": round(g["game_over"] / g["games"], 4),
+            "dps": {d: round(dmg / total_time, 2) for d, dmg in sorted(g["damage"].items())},
+            "sp_curve": [round(s / n, 1) for s, n in zip(g["sp_sum"], g["sp_n"])],
+        }
+    return summary
+
+def write_csv(summary: dict, out_dir: str):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["deck", "class_level", "strategy", "games", "mean_survived_s", "mean_wave", "game_over_rate", "total_dps"])
+        for (deck, level, strategy), s in sorted(summary.items()):
+            w.writerow([deck, level, strategy, s["games"], s["mean_survived_s"], s["mean_wave"], s["game_over_rate"],
+                        round(sum(s["dps"].values()), 2)])
+    with open(os.path.join(out_dir, "dice_dps.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["deck", "class_level", "strategy", "dice_id", "dps"])
+        for (deck, level, strategy), s in sorted(summary.items()):
+            for dice_id, dps in s["dps"].items():
+                w.writerow([deck, level, strategy, dice_id, dps])
+    with open(os.path.join(out_dir, "sp_curve.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["deck", "class_level", "strategy", "t", "mean_sp"])
+        for (deck, level, strategy), s in sorted(summary.items()):
+            for i, sp in enumerate(s["sp_curve"]):
+                w.writerow([deck, level, strategy, (i + 1) * SP_SAMPLE_INTERVAL, sp])
+
+def run_sweep(decks: list, class_levels: list, strategies: list = DEFAULT_STRATEGIES, runs: int = 20, seed: int = 0,
+              max_seconds: float = MAX_SECONDS, projectile_mode: str = None, wave_table: str = None,
+              workers: int = None) -> dict:
+    """전체 조합 실행 후 집계 결과 반환. workers=1이면 현재 프로세스에서 순차 실행"""
+    for strategy in strategies:
+        spawn, merge = strategy.split("/")
+        if spawn not in SPAWN_POLICIES or merge not in MERGE_POLICIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+    jobs = build_jobs(decks, class_levels, strategies, runs, seed, max_seconds, projectile_mode, wave_table)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [simulate_game(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            results = list(pool.map(simulate_game, jobs, chunksize=max(1, len(jobs) // (workers * 8))))
+    return aggregate(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dice Defense Monte Carlo balance simulator")
+    parser.add_argument("--decks", help="';' separated decks of ',' separated dice ids (default: all --deck-size combinations)")
+    parser.add_argument("--deck-size", type=int, default=5)
+    parser.add_argument("--class-levels", default="1", help="comma separated class levels applied to every dice")
+    parser.add_argument("--strategies", default=",".join(DEFAULT_STRATEGIES), help="comma separated spawn/merge policy pairs")
+    parser.add_argument("--runs", type=int, default=20, help="games per combination")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS)
+    parser.add_argument("--projectile-mode", choices=["homing", "analytic"])
+    parser.add_argument("--waves", choices=sorted(WAVE_TABLES), help="wave table (default: standard)")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--out", default="balance_out", help="directory for CSV files")
+    parser.add_argument("--json", action="store_true", help="also print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    if args.decks:
+        decks = [d.split(",") for d in args.decks.split(";")]
+    else:
+        decks = deck_matrix(args.deck_size)
+    class_levels = [int(x) for x in args.class_levels.split(",")]
+    strategies = args.strategies.split(",")
+
+    started = time.perf_counter()
+    summary = run_sweep(decks, class_levels, strategies, args.runs, args.seed, args.max_seconds,
+                        args.projectile_mode, args.waves, args.workers)
+    elapsed = time.perf_counter() - started
+    write_csv(summary, args.out)
+    games = sum(s["games"] for s in summary.values())
+    print(f"[balance] {len(summary)} combinations, {games} games in {elapsed:.1f}s -> {args.out}/")
+    if args.json:
+        json.dump({"|".join(map(str, k)): v for k, v in summary.items()}, sys.stdout, indent=2)
+        print()
+    return summary
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,379 @@
 # app/services/dice_defense/connection_manager.py
+import json
+import time
+import asyncio
+from collections import deque
 from fastapi import WebSocket
 from typing import Dict, List
+from app.core.rate_limit import TokenBucket
+from app.services.dice_defense.protocol import DeltaEncoder, DeltaState, KEYFRAME_INTERVAL
+from app.services.dice_defense.protocol import BinaryFrame, BinaryState, encode_body, encode_for
+from app.services.dice_defense.protocol import PreparedFrame
+
+# 연결별 송신 큐 최대 길이 (넘치면 오래된 상태 프레임부터 폐기)
+SEND_QUEUE_SIZE = 8
+# 소켓별 게임 입력 속도 제한 (초당 COMMAND_RATE개, 순간 최대 COMMAND_BURST개)
+COMMAND_RATE = 20
+COMMAND_BURST = 40
+# 락스텝 RESYNC(전체 스냅샷 재전송) 속도 제한 - 스냅샷 직렬화는 비싸므로 입력보다 훨씬 엄격하게
+RESYNC_RATE = 0.2
+RESYNC_BURST = 2
+# 하트비트: HEARTBEAT_INTERVAL초마다 PING 전송, HEARTBEAT_TIMEOUT초 동안 아무 메시지도 없으면 끊긴 연결로 정리
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TIMEOUT = 30
+# 소켓 쓰기 1회 최대 대기 시간 (넘으면 막힌 연결로 보고 정리)
+SEND_TIMEOUT = 5
+# 최신 것만 의미가 있어서 새 프레임으로 대체해도 되는 메시지 타입
+REPLACEABLE_TYPES = {"STATE_UPDATE", "STATE_DELTA", "STATE_BINARY"}
+
+class TextFrame:
+    """미리 JSON 직렬화된 메시지. 같은 방의 여러 소켓이 같은 문자열을 공유"""
+    __slots__ = ("type", "text")
+
+    def __init__(self, message: dict):
+        self.type = message.get("type")
+        self.text = json.dumps(message, separators=(",", ":"))
+
+    @classmethod
+    def encoded(cls, mtype: str, text: str):
+        """이미 직렬화된 텍스트로 생성 (샤드 워커가 인코딩한 프레임)"""
+        frame = cls.__new__(cls)
+        frame.type, frame.text = mtype, text
+        return frame
+
+def _message_type(message):
+    if isinstance(message, (BinaryFrame, TextFrame)): return message.type
+    return message.get("type")
+
+class ClientConnection:
+    """
+    웹소켓 1개 + 전용 송신 큐 + 전용 writer 태스크.
+    브로드캐스트는 큐에 넣기만 하고 즉시 반환하므로, 느린 클라이언트 하나가
+    글로벌 틱이나 같은 방의 다른 클라이언트를 지연시키지 않습니다.
+    전송 실패 / 전송 시간 초과 시 on_dead(conn, reason)으로 즉시 정리를 요청합니다.
+    """
+    def __init__(self, game_id: str, websocket: WebSocket, max_queue: int = SEND_QUEUE_SIZE,
+                 delta: DeltaState = None, binary: BinaryState = None, spectator: bool = False,
+                 on_dead=None):
+        self.game_id = game_id
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.spectator = spectator # 관전자 (입력 불가, 상태만 수신)
+        # 둘 다 None이면 기존 전체 상태(STATE_UPDATE) JSON 형식으로 수신
+        self.delta = delta
+        self.binary = binary
+        self.queue = deque()
+        self.commands = TokenBucket(COMMAND_RATE, COMMAND_BURST) # 수신 입력 속도 제한
+        self.resyncs = TokenBucket(RESYNC_RATE, RESYNC_BURST)    # 락스텝 RESYNC 속도 제한
+        self.resync_pending = False # 보낼 LOCKSTEP_RESYNC가 아직 전송되지 않음 (소켓당 1개만)
+        self._wakeup = asyncio.Event()
+        self.writer_task = None
+        self.closed = False
+        self.on_dead = on_dead
+        self.last_seen = time.monotonic() # 마지막으로 클라이언트 메시지를 받은 시각 (하트비트)
+
+        # 통계
+        self.sent = 0
+        self.dropped = 0
+        self.rate_limited = 0 # 속도 제한으로 버린 입력 수 (거부된 RESYNC 포함)
+
+    def start(self):
+        self.writer_task = asyncio.create_task(self._writer())
+
+    def stop(self):
+        self.closed = True
+        if self.writer_task:
+            self.writer_task.cancel()
+            self.writer_task = None
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        # 대기 중인 메시지(GAME_OVER 등)를 최대한 보낸 뒤 닫음
+        for _ in range(50):
+            if not self.queue or self.closed: break
+            await asyncio.sleep(0.02)
+        self.stop()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def enqueue(self, message):
+        if self.closed: return
+        replaceable = _message_type(message) in REPLACEABLE_TYPES
+
+        if len(self.queue) >= self.max_queue:
+            # 큐가 가득 참 -> 대기 중인 오래된 상태 프레임은 새 프레임으로 대체
+            stale = [m for m in self.queue if _message_type(m) in REPLACEABLE_TYPES]
+            if stale:
+                self.queue = deque(m for m in self.queue if _message_type(m) not in REPLACEABLE_TYPES)
+                self.dropped += len(stale)
+            elif replaceable:
+                # 중요 메시지로만 가득 찬 경우 새 상태 프레임을 버림
+                self.dropped += 1
+                return
+
+        self.queue.append(message)
+        self._wakeup.set()
+
+    async def _writer(self):
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                message = self.queue.popleft()
+                if isinstance(message, TextFrame):
+                    await asyncio.wait_for(self.websocket.send_text(message.text), SEND_TIMEOUT)
+                elif isinstance(message, BinaryFrame):
+                    await asyncio.wait_for(self.websocket.send_bytes(message.data), SEND_TIMEOUT)
+                    message.on_sent()
+                else:
+                    await asyncio.wait_for(self.websocket.send_json(message), SEND_TIMEOUT)
+                    if message.get("type") == "LOCKSTEP_RESYNC":
+                        self.resync_pending = False
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self._dead("send_timeout")
+        except Exception:
+            # 전송 실패 (연결 끊김 등) -> 더 이상 쓰지 않고 즉시 정리
+            self._dead("error")
+
+    def _dead(self, reason: str):
+        self.closed = True
+        self.queue.clear()
+        if self.on_dead:
+            self.on_dead(self, reason)
+
+    @property
+    def protocol(self) -> str:
+        return "bin" if self.binary else ("delta" if self.delta else "json")
+
+    def get_stats(self):
+        return {
+            "queue_depth": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "closed": self.closed,
+            "protocol": self.protocol,
+            "spectator": self.spectator,
+        }
 
 class ConnectionManager:
     def __init__(self):
-        # game_id: [WebSocket, WebSocket, ...]
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # game_id: [ClientConnection, ClientConnection, ...]
+        self.active_connections: Dict[str, List[ClientConnection]] = {}
+        # game_id: DeltaEncoder (델타 모드 연결이 있는 방만)
+        self.encoders: Dict[str, DeltaEncoder] = {}
+        self.rate_limited_total = 0 # 속도 제한으로 버린 입력 누적 (닫힌 소켓 포함)
+        self.reaped = {"error": 0, "send_timeout": 0, "heartbeat": 0} # 사유별 강제 정리한 연결 수
+        self.on_last_viewer = None # 정리로 방의 마지막 플레이어 소켓이 빠졌을 때 호출 (game_id) -> 세션 일시정지
 
-    async def connect(self, game_id: str, websocket: WebSocket):
+    async def connect(self, game_id: str, websocket: WebSocket, delta: bool = False,
+                      keyframe_interval: int = KEYFRAME_INTERVAL, binary: bool = False,
+                      spectator: bool = False):
         await websocket.accept()
+        # 바이너리 프레임은 그 자체로 정적 필드를 생략하므로 델타보다 우선
+        delta_state = DeltaState(keyframe_interval) if delta and not binary else None
+        binary_state = BinaryState() if binary else None
+        conn = ClientConnection(game_id, websocket, delta=delta_state, binary=binary_state, spectator=spectator,
+                                on_dead=self._reap)
+        conn.start()
         if game_id not in self.active_connections:
             self.active_connections[game_id] = []
-        self.active_connections[game_id].append(websocket)
+        self.active_connections[game_id].append(conn)
+        return conn
+
+    def _find(self, game_id: str, websocket: WebSocket):
+        for conn in self.active_connections.get(game_id, []):
+            if conn.websocket is websocket:
+                return conn
+        return None
 
     def disconnect(self, game_id: str, websocket: WebSocket):
         if game_id in self.active_connections:
-            if websocket in self.active_connections[game_id]:
-                self.active_connections[game_id].remove(websocket)
+            conn = self._find(game_id, websocket)
+            if conn:
+                conn.stop()
+                self.active_connections[game_id].remove(conn)
             if not self.active_connections[game_id]:
                 del self.active_connections[game_id]
+                self.encoders.pop(game_id, None)
+
+    def _reap(self, conn: ClientConnection, reason: str):
+        """죽은 연결을 즉시 목록에서 제거 (이후 브로드캐스트 비용 0). 수신 루프의 disconnect는 나중에 와도 무해"""
+        conns = self.active_connections.get(conn.game_id)
+        if not conns or conn not in conns: return
+        conn.stop()
+        conns.remove(conn)
+        self.reaped[reason] = self.reaped.get(reason, 0) + 1
+        asyncio.create_task(self._close_socket(conn.websocket))
+        if not conns:
+            del self.active_connections[conn.game_id]
+            self.encoders.pop(conn.game_id, None)
+        if not conn.spectator and self.on_last_viewer and self.player_count(conn.game_id) == 0:
+            self.on_last_viewer(conn.game_id)
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket):
+        try:
+            await websocket.close(code=1011, reason="Connection timed out")
+        except Exception:
+            pass
+
+    def touch(self, game_id: str, websocket: WebSocket):
+        """클라이언트 메시지 수신 (하트비트 갱신)"""
+        conn = self._find(game_id, websocket)
+        if conn: conn.last_seen = time.monotonic()
+
+    def check_heartbeats(self):
+        """응답 없는 연결 정리 + 나머지에 PING 전송"""
+        now = time.monotonic()
+        for conns in list(self.active_connections.values()):
+            for conn in list(conns):
+                if now - conn.last_seen > HEARTBEAT_TIMEOUT:
+                    self._reap(conn, "heartbeat")
+                else:
+                    conn.enqueue({"type": "PING", "t": now})
+
+    async def run_heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                self.check_heartbeats()
+            except Exception as e:
+                print(f"Error in heartbeat: {e}")
+
+    def ack(self, game_id: str, websocket: WebSocket, seq: int):
+        """클라이언트가 받은 프레임 seq 확인 -> 다음 델타의 기준(base)"""
+        conn = self._find(game_id, websocket)
+        if conn and conn.delta is not None and isinstance(seq, int):
+            conn.delta.ack(seq)
+
+    def request_keyframe(self, game_id: str, websocket: WebSocket):
+        """클라이언트가 기준 프레임을 잃어버린 경우 다음 프레임을 keyframe으로"""
+        conn = self._find(game_id, websocket)
+        if conn and conn.delta is not None:
+            conn.delta.request_keyframe()
+
+    def admit_commands(self, game_id: str, websocket: WebSocket, commands: list) -> list:
+        """소켓별 토큰 버킷으로 입력 속도 제한. 허용된 앞부분만 반환"""
+        conn = self._find(game_id, websocket)
+        if not conn: return []
+        allowed = conn.commands.take(len(commands))
+        if allowed < len(commands):
+            conn.rate_limited += len(commands) - allowed
+            self.rate_limited_total += len(commands) - allowed
+        return commands[:allowed]
+
+    def admit_resync(self, game_id: str, websocket: WebSocket) -> bool:
+        """
+        락스텝 RESYNC 허용 여부. 관전자는 거부, 소켓당 전송 대기 중인 재동기화는 1개만,
+        나머지는 토큰 버킷으로 제한 (거부된 요청은 rate_limited로 집계)
+        """
+        conn = self._find(game_id, websocket)
+        if not conn: return False
+        if conn.spectator or conn.resync_pending or not conn.resyncs.take():
+            conn.rate_limited += 1
+            self.rate_limited_total += 1
+            return False
+        conn.resync_pending = True
+        return True
+
+    def protocols(self, game_id: str) -> set:
+        """방에 붙은 연결들의 상태 프레임 형식 ("json" / "delta" / "bin")"""
+        return {conn.protocol for conn in self.active_connections.get(game_id, [])}
+
+    def viewer_count(self, game_id: str) -> int:
+        return len(self.active_connections.get(game_id, []))
+
+    def player_count(self, game_id: str) -> int:
+        """관전자를 제외한 연결 수 (게임 진행 여부 판단용)"""
+        return sum(1 for conn in self.active_connections.get(game_id, []) if not conn.spectator)
+
+    def send_all(self, game_id: str, message: dict):
+        """상태 프레임이 아닌 일반 메시지를 방 전체에 전송 (프로토콜 변환 없음)"""
+        for conn in self.active_connections.get(game_id, []):
+            conn.enqueue(message)
+
+    def close_game(self, game_id: str, code: int = 1000, reason: str = ""):
+        """세션 정리 시 남아있는 소켓을 모두 닫음 (큐에 남은 메시지는 먼저 전송)"""
+        for conn in list(self.active_connections.get(game_id, [])):
+            asyncio.create_task(conn.close(code, reason))
+        self.active_connections.pop(game_id, None)
+        self.encoders.pop(game_id, None)
+
+    def send_personal(self, game_id: str, websocket: WebSocket, message: dict):
+        """특정 소켓에만 전송 (송신 큐를 거치므로 브로드캐스트와 순서가 보장됨)"""
+        conn = self._find(game_id, websocket)
+        if conn:
+            conn.enqueue(message)
 
     async def broadcast(self, game_id: str, message: dict):
-        if game_id in self.active_connections:
-            for connection in self.active_connections[game_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    # 연결 끊김 처리 등
-                    pass
-
-manager = ConnectionManager()
\ No newline at end of file
+        # 소켓에 직접 쓰지 않고 각 연결의 큐에 넣기만 함 (대기 없음)
+        # 직렬화는 프레임(또는 델타 base)당 한 번만 하고 같은 문자열/바이트를 모든 소켓에 공유
+        if isinstance(message, PreparedFrame):
+            self._broadcast_prepared(game_id, message)
+            return
+        is_state = message.get("type") == "STATE_UPDATE"
+        seq, encoder, cache = None, None, {}
+        body = None
+        encoded = {} # id(message dict) -> TextFrame
+        for conn in self.active_connections.get(game_id, []):
+            if is_state and conn.binary is not None:
+                if body is None:
+                    # 바이너리 본문은 프레임당 한 번만 인코딩
+                    body = encode_body(message)
+                for msg in encode_for(conn.binary, body):
+                    conn.enqueue(msg)
+            elif is_state and conn.delta is not None:
+                if seq is None:
+                    # 프레임당 스냅샷은 한 번만 (델타 연결이 여럿이어도 공유)
+                    encoder = self.encoders.setdefault(game_id, DeltaEncoder())
+                    seq = encoder.push(message)
+                msg = encoder.encode(conn.delta, seq, message, cache)
+                if id(msg) not in encoded:
+                    encoded[id(msg)] = TextFrame(msg)
+                conn.enqueue(encoded[id(msg)])
+            else:
+                if id(message) not in encoded:
+                    encoded[id(message)] = TextFrame(message)
+                conn.enqueue(encoded[id(message)])
+
+    def _broadcast_prepared(self, game_id: str, frame: PreparedFrame):
+        """샤드 워커가 인코딩해 둔 프레임 전송: 연결별 상태에 맞는 형태를 고르기만 함"""
+        shared = {} # 델타 base seq / "key" / "full" -> TextFrame
+        for conn in self.active_connections.get(game_id, []):
+            if conn.binary is not None and frame.body is not None:
+                for msg in encode_for(conn.binary, frame.body):
+                    conn.enqueue(msg)
+                continue
+            if conn.delta is not None and frame.delta is not None:
+                seq, key, deltas = frame.delta
+                if conn.delta.needs_keyframe(seq, deltas):
+                    conn.delta.keyframe_sent(seq)
+                    choice, mtype, text = "key", "STATE_UPDATE", key
+                else:
+                    choice = conn.delta.acked_seq
+                    mtype, text = "STATE_DELTA", deltas[choice]
+            else: # json 연결, 또는 워커가 아직 이 연결의 형식을 모름 (접속 직후) -> 전체 상태
+                choice, mtype, text = "full", "STATE_UPDATE", frame.text
+            if choice not in shared:
+                shared[choice] = TextFrame.encoded(mtype, text)
+            conn.enqueue(shared[choice])
+
+    def get_summary(self):
+        """살아있는 연결 수 / 사유별 정리된 연결 수"""
+        return {"live": sum(len(c) for c in self.active_connections.values()), "reaped": dict(self.reaped)}
+
+    def get_stats(self):
+        """소켓별 큐 깊이 / 폐기 수 등"""
+        return {
+            game_id: [conn.get_stats() for conn in conns]
+            for game_id, conns in self.active_connections.items()
+        }
+
+manager = ConnectionManager()
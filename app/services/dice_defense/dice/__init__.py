@@ -1,4 +1,5 @@
 # app/services/dice_defense/dice/__init__.py
+from functools import lru_cache
 from app.services.dice_defense.game_data import DICE_DATA
 from .base_dice import BaseDice
 from .fire_dice import FireDice
@@ -6,6 +7,7 @@ from .electric_dice import ElectricDice
 from .wind_dice import WindDice
 from .poison_dice import PoisonDice
 from .ice_dice import IceDice
+from .stats import DiceStats, compile_dice_stats
 
 # 주사위 ID와 클래스 매핑
 DICE_CLASS_MAP = {
@@ -16,8 +18,9 @@ DICE_CLASS_MAP = {
     'ice': IceDice,
 }
 
+@lru_cache(maxsize=None)
 def get_dice_logic(dice_id: str):
-    """주사위 ID에 해당하는 로직 인스턴스를 반환"""
+    """주사위 ID에 해당하는 로직 인스턴스를 반환 (상태가 없으므로 ID당 1개를 만들어 재사용)"""
     dice_class = DICE_CLASS_MAP.get(dice_id, BaseDice) 
     dice_data = DICE_DATA.get(dice_id, {})
     return dice_class(dice_id, dice_data)
\ No newline at end of file
@@ -1,8 +1,15 @@
 # app/services/dice_defense/dice/base_dice.py
 import math
 import random
+from app.services.dice_defense.spatial_hash import SpatialHash
+from app.services.dice_defense.target_index import TargetIndex
+from .stats import DiceStats
 
 class BaseDice:
+    """
+    주사위 로직. 상태가 없으므로 get_dice_logic()이 ID당 1개만 만들어 모든 세션이 공유합니다.
+    주사위별 상태는 dice_state(그리드 칸), 수치는 세션이 게임 시작 시 컴파일한 DiceStats에 있습니다.
+    """
     def __init__(self, dice_id: str, data: dict):
         self.id = dice_id
         self.data = data # game_data.py 정보
@@ -10,33 +17,46 @@ class BaseDice:
     # -------------------------------------------------------------
     # [1] 타게팅 로직 (Target Selection)
     # -------------------------------------------------------------
-    def find_target(self, dice_state: dict, mobs: list):
-        """기본: 최전방 타게팅 전략 사용"""
-        return self._target_front(dice_state, mobs)
+    def find_target(self, dice_state: dict, mobs: list, targets: TargetIndex = None):
+        """
+        기본: 최전방 타게팅 전략 사용
+        targets: 스텝 단위 타겟 선정 캐시 (없으면 mobs로 즉석 구성)
+        """
+        return self._target_front(dice_state, mobs, targets)
 
-    def _target_front(self, dice_state, mobs):
-        """전략: 가장 앞서가는 적 선택"""
-        if not mobs: return None
-        # path_index가 큰 순서 = 결승점에 가까운 순서
-        sorted_mobs = sorted(mobs, key=lambda m: m['path_index'], reverse=True)
-        return sorted_mobs[0]
+    def _targets(self, mobs, targets):
+        return targets if targets is not None else TargetIndex.from_mobs(mobs)
+
+    def _target_front(self, dice_state, mobs, targets=None):
+        """전략: 가장 앞서가는 적 선택 (경로 진행 거리 기준)"""
+        return self._targets(mobs, targets).front()
+
+    def _target_random(self, dice_state, mobs, targets=None):
+        """전략: 무작위 적 선택"""
+        return self._targets(mobs, targets).random()
+
+    def _target_strongest(self, dice_state, mobs, targets=None):
+        """전략: 체력이 가장 높은 적 선택"""
+        return self._targets(mobs, targets).strongest()
 
     # -------------------------------------------------------------
     # [2] 발사 로직 (Firing Mechanism)
     # -------------------------------------------------------------
-    def create_projectiles(self, dice_state: dict, target: dict, dice_size: int = 100):
+    def create_projectiles(self, dice_state: dict, target: dict, dice_size: int = 100, stats: DiceStats = None):
         """기본: 눈 위치 순환 발사 전략 사용"""
-        return self._fire_sequential(dice_state, target, dice_size)
+        return self._fire_sequential(dice_state, target, dice_size, stats)
 
-    def _fire_sequential(self, dice_state, target, dice_size):
+    def _fire_sequential(self, dice_state, target, dice_size, stats=None):
         """전략: 눈 하나하나 순차적으로 1발씩 발사"""
+        stats = self._stats(stats, dice_size)
         level = dice_state['level']
         
-        # 발사 위치 계산 (offset)
+        # 발사 위치 (컴파일된 레벨별 눈 위치 테이블)
         if 'shot_seq' not in dice_state: dice_state['shot_seq'] = 0
         seq = dice_state['shot_seq']
         
-        ox, oy = self._get_pip_offset(level, seq, dice_size)
+        offsets = stats.pip_offsets[level]
+        ox, oy = offsets[seq % len(offsets)]
         
         # 다음 발사를 위해 시퀀스 증가
         dice_state['shot_seq'] = (seq + 1) % level
@@ -44,7 +64,8 @@ class BaseDice:
         return [{
             "type": "projectile",
             "dice_id": self.id,      # [중요] 피격 시 로직 찾기 위함
-            "damage": self.data.get('damage', 10),
+            "damage": stats.damage,
+            "special": stats.special,
             "speed": 800,
             "target_id": target['id'],
             "start_x": dice_state['cx'] + ox,
@@ -54,8 +75,12 @@ class BaseDice:
     # -------------------------------------------------------------
     # [3] 데미지 로직 (On Hit Effect)
     # -------------------------------------------------------------
-    def on_hit(self, target: dict, projectile: dict, mobs: list):
-        """기본: 단일 타겟 데미지"""
+    def on_hit(self, target: dict, projectile: dict, mobs: list, spatial: SpatialHash = None, effects=None):
+        """
+        기본: 단일 타겟 데미지
+        spatial: mobs 위치로 구성된 공간 인덱스 (범위형 데미지용, 없으면 필요할 때 즉석 구성)
+        effects: 세션 상태이상 엔진 (StatusEffects, 없으면 상태이상 미적용)
+        """
         self._damage_single(target, projectile)
 
     def _damage_single(self, target, projectile):
@@ -63,56 +88,57 @@ class BaseDice:
         damage = projectile['damage']
         target['hp'] -= damage
 
+    def _mobs_in_radius(self, center, mobs, radius, spatial=None):
+        """center 주변 radius 이내의 적 목록 (center 자신 포함)"""
+        if spatial is None: spatial = SpatialHash.from_mobs(mobs)
+        return [mobs[i] for i in spatial.query_radius(center['x'], center['y'], radius).tolist()]
+
+    def _closest_mob(self, center, mobs, radius, exclude_ids=(), spatial=None):
+        """center에서 radius 이내의 가장 가까운 적 (exclude_ids 제외). 없으면 None"""
+        if spatial is None: spatial = SpatialHash.from_mobs(mobs)
+        for i in spatial.query_nearest(center['x'], center['y'], radius, k=len(exclude_ids) + 1).tolist():
+            if mobs[i]['id'] not in exclude_ids:
+                return mobs[i]
+        return None
+
     # -------------------------------------------------------------
     # [유틸리티] (공통 기능)
     # -------------------------------------------------------------
-    def update_attack(self, dice_state: dict, mobs: list, dt: float, current_time: float, dice_size: int = 100):
+    def _stats(self, stats, dice_size):
+        # 세션 테이블 없이 호출된 경우 1레벨 기준으로 즉석 구성
+        return stats if stats is not None else DiceStats(self.id, 1, dice_size)
+
+    def update_attack(self, dice_state: dict, mobs: list, dt: float, current_time: float, dice_size: int = 100,
+                      targets: TargetIndex = None, stats: DiceStats = None):
         """쿨타임 관리 및 [1]->[2] 실행 오케스트레이터"""
-        base_speed = self.data.get('speed', 1.0)
-        level = dice_state['level']
-        attack_interval = base_speed / level # 공격 속도 공식
+        stats = self._stats(stats, dice_size)
+        attack_interval = stats.attack_interval[dice_state['level']] # 공격 속도 공식: speed / level
         
         if 'last_attack_time' not in dice_state: dice_state['last_attack_time'] = 0
             
         if current_time - dice_state['last_attack_time'] >= attack_interval:
             # [1] 타겟 선정
-            target = self.find_target(dice_state, mobs)
+            target = self.find_target(dice_state, mobs, targets)
             
             if target:
                 dice_state['last_attack_time'] = current_time
                 dice_state['target_id'] = target['id']
                 
                 # [2] 투사체 생성
-                return self.create_projectiles(dice_state, target, dice_size)
+                return self.create_projectiles(dice_state, target, dice_size, stats)
         
         # 시각적 타겟 라인 해제 (짧은 유예)
         if current_time - dice_state['last_attack_time'] > 0.1:
              dice_state['target_id'] = None
         return None
 
-    def _get_pip_offset(self, level, seq_index, size):
-        if level >= 7: return (0, 0)
-        d = size * 0.25 
-        pos_map = {
-            'tl': (-d, -d), 'tc': (0, -d), 'tr': (d, -d),
-            'cl': (-d, 0),  'cc': (0, 0),  'cr': (d, 0),
-            'bl': (-d, d),  'bc': (0, d),  'br': (d, d)
-        }
-        configs = {
-            1: ['cc'], 2: ['tl', 'br'], 3: ['tl', 'cc', 'br'],
-            4: ['tl', 'tr', 'bl', 'br'], 5: ['tl', 'tr', 'cc', 'bl', 'br'],
-            6: ['tl', 'cl', 'bl', 'tr', 'cr', 'br']
-        }
-        layout = configs.get(level, ['cc'])
-        return pos_map[layout[seq_index % len(layout)]]
-
     # 결합 관련 (기존 유지)
     def can_merge_with(self, my_state: dict, target_state: dict) -> bool:
         if not target_state: return False
         return (self.id == target_state['id'] and my_state['level'] == target_state['level'])
 
-    def on_merge(self, my_state: dict, target_state: dict, deck: list) -> dict:
+    def on_merge(self, my_state: dict, target_state: dict, deck: list, rng: random.Random = None) -> dict:
         new_level = my_state['level'] + 1
         if new_level > 7: new_level = 7
-        new_id = random.choice(deck)
+        new_id = (rng or random).choice(deck)
         return {'id': new_id, 'level': new_level}
\ No newline at end of file
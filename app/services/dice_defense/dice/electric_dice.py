@@ -1,6 +1,5 @@
 # app/services/dice_defense/dice/electric_dice.py
 from .base_dice import BaseDice
-import math
 
 class ElectricDice(BaseDice):
     """
@@ -9,33 +8,19 @@ class ElectricDice(BaseDice):
     [3] 데미지: 체인 라이트닝 (Unique)
        - 첫 타겟 100%, 주변 적 70%, 그 다음 30%
     """
-    def on_hit(self, target: dict, projectile: dict, mobs: list):
+    def on_hit(self, target: dict, projectile: dict, mobs: list, spatial=None, effects=None):
         # 1차 타격 (100%)
         damage = projectile['damage']
         target['hp'] -= damage
         
-        # 2차 타겟 찾기 (현재 타겟 주변 200px 이내)
+        # 2차 타겟 찾기 (현재 타겟 주변 200px 이내 최근접)
         chain_range = 200
-        chain_1 = self._find_closest_mob(target, mobs, exclude_ids=[target['id']], range_limit=chain_range)
+        chain_1 = self._closest_mob(target, mobs, chain_range, exclude_ids=(target['id'],), spatial=spatial)
         
         if chain_1:
             chain_1['hp'] -= damage * 0.7
             
             # 3차 타겟 찾기 (2차 타겟 주변)
-            chain_2 = self._find_closest_mob(chain_1, mobs, exclude_ids=[target['id'], chain_1['id']], range_limit=chain_range)
+            chain_2 = self._closest_mob(chain_1, mobs, chain_range, exclude_ids=(target['id'], chain_1['id']), spatial=spatial)
             if chain_2:
-                chain_2['hp'] -= damage * 0.3
-
-    def _find_closest_mob(self, center_entity, mobs, exclude_ids, range_limit):
-        candidates = []
-        for m in mobs:
-            if m['id'] in exclude_ids: continue
-            dx = m['x'] - center_entity['x']
-            dy = m['y'] - center_entity['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            if dist <= range_limit:
-                candidates.append((dist, m))
-        
-        if not candidates: return None
-        candidates.sort(key=lambda x: x[0]) # 거리순 정렬
-        return candidates[0][1]
\ No newline at end of file
+                chain_2['hp'] -= damage * 0.3
\ No newline at end of file
@@ -1,26 +1,19 @@
 # app/services/dice_defense/dice/fire_dice.py
 from .base_dice import BaseDice
-import math
 
 class FireDice(BaseDice):
     """
     [1] 타게팅: 최전방
     [2] 발사: 순차 발사
-    [3] 데미지: 스플래시 (반경 100px 내 적에게 50% 데미지)
+    [3] 데미지: 스플래시 (반경 150px 내 적에게 50% 데미지)
     """
-    def on_hit(self, target: dict, projectile: dict, mobs: list):
+    def on_hit(self, target: dict, projectile: dict, mobs: list, spatial=None, effects=None):
         # 메인 타겟
         damage = projectile['damage']
         target['hp'] -= damage
         
-        # 스플래시
+        # 스플래시 (공간 인덱스로 주변 적만 조회)
         splash_radius = 150
-        for m in mobs:
+        for m in self._mobs_in_radius(target, mobs, splash_radius, spatial):
             if m['id'] == target['id']: continue
-            
-            dx = m['x'] - target['x']
-            dy = m['y'] - target['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            if dist <= splash_radius:
-                m['hp'] -= damage * 0.5
\ No newline at end of file
+            m['hp'] -= damage * 0.5
\ No newline at end of file
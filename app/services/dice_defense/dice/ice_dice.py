@@ -1,5 +1,13 @@
 from .base_dice import BaseDice
 
 class IceDice(BaseDice):
-    """얼음 주사위: 적 이동 속도 감소 (Slow) 예정"""
-    pass
\ No newline at end of file
+    """
+    [1] 타게팅: 최전방 (Base)
+    [2] 발사: 순차 발사 (Base)
+    [3] 데미지: 단일 데미지 + 감속 (Unique)
+       - 명중할 때마다 이동 속도 (얼음 효과)% 감소 스택, 스택끼리는 곱연산 (status_effects.py)
+    """
+    def on_hit(self, target: dict, projectile: dict, mobs: list, spatial=None, effects=None):
+        self._damage_single(target, projectile)
+        if effects is not None:
+            effects.apply(target, 'ice', projectile['special'])
@@ -0,0 +1,60 @@
+# app/services/dice_defense/dice/stats.py
+from app.services.dice_defense.game_data import DICE_DATA
+
+# -------------------------------------------------------------------------
+# 주사위 스탯 컴파일러
+# -------------------------------------------------------------------------
+# DICE_DATA의 stats {base, c, p}와 유저의 클래스 레벨(user_dice.class_level)로
+# 게임 시작 시 한 번만 세션 전용 조회 테이블을 만듭니다.
+#   값 = base + (class_level - 1) * c   (클라이언트 덱 화면의 표시 공식과 동일)
+#   p  = 인게임 파워업 1회당 증가량 (damage_per_power로 보관)
+#   specials[0] = 주사위 고유 효과 수치 (독 데미지, 얼음 감속% 등 -> special)
+# 매 틱 전투 로직은 계산 없이 테이블 값만 읽습니다.
+
+MAX_DICE_LEVEL = 7     # 인게임 눈 개수(합성 레벨) 상한
+DEFAULT_DAMAGE = 10    # atk가 "-"인 주사위 (기존 기본값)
+DEFAULT_INTERVAL = 1.0 # speed가 "-"인 주사위 (기존 기본값)
+
+# 눈 위치 (주사위 중심 기준, 크기 대비 비율)
+PIP_POSITIONS = {
+    'tl': (-1, -1), 'tc': (0, -1), 'tr': (1, -1),
+    'cl': (-1, 0),  'cc': (0, 0),  'cr': (1, 0),
+    'bl': (-1, 1),  'bc': (0, 1),  'br': (1, 1)
+}
+PIP_LAYOUTS = {
+    1: ['cc'], 2: ['tl', 'br'], 3: ['tl', 'cc', 'br'],
+    4: ['tl', 'tr', 'bl', 'br'], 5: ['tl', 'tr', 'cc', 'bl', 'br'],
+    6: ['tl', 'cl', 'bl', 'tr', 'cr', 'br']
+}
+
+def pip_offsets(level: int, size: float) -> list:
+    """레벨별 발사 위치 목록 (7레벨 이상은 중앙 한 곳)"""
+    if level >= 7: return [(0, 0)]
+    d = size * 0.25
+    return [(PIP_POSITIONS[p][0] * d, PIP_POSITIONS[p][1] * d) for p in PIP_LAYOUTS.get(level, ['cc'])]
+
+def stat_value(stat, class_level: int, default):
+    if not isinstance(stat, dict) or "base" not in stat: return default
+    return stat["base"] + (class_level - 1) * stat.get("c", 0)
+
+class DiceStats:
+    """주사위 1종의 세션 전용 스탯 테이블 (리스트는 인게임 레벨로 인덱싱, 0번은 미사용)"""
+    __slots__ = ("dice_id", "class_level", "damage", "damage_per_power", "special", "attack_interval", "pip_offsets")
+
+    def __init__(self, dice_id: str, class_level: int = 1, dice_size: float = 100):
+        stats = DICE_DATA.get(dice_id, {}).get("stats", {})
+        atk = stats.get("atk")
+        self.dice_id = dice_id
+        self.class_level = class_level
+        self.damage = stat_value(atk, class_level, DEFAULT_DAMAGE)
+        self.damage_per_power = atk.get("p", 0) if isinstance(atk, dict) else 0
+        specials = stats.get("specials") or [{}]
+        self.special = stat_value(specials[0], class_level, 0)
+        interval = stat_value(stats.get("speed"), class_level, DEFAULT_INTERVAL)
+        self.attack_interval = [None] + [interval / level for level in range(1, MAX_DICE_LEVEL + 1)]
+        self.pip_offsets = [None] + [pip_offsets(level, dice_size) for level in range(1, MAX_DICE_LEVEL + 1)]
+
+def compile_dice_stats(deck: list, class_levels: dict = None, dice_size: float = 100) -> dict:
+    """덱의 주사위별 DiceStats (dice_id -> DiceStats). class_levels가 없거나 0이면 1레벨로 취급"""
+    class_levels = class_levels or {}
+    return {did: DiceStats(did, max(1, class_levels.get(did) or 1), dice_size) for did in deck}
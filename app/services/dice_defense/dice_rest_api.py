@@ -1,16 +1,15 @@
 # app/services/dice_defense/dice_rest_api.py
 from fastapi import APIRouter, HTTPException, Body
 from app.core.database import get_db_connection
-from app.services.dice_defense.game_data import DICE_DATA, RARITY_ORDER, UPGRADE_RULES
-from app.services.dice_defense.modes.solo.game import SoloGameSession
+from app.services.dice_defense.game_data import DICE_DATA, RARITY_ORDER, UPGRADE_RULES, WAVE_TABLES
+from app.services.dice_defense.modes.solo.game import SoloGameSession, NET_RATE, SYNC_STATE, SYNC_LOCKSTEP, LOCKSTEP_ENABLED
+from app.services.dice_defense.shard_pool import shard_pool
+from app.services.dice_defense.session_lifecycle import active_games, lifecycle
 # SessionManager가 있다면 import, 없다면 임시 전역 변수 사용
 # from app.core.session_manager import session_manager 
 import random
 import math
 
-# 간단한 세션 저장소 (실제 서비스에선 Redis 등을 사용하거나 session_manager 활용)
-active_games = {} 
-
 router = APIRouter()
 
 # ... (기존 변수 및 함수: RARITY_WEIGHTS, pick_one_dice, calculate_crit_damage_for_dice 등 유지) ...
@@ -207,6 +206,15 @@ async def start_solo_game(payload: dict = Body(...)):
     """
     username = payload.get("username")
     preset_index = int(payload.get("preset_index", 1)) # 기본값 1번 덱
+    net_rate = int(payload.get("net_rate", NET_RATE)) # 상태 전송 주기 (Hz)
+    wave_table = payload.get("wave_table") # 웨이브 테이블 (기본 standard, horde = 대량 스폰 부하 테스트)
+    if wave_table is not None and wave_table not in WAVE_TABLES:
+        raise HTTPException(400, "Unknown wave table")
+    sync_mode = payload.get("sync_mode", SYNC_STATE) # state = 전체 상태 전송, lockstep = 입력만 전송 + 상태 해시 검증
+    if sync_mode not in (SYNC_STATE, SYNC_LOCKSTEP):
+        raise HTTPException(400, "Unknown sync mode")
+    if sync_mode == SYNC_LOCKSTEP and not LOCKSTEP_ENABLED:
+        raise HTTPException(400, "Lockstep sync is disabled on this server (DICE_LOCKSTEP_ENABLED=1)")
     
     conn = get_db_connection()
     try:
@@ -224,24 +232,35 @@ async def start_solo_game(payload: dict = Body(...)):
         else:
             deck_ids = ['fire', 'electric', 'wind', 'ice', 'poison']
             
+        # 유저의 주사위 클래스 레벨 (미보유/0레벨은 1레벨로 취급) -> 세션 스탯 테이블에 반영
+        level_rows = conn.execute("SELECT dice_id, class_level FROM user_dice WHERE user_id = ?", (user_id,)).fetchall()
+        class_levels = {row["dice_id"]: max(1, row["class_level"]) for row in level_rows if row["dice_id"] in deck_ids}
+            
         # 3. 게임 세션 생성 (메모리에 저장)
-        session = SoloGameSession(user_id, deck_ids)
-        active_games[session.game_id] = session # 실제로는 Redis나 DB 등을 써야 함
+        session = SoloGameSession(user_id, deck_ids, net_rate=net_rate, class_levels=class_levels, wave_table=wave_table,
+                                   sync_mode=sync_mode)
+        session.pause() # 웹소켓이 붙기 전까지는 시뮬레이션하지 않음
         
         # 4. 클라이언트용 데이터 구성
         initial_data = session.get_initial_state()
         
+        # 샤딩 모드면 시뮬레이션은 워커 프로세스로 이관하고 대리 객체만 보관
+        if shard_pool.enabled:
+            session = shard_pool.add_session(session)
+        # 세션 저장소 등록 (소켓 접속 시 재개되어 GlobalTicker에 구독, 방치/종료 시 자동 정리)
+        lifecycle.register(session)
+        
         # 5. 덱 주사위들의 상세 정보(UI 표시용) 추가
         deck_details = []
         for did in deck_ids:
             info = DICE_DATA.get(did, DICE_DATA['fire']) # fallback
-            # 유저의 해당 주사위 클래스 레벨 등도 필요하면 조회해야 함. 일단 기본 정보 전송
             deck_details.append({
                 "id": did,
                 "name": info["name"],
                 "color": info["color"],
                 "symbol": info.get("symbol", "ri-dice-fill"),
-                "rarity": info["rarity"]
+                "rarity": info["rarity"],
+                "class_level": class_levels.get(did, 1)
             })
             
         initial_data["deck_details"] = deck_details
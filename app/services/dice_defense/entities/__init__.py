@@ -1,14 +1,21 @@
 # app/services/dice_defense/entities/__init__.py
+from functools import lru_cache
 from .base_entity import BaseEntity
 from .normal_mob import NormalMob
+from .fast_mob import FastMob
+from .tank_mob import TankMob
+from .boss_mob import BossMob
 
 # 엔티티 타입 ID와 클래스 매핑
 ENTITY_MAP = {
     'normal_mob': NormalMob,
-    # 추후 추가: 'fast_mob': FastMob, 'boss': BossMob ...
+    'fast_mob': FastMob,
+    'tank_mob': TankMob,
+    'boss_mob': BossMob,
 }
 
+@lru_cache(maxsize=None)
 def get_entity_manager(entity_type: str) -> BaseEntity:
-    """해당 타입의 로직 처리 클래스(싱글톤처럼 사용) 반환"""
+    """해당 타입의 로직 처리 클래스 반환 (상태가 없으므로 타입당 1개를 만들어 재사용)"""
     entity_class = ENTITY_MAP.get(entity_type, BaseEntity)
     return entity_class()
\ No newline at end of file
@@ -0,0 +1,12 @@
+# app/services/dice_defense/entities/boss_mob.py
+from .base_entity import BaseEntity
+
+class BossMob(BaseEntity):
+    default_stats = {
+        "type": "boss_mob",
+        "hp": 5000,
+        "max_hp": 5000,
+        "speed": 50,
+        "radius": 55,
+        "hitbox_radius": 55
+    }
@@ -0,0 +1,12 @@
+# app/services/dice_defense/entities/fast_mob.py
+from .base_entity import BaseEntity
+
+class FastMob(BaseEntity):
+    default_stats = {
+        "type": "fast_mob",
+        "hp": 60,
+        "max_hp": 60,
+        "speed": 180,
+        "radius": 22,
+        "hitbox_radius": 22
+    }
@@ -0,0 +1,12 @@
+# app/services/dice_defense/entities/tank_mob.py
+from .base_entity import BaseEntity
+
+class TankMob(BaseEntity):
+    default_stats = {
+        "type": "tank_mob",
+        "hp": 500,
+        "max_hp": 500,
+        "speed": 60,
+        "radius": 40,
+        "hitbox_radius": 40
+    }
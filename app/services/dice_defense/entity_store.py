@@ -0,0 +1,272 @@
+# app/services/dice_defense/entity_store.py
+import numpy as np
+
+# -------------------------------------------------------------------------
+# 구조체 배열(SoA) 기반 엔티티 / 투사체 저장소
+# -------------------------------------------------------------------------
+# 기존 list[dict] 대신 필드별 numpy 배열(컬럼)에 행 단위로 보관합니다.
+# - 이동, 투사체 추적/충돌 판정, 죽은 행 정리(compact)는 배열 연산으로 한 번에 처리
+# - 주사위 로직(find_target, on_hit)은 RowView로 기존과 같이 dict처럼 다룸
+# - to_dicts()는 기존 STATE_UPDATE의 entities / projectiles 형식 그대로 (전송/스냅샷용)
+# - id는 단조 증가로 발급되고 compact는 순서를 유지하므로 id 컬럼은 항상 정렬되어 있음
+#   -> id 조회는 np.searchsorted
+
+INITIAL_CAPACITY = 64
+
+class RowView:
+    """저장소 한 행을 dict처럼 읽고 쓰는 뷰 (compact/append 전까지만 유효)"""
+    __slots__ = ("store", "i")
+
+    def __init__(self, store, i: int):
+        self.store = store
+        self.i = i
+
+    def __getitem__(self, key):
+        store = self.store
+        arr = store.data.get(key)
+        if arr is not None:
+            if key in store.derived:
+                store.refresh()
+            if key in store.string_columns:
+                return store.codes[arr[self.i]]
+            return arr.item(self.i)
+        if key in store.constants:
+            return store.constants[key]
+        return store.extras[store.data["id"].item(self.i)][key]
+
+    def __setitem__(self, key, value):
+        store = self.store
+        arr = store.data.get(key)
+        if arr is not None:
+            arr[self.i] = store.code(value) if key in store.string_columns else value
+        else:
+            store.extras.setdefault(store.data["id"].item(self.i), {})[key] = value
+
+    def __contains__(self, key):
+        store = self.store
+        if key in store.data or key in store.constants: return True
+        return key in store.extras.get(store.data["id"].item(self.i), ())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+class ColumnStore:
+    columns = {}           # 컬럼명 -> dtype (서브클래스에서 정의)
+    string_columns = ()    # 문자열 값을 코드(정수)로 저장하는 컬럼
+    wire_columns = ()      # to_dicts()에 포함할 컬럼 (순서 유지)
+    constants = {}         # 저장하지 않고 항상 같은 값으로 내보내는 필드
+    defaults = {}          # append 시 row에 없는 컬럼의 기본값 (없으면 0)
+    derived = frozenset()  # 다른 컬럼에서 필요할 때 계산하는 컬럼 (읽기 전에 refresh())
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.n = 0
+        self.capacity = capacity
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.columns.items()}
+        self.codes = []      # 문자열 코드표
+        self._code_index = {}
+        self.extras = {}     # id -> 컬럼에 없는 필드 (effects 등)
+        self._views = None
+
+    def __len__(self):
+        return self.n
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_views"] = None
+        return state
+
+    def col(self, name: str):
+        """살아있는 행만 가리키는 컬럼 뷰 (수정하면 저장소에 반영됨, derived 컬럼은 refresh() 후에 읽을 것)"""
+        return self.data[name][:self.n]
+
+    def refresh(self):
+        """derived 컬럼 갱신 (서브클래스에서 구현)"""
+
+    def code(self, value: str) -> int:
+        code = self._code_index.get(value)
+        if code is None:
+            code = len(self.codes)
+            self.codes.append(value)
+            self._code_index[value] = code
+        return code
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, arr in self.data.items():
+            grown = np.zeros(self.capacity, dtype=arr.dtype)
+            grown[:self.n] = arr[:self.n]
+            self.data[name] = grown
+
+    def append(self, row: dict):
+        if self.n >= self.capacity:
+            self._grow()
+        i = self.n
+        for name, arr in self.data.items():
+            value = row.get(name, self.defaults.get(name, 0))
+            arr[i] = self.code(value) if name in self.string_columns else value
+        extra = {k: v for k, v in row.items() if k not in self.data and k not in self.constants}
+        if extra:
+            self.extras[row["id"]] = extra
+        self.n += 1
+        self._views = None
+
+    def append_many(self, row: dict, n: int):
+        """
+        행 n개를 한 번에 추가 (대량 스폰용). row 값은 스칼라(모든 행 동일) 또는 길이 n 배열.
+        컬럼/상수에 없는 필드(extras)는 받지 않음.
+        """
+        if n <= 0: return
+        while self.n + n > self.capacity:
+            self._grow()
+        rows = slice(self.n, self.n + n)
+        for name, arr in self.data.items():
+            value = row.get(name, self.defaults.get(name, 0))
+            arr[rows] = self.code(value) if name in self.string_columns else value
+        self.n += n
+        self._views = None
+
+    def load(self, rows: list):
+        for row in rows:
+            self.append(row)
+
+    def compact(self, keep):
+        """keep(bool 배열)이 False인 행 제거. 남은 행의 순서는 유지"""
+        if keep.all(): return
+        if self.extras:
+            for oid in self.col("id")[~keep].tolist():
+                self.extras.pop(oid, None)
+        kept = int(keep.sum())
+        for arr in self.data.values():
+            arr[:kept] = arr[:self.n][keep]
+        self.n = kept
+        self._views = None
+
+    def find(self, ids):
+        """id 배열 -> (행 인덱스 배열, 존재 여부 배열)"""
+        ids_col = self.col("id")
+        if self.n == 0:
+            return np.zeros(len(ids), dtype=np.intp), np.zeros(len(ids), dtype=bool)
+        idx = np.minimum(np.searchsorted(ids_col, ids), self.n - 1)
+        return idx, ids_col[idx] == ids
+
+    def find_one(self, oid: int) -> int:
+        """id 1개 -> 행 인덱스 (없으면 -1). 몇 개만 조회할 때는 find()보다 가벼움"""
+        if self.n == 0: return -1
+        ids = self.data["id"]
+        i = int(ids[:self.n].searchsorted(oid))
+        return i if i < self.n and ids.item(i) == oid else -1
+
+    def view(self, oid: int):
+        """id로 행 조회 -> RowView (없으면 None)"""
+        idx, found = self.find(np.array([oid], dtype=np.int64))
+        return RowView(self, int(idx[0])) if found[0] else None
+
+    def views(self) -> list:
+        """살아있는 행들의 RowView 목록 (다음 append/compact 전까지 캐시)"""
+        if self._views is None:
+            self._views = [RowView(self, i) for i in range(self.n)]
+        return self._views
+
+    def to_dicts(self) -> list:
+        if self.derived: self.refresh()
+        values = []
+        for name in self.wire_columns:
+            column = self.col(name).tolist()
+            if name in self.string_columns:
+                column = [self.codes[c] for c in column]
+            values.append(column)
+        rows = []
+        for row_values in zip(*values):
+            row = dict(zip(self.wire_columns, row_values))
+            row.update(self.constants)
+            extra = self.extras.get(row["id"])
+            if extra: row.update(extra)
+            rows.append(row)
+        return rows
+
+class EntityStore(ColumnStore):
+    columns = {
+        "id": np.int64, "type": np.int16,
+        "hp": np.float64, "max_hp": np.float64, "speed": np.float64,
+        "radius": np.int32, "hitbox_radius": np.int32,
+        "x": np.float64, "y": np.float64,
+        "path_index": np.int32,
+        "progress": np.float64, # 출발점부터 이동한 경로 거리(px) = 위치의 기준 상태, 전송하지 않음
+        "slow": np.float64,     # 이동 속도 배율 (얼음 감속, 상태이상 엔진이 갱신), 전송하지 않음
+    }
+    string_columns = ("type",)
+    wire_columns = ("id", "type", "hp", "max_hp", "speed", "radius", "hitbox_radius", "x", "y", "path_index")
+    constants = {"finished": False} # 도착한 엔티티는 같은 틱에 제거되므로 저장소에는 항상 False
+    defaults = {"slow": 1.0}
+    derived = frozenset(("x", "y", "path_index")) # progress에서 계산
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = None    # 마지막 move()의 PathGeometry
+        self.stale = False  # move() 이후 x / y / path_index를 아직 계산하지 않음
+
+    def move(self, path, dt: float):
+        """
+        모든 엔티티를 경로를 따라 speed * slow * dt만큼 이동 (path: PathGeometry).
+        상태는 progress(경로상 이동 거리) 하나이고 여기서는 progress만 진행.
+        x / y / path_index는 처음 읽힐 때 refresh()에서 한 번만 계산 (공간 질의 / 유도 투사체 / 직렬화가 없는 틱은 생략)
+        웨이포인트를 넘는 이동 거리는 다음 구간으로 그대로 이어짐.
+        경로 끝에 도달한 행의 bool 배열을 반환.
+        """
+        if self.n == 0:
+            return np.zeros(0, dtype=bool)
+        progress = self.col("progress")
+        progress += self.col("speed") * self.col("slow") * dt
+        np.minimum(progress, path.total, out=progress)
+        self.path, self.stale = path, True
+        return progress >= path.total
+
+    def refresh(self):
+        if not self.stale: return
+        self.stale = False
+        if self.n:
+            self.col("x")[:], self.col("y")[:], self.col("path_index")[:] = self.path.position(self.col("progress"))
+
+    def positions(self):
+        """이번 틱 위치 (x, y) 컬럼 뷰"""
+        self.refresh()
+        return self.col("x"), self.col("y")
+
+class ProjectileStore(ColumnStore):
+    columns = {
+        "id": np.int64, "dice_id": np.int16,
+        "x": np.float64, "y": np.float64,
+        "target_id": np.int64, "speed": np.float64, "damage": np.float64,
+        "special": np.float64, # 명중 시 부가 효과 수치 (독 데미지, 감속% 등), 전송하지 않음
+    }
+    string_columns = ("dice_id",)
+    wire_columns = ("id", "dice_id", "x", "y", "target_id", "speed", "damage")
+    constants = {"hit": False}
+
+    def advance(self, entities: EntityStore, dt: float):
+        """
+        모든 투사체를 타겟 엔티티 쪽으로 speed * dt만큼 이동.
+        반환: (명중한 투사체 행 인덱스, 그 타겟의 엔티티 행 인덱스, 계속 날아가는 행 bool 배열)
+        타겟이 사라진(사망/도착) 투사체는 명중도 비행도 아님 -> compact 시 소멸
+        """
+        if self.n == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0, dtype=bool)
+
+        tidx, alive = entities.find(self.col("target_id"))
+        x, y = self.col("x"), self.col("y")
+        ex, ey = entities.positions()
+        dx = ex[tidx] - x if entities.n else np.zeros(self.n)
+        dy = ey[tidx] - y if entities.n else np.zeros(self.n)
+        dist = np.hypot(dx, dy)
+        step = self.col("speed") * dt
+        threshold = entities.col("hitbox_radius")[tidx] + 5 if entities.n else np.zeros(self.n)
+
+        hit = alive & ((dist <= threshold) | (dist <= step))
+        fly = alive & ~hit
+        ratio = np.divide(step, dist, out=np.zeros_like(dist), where=fly)
+        x += dx * ratio
+        y += dy * ratio
+
+        hits = np.flatnonzero(hit)
+        return hits, tidx[hits], fly
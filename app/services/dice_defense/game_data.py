@@ -105,4 +105,38 @@ UPGRADE_RULES = {
     }
 }
 
-RARITY_ORDER = {"Common": 1, "Rare": 2, "Hero": 3, "Legend": 4}
\ No newline at end of file
+RARITY_ORDER = {"Common": 1, "Rare": 2, "Hero": 3, "Legend": 4}
+
+# 솔로 모드 웨이브 테이블
+# - duration: 웨이브 길이 (초). 시간이 지나면 다음 웨이브 시작 (이전 웨이브 몹은 그대로 진행)
+# - hp_growth: 웨이브마다 몹 HP 배율 (wave n -> hp_growth ** (n - 1))
+# - count_growth: 테이블보다 뒤의 웨이브는 마지막 웨이브를 반복하며 마리 수에 곱하는 배율
+# - waves: 웨이브별 스폰 그룹 목록
+#     type: ENTITY_MAP 타입, count: 총 마리 수, burst: 한 번에 나오는 마리 수 (기본 1),
+#     interval: 묶음 사이 간격 (초), delay: 웨이브 시작 후 첫 묶음까지 (초, 기본 0)
+WAVE_TABLES = {
+    "standard": {
+        "duration": 30, "hp_growth": 1.15, "count_growth": 1.1,
+        "waves": [
+            [{"type": "normal_mob", "count": 30, "interval": 1.0, "delay": 1.0}],
+            [{"type": "normal_mob", "count": 30, "interval": 1.0},
+             {"type": "fast_mob", "count": 10, "interval": 2.0, "delay": 5.0}],
+            [{"type": "normal_mob", "count": 20, "interval": 1.5},
+             {"type": "tank_mob", "count": 5, "interval": 5.0, "delay": 3.0},
+             {"type": "fast_mob", "count": 10, "burst": 5, "interval": 6.0, "delay": 10.0}],
+            [{"type": "normal_mob", "count": 40, "interval": 0.7},
+             {"type": "boss_mob", "count": 1, "delay": 10.0}],
+        ],
+    },
+    # 부하 테스트용: 수백~천 마리 이상이 동시에 경로 위에 있도록 대량 묶음 스폰
+    "horde": {
+        "duration": 15, "hp_growth": 1.2, "count_growth": 1.25,
+        "waves": [
+            [{"type": "normal_mob", "count": 400, "burst": 25, "interval": 0.5, "delay": 1.0},
+             {"type": "fast_mob", "count": 100, "burst": 20, "interval": 2.0, "delay": 2.0}],
+            [{"type": "normal_mob", "count": 500, "burst": 25, "interval": 0.5},
+             {"type": "tank_mob", "count": 100, "burst": 10, "interval": 1.0, "delay": 1.0},
+             {"type": "fast_mob", "count": 150, "burst": 30, "interval": 2.0}],
+        ],
+    },
+}
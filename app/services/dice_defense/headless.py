@@ -0,0 +1,213 @@
+# app/services/dice_defense/headless.py
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from app.core.sim_clock import VirtualClock
+from app.core.phase_timer import PhaseTimer
+from app.services.dice_defense.game_data import WAVE_TABLES
+from app.services.dice_defense.wave_scheduler import DEFAULT_WAVE_TABLE
+from app.services.dice_defense.modes.solo.game import (
+    SoloGameSession, SIM_FPS, FIXED_DT, NET_RATE, STATUS_RUNNING, PROJECTILE_MODE
+)
+
+# -------------------------------------------------------------------------
+# 헤드리스 시뮬레이션 러너 / 틱 처리량 벤치마크
+# -------------------------------------------------------------------------
+# 소켓 없이 SoloGameSession N개를 가상 시계로 실시간보다 빠르게 돌리며
+# 스크립트된 플레이어(소환/합성 정책)가 명령을 넣습니다.
+#   python -m app.services.dice_defense.headless --sessions 100 --seconds 60 --json
+# 측정 항목: 세션-틱/초, 30Hz 기준 코어당 수용 가능 세션 수, 스텝 구간별 시간,
+# 전체 틱(모든 세션 1회 update) 지연 p50/p99, 세션당 최대 메모리
+
+DEFAULT_DECK = ['fire', 'electric', 'wind', 'ice', 'poison']
+MEMORY_SAMPLE_SESSIONS = 4 # 메모리 측정 패스에서 돌릴 세션 수 (tracemalloc은 느리므로 별도 패스)
+
+# -------------------------------------------------------------
+# 스크립트 플레이어 정책
+# -------------------------------------------------------------
+def spawn_greedy(session):
+    """SP가 되는 한 계속 소환"""
+    while session.process_command({"type": "SPAWN"}):
+        pass
+
+def spawn_none(session):
+    pass
+
+def merge_greedy(session):
+    """합성 가능한 쌍 중 가장 낮은 레벨부터 하나 합성"""
+    cells = sorted(
+        ((cell['dice']['level'], i) for i, cell in enumerate(session.grid) if cell['dice']),
+    )
+    for a in range(len(cells)):
+        for b in range(a + 1, len(cells)):
+            src, tgt = cells[a][1], cells[b][1]
+            if session.process_command({"type": "MERGE", "source_index": src, "target_index": tgt}):
+                return
+
+def merge_none(session):
+    pass
+
+SPAWN_POLICIES = {"greedy": spawn_greedy, "none": spawn_none}
+MERGE_POLICIES = {"greedy": merge_greedy, "none": merge_none}
+
+class ScriptedPlayer:
+    """action_interval(게임 시간)마다 정책대로 명령을 넣는 가상 플레이어"""
+    def __init__(self, session, spawn: str = "greedy", merge: str = "greedy", action_interval: float = 0.5):
+        self.session = session
+        self.spawn = SPAWN_POLICIES[spawn]
+        self.merge = MERGE_POLICIES[merge]
+        self.action_interval = action_interval
+        self.next_action = 0.0
+
+    def act(self):
+        if self.session.sim_time < self.next_action: return
+        self.next_action = self.session.sim_time + self.action_interval
+        self.merge(self.session)
+        self.spawn(self.session)
+
+def build_sessions(count: int, clock, deck=None, seed: int = 0, endless: bool = True, **session_kwargs) -> list:
+    sessions = []
+    for i in range(count):
+        session = SoloGameSession(i + 1, list(deck or DEFAULT_DECK), clock=clock, seed=seed + i, **session_kwargs)
+        if endless:
+            session.lives = 10 ** 9 # 게임 오버 없이 계속 (처리량 측정용)
+        sessions.append(session)
+    return sessions
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def _run(sessions, players, clock, ticks: int, timer=None):
+    """모든 세션을 ticks번 진행. (전체 틱별 소요 시간(초) 목록, 세션당 최대 동시 엔티티 수) 반환"""
+    for session in sessions:
+        session.phase_timer = timer
+    latencies = []
+    peak_entities = 0
+    for _ in range(ticks):
+        clock.advance(FIXED_DT)
+        started = time.perf_counter()
+        for player in players:
+            player.act()
+        for session in sessions:
+            if session.status == STATUS_RUNNING:
+                session.update()
+        latencies.append(time.perf_counter() - started)
+        peak_entities = max(peak_entities, max((len(s.entities) for s in sessions), default=0))
+    return latencies, peak_entities
+
+def measure_memory(ticks: int, sessions: int = MEMORY_SAMPLE_SESSIONS, **options) -> dict:
+    """적은 수의 세션으로 같은 시나리오를 tracemalloc 아래에서 돌려 세션당 메모리 측정"""
+    tracemalloc.start()
+    try:
+        clock = VirtualClock()
+        built = build_sessions(sessions, clock, **options["session"])
+        players = [ScriptedPlayer(s, **options["player"]) for s in built]
+        _run(built, players, clock, ticks)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"current_kb": round(current / sessions / 1024, 1), "peak_kb": round(peak / sessions / 1024, 1)}
+
+def run_benchmark(sessions: int = 50, seconds: float = 60.0, deck=None, spawn: str = "greedy", merge: str = "greedy",
+                  action_interval: float = 0.5, seed: int = 0, endless: bool = True, net_rate: int = NET_RATE,
+                  projectile_mode: str = PROJECTILE_MODE, wave_table: str = DEFAULT_WAVE_TABLE, memory: bool = True) -> dict:
+    """
+    헤드리스 벤치마크 실행 후 결과 dict 반환 (릴리즈별 추적용으로 JSON 그대로 저장 가능)
+    seconds: 시뮬레이션할 게임 시간 (초)
+    """
+    ticks = int(round(seconds * SIM_FPS))
+    options = {
+        "session": {"deck": deck, "seed": seed, "endless": endless, "net_rate": net_rate, "projectile_mode": projectile_mode,
+                    "wave_table": wave_table},
+        "player": {"spawn": spawn, "merge": merge, "action_interval": action_interval},
+    }
+    clock = VirtualClock()
+    built = build_sessions(sessions, clock, **options["session"])
+    players = [ScriptedPlayer(s, **options["player"]) for s in built]
+    timer = PhaseTimer()
+
+    started = time.perf_counter()
+    latencies, peak_entities = _run(built, players, clock, ticks, timer)
+    elapsed = time.perf_counter() - started
+
+    session_ticks = sum(s.tick for s in built)
+    latencies.sort()
+    result = {
+        "config": {
+            "sessions": sessions, "seconds": seconds, "ticks": ticks, "sim_fps": SIM_FPS,
+            **options["session"], "deck": list(deck or DEFAULT_DECK), **options["player"],
+        },
+        "elapsed_s": round(elapsed, 3),
+        "realtime_factor": round(seconds / elapsed, 2) if elapsed else None,
+        "session_ticks_per_sec": round(session_ticks / elapsed, 1) if elapsed else None,
+        "sessions_per_core": round(session_ticks / elapsed / SIM_FPS, 1) if elapsed else None,
+        "tick_latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "phases": timer.report(),
+        "final": {
+            "entities": sum(len(s.entities) for s in built),
+            "projectiles": sum(len(s.projectiles) for s in built),
+            "finished": sum(1 for s in built if s.status != STATUS_RUNNING),
+            "peak_entities": peak_entities,
+            "wave": max((s.wave for s in built), default=0),
+        },
+    }
+    if memory:
+        result["memory_per_session"] = measure_memory(ticks, min(sessions, MEMORY_SAMPLE_SESSIONS), **options)
+    return result
+
+def _print_report(result: dict):
+    cfg = result["config"]
+    print(f"[headless] {cfg['sessions']} sessions x {cfg['seconds']}s game time ({cfg['ticks']} ticks, "
+          f"projectile={cfg['projectile_mode']}, waves={cfg['wave_table']})")
+    print(f"  elapsed          {result['elapsed_s']} s  (x{result['realtime_factor']} realtime)")
+    print(f"  throughput       {result['session_ticks_per_sec']} session-ticks/s  (~{result['sessions_per_core']} sessions/core @ {cfg['sim_fps']}Hz)")
+    lat = result["tick_latency_ms"]
+    print(f"  tick latency     p50 {lat['p50']} ms / p99 {lat['p99']} ms / max {lat['max']} ms")
+    for phase, stat in sorted(result["phases"].items(), key=lambda kv: -kv[1]["share"]):
+        print(f"  phase {phase:<11} {stat['share'] * 100:5.1f}%  {stat['mean_us']} us/step")
+    if "memory_per_session" in result:
+        mem = result["memory_per_session"]
+        print(f"  memory/session   {mem['current_kb']} KB (peak {mem['peak_kb']} KB)")
+    final = result["final"]
+    print(f"  final            {final['entities']} entities, {final['projectiles']} projectiles, {final['finished']} finished")
+    print(f"  peak             {final['peak_entities']} entities in one session, wave {final['wave']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dice Defense headless simulation benchmark")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=60.0, help="simulated game time per session")
+    parser.add_argument("--deck", default=",".join(DEFAULT_DECK), help="comma separated dice ids")
+    parser.add_argument("--spawn", choices=sorted(SPAWN_POLICIES), default="greedy")
+    parser.add_argument("--merge", choices=sorted(MERGE_POLICIES), default="greedy")
+    parser.add_argument("--action-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--net-rate", type=int, default=NET_RATE)
+    parser.add_argument("--projectile-mode", choices=["homing", "analytic"], default=PROJECTILE_MODE)
+    parser.add_argument("--waves", choices=sorted(WAVE_TABLES), default=DEFAULT_WAVE_TABLE, help="wave table (horde = stress test)")
+    parser.add_argument("--finite", action="store_true", help="keep normal lives (sessions can end)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc memory pass")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        sessions=args.sessions, seconds=args.seconds, deck=args.deck.split(","),
+        spawn=args.spawn, merge=args.merge, action_interval=args.action_interval, seed=args.seed,
+        endless=not args.finite, net_rate=args.net_rate, projectile_mode=args.projectile_mode, wave_table=args.waves,
+        memory=not args.no_memory,
+    )
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(result)
+    return result
+
+if __name__ == "__main__":
+    main()
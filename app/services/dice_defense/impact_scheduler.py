@@ -0,0 +1,183 @@
+# app/services/dice_defense/impact_scheduler.py
+import math
+import numpy as np
+from app.core.timer_wheel import TimerWheel
+from app.services.dice_defense.entity_store import ProjectileStore
+
+# -------------------------------------------------------------------------
+# 투사체 명중 시각 예약 (projectile_mode = "analytic")
+# -------------------------------------------------------------------------
+# 몹은 알려진 경로를 알려진 속도로 움직이므로, 투사체를 쏘는 순간 명중 시각을 계산해서
+# 그 틱에 TimerWheel 이벤트로 예약합니다. 매 틱 유도 이동/거리 계산(homing)을 하지 않습니다.
+# - 다시 계산하는 경우: 타겟 속도가 바뀜 (감속 적용/해제 -> replan_target)
+# - 타겟이 사망/도착으로 사라지면 투사체도 즉시 제거 (drop_orphans)
+# - 클라이언트에는 x / y 대신 시작점(sx, sy, t0)과 명중점(ex, ey, t1)만 보내 직접 보간하게 함
+#   (투사체당 값이 재계산 전까지 변하지 않으므로 델타 프레임에도 실리지 않음)
+#   서버의 x / y는 재계산 / 복원 시점에만 직선 보간으로 채움 (sync_positions)
+# - 휴면 스냅샷 복원 시에는 다시 계산하지 않고 저장된 명중 틱으로 재예약 (복원 전후 시뮬레이션이 동일)
+# - 서버 비용: 투사체당 발사 1회 + 명중 1회 (O(projectiles)), 틱 수에 비례하지 않음
+# - 요격 시각은 경로 구간마다 2차 방정식의 근으로 바로 구함 (반복 계산 없음, intercept_time)
+
+HIT_MARGIN = 5   # homing 모드와 같은 명중 판정 여유 (hitbox_radius + 5)
+NO_HITS = np.zeros(0, dtype=np.intp)
+
+def intercept_time(path, progress: float, mob_speed: float, sx: float, sy: float, speed: float, reach: float) -> float:
+    """
+    (sx, sy)에서 speed로 직진하는 투사체가 경로 위 progress에서 mob_speed로 움직이는 몹에
+    reach 이내로 닿는 최소 시각 (초).
+    구간 안에서 몹 위치는 M + V*t 이므로 |M + V*t - S| = reach + speed*t 를 제곱한 2차식을
+    구간별로 풀고, 구간 끝까지 못 닿으면 다음 구간으로 넘어감. 경로 끝에서는 몹이 멈춘 것으로 계산.
+    """
+    t_base = 0.0
+    if mob_speed > 0:
+        for c0, c1, x0, y0, dx, dy in path.segments:
+            if progress > c1: continue
+            along = progress - c0
+            px, py = x0 + dx * along - sx, y0 + dy * along - sy
+            vx, vy = dx * mob_speed, dy * mob_speed
+            r = reach + speed * t_base
+            c = px * px + py * py - r * r
+            if c <= 0: return t_base # 이미 사거리 안
+            a = vx * vx + vy * vy - speed * speed
+            b = 2.0 * (px * vx + py * vy - speed * r)
+            seg_time = (c1 - progress) / mob_speed
+            if a == 0:
+                roots = (-c / b,) if b else ()
+            else:
+                disc = b * b - 4.0 * a * c
+                if disc < 0:
+                    roots = ()
+                else:
+                    sq = math.sqrt(disc)
+                    roots = sorted(((-b - sq) / (2.0 * a), (-b + sq) / (2.0 * a)))
+            for tau in roots:
+                if 0.0 < tau <= seg_time:
+                    return t_base + tau
+            t_base += seg_time
+            progress = c1
+    ex, ey = path.point(progress)
+    return max(t_base, (math.hypot(ex - sx, ey - sy) - reach) / speed)
+
+class AnalyticProjectileStore(ProjectileStore):
+    columns = {
+        **ProjectileStore.columns,
+        "sx": np.float64, "sy": np.float64, "t0": np.int64, # 발사(또는 재계산) 위치 / 틱
+        "ex": np.float64, "ey": np.float64, "t1": np.int64, # 명중 위치 / 틱
+        "plan": np.int64, # 재계산 횟수 (이전 예약 무효화용), 전송하지 않음
+    }
+    wire_columns = ("id", "dice_id", "target_id", "speed", "damage", "sx", "sy", "t0", "ex", "ey", "t1")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tick = 0
+
+    def sync_positions(self, tick: int = None):
+        """x / y를 tick 시점의 직선 보간 위치로 갱신"""
+        if tick is not None: self.tick = tick
+        if self.n == 0: return
+        t0, t1 = self.col("t0"), self.col("t1")
+        frac = np.clip((self.tick - t0) / np.maximum(t1 - t0, 1), 0.0, 1.0)
+        sx, sy = self.col("sx"), self.col("sy")
+        self.col("x")[:] = sx + (self.col("ex") - sx) * frac
+        self.col("y")[:] = sy + (self.col("ey") - sy) * frac
+
+class ImpactScheduler:
+    def __init__(self, projectiles: AnalyticProjectileStore, entities, path, dt: float):
+        self.projectiles = projectiles
+        self.entities = entities
+        self.path = path # PathGeometry
+        self.dt = dt
+        self.wheel = TimerWheel()
+        self.tick = 0
+
+    def begin_step(self, tick: int):
+        """스텝 시작 시 호출 (이후 재계산/보간 기준 틱)"""
+        self.tick = tick
+        self.projectiles.tick = tick
+
+    def _solve(self, x: float, y: float, speed: float, target_id: int, tick: int):
+        """(x, y)에서 발사된 투사체의 (명중 x, 명중 y, 명중 틱). 타겟이 없으면 None"""
+        e = self.entities
+        j = e.find_one(target_id)
+        if j < 0: return None
+        ed = e.data
+        progress = ed["progress"].item(j)
+        mob_speed = ed["speed"].item(j) * ed["slow"].item(j)
+        t = intercept_time(self.path, progress, mob_speed, x, y, max(speed, 1e-9), ed["hitbox_radius"].item(j) + HIT_MARGIN)
+        n = max(1, math.ceil(t / self.dt - 1e-9))
+        ex, ey = self.path.point(progress + mob_speed * n * self.dt)
+        return ex, ey, tick + n
+
+    def fire(self, row: dict, tick: int):
+        """
+        새 투사체(append 전 row dict)의 명중 시각을 계산해서 row에 채우고 예약.
+        발사 시 한 번만 계산하며 한 스텝에 몇 발뿐이므로 스칼라 계산 (배열 연산 호출 비용이 더 큼)
+        """
+        hit = self._solve(row["x"], row["y"], row["speed"], row["target_id"], tick)
+        if hit is None: return # 예약 없이 추가되고 drop_orphans에서 제거
+        row["sx"], row["sy"], row["t0"] = row["x"], row["y"], tick
+        row["ex"], row["ey"], row["t1"] = hit
+        row["plan"] = 1
+        self.wheel.schedule(row["t1"], (row["id"], 1))
+
+    def plan(self, rows, tick: int):
+        """projectiles의 rows(행 인덱스 목록)에 대해 현재 위치(x, y)에서 명중 시각 다시 계산 후 예약"""
+        pd = self.projectiles.data
+        for i in rows:
+            x, y = pd["x"].item(i), pd["y"].item(i)
+            hit = self._solve(x, y, pd["speed"].item(i), pd["target_id"].item(i), tick)
+            if hit is None: continue # 타겟이 없는 투사체는 drop_orphans에서 제거
+            pd["sx"][i], pd["sy"][i], pd["t0"][i] = x, y, tick
+            pd["ex"][i], pd["ey"][i], pd["t1"][i] = hit
+            plan = pd["plan"].item(i) + 1
+            pd["plan"][i] = plan
+            self.wheel.schedule(hit[2], (pd["id"].item(i), plan))
+
+    def replan_target(self, entity_id: int):
+        """타겟 속도가 바뀜 -> 그 타겟을 노리는 투사체를 현재 위치에서 다시 계산"""
+        p = self.projectiles
+        if p.n == 0: return
+        p.sync_positions(self.tick)
+        self.plan(np.flatnonzero(p.col("target_id") == entity_id).tolist(), self.tick)
+
+    def drop_orphans(self):
+        """타겟이 사라진 투사체 제거 (엔티티가 제거된 스텝에만 호출)"""
+        p = self.projectiles
+        if p.n == 0: return
+        _, alive = self.entities.find(p.col("target_id"))
+        p.compact(alive)
+
+    def due(self, tick: int):
+        """
+        tick에 명중하는 투사체. 반환 형식은 ProjectileStore.advance와 동일:
+        (명중 투사체 행 인덱스, 타겟 엔티티 행 인덱스, 남길 행 bool 배열)
+        이번 틱에 예약이 없으면 (대부분의 틱) 남길 행은 None (전부 유지, compact 생략)
+        """
+        p, e = self.projectiles, self.entities
+        events = self.wheel.pop_due(tick)
+        if not events:
+            return NO_HITS, NO_HITS, None
+        keep = np.ones(p.n, dtype=bool)
+        hits = []
+        plans, targets = p.data["plan"], p.data["target_id"]
+        for pid, plan in events:
+            i = p.find_one(pid)
+            if i < 0 or plans.item(i) != plan: continue # 재계산으로 무효화된 예약
+            j = e.find_one(targets.item(i))
+            if j >= 0: hits.append((i, j))
+        hits.sort() # homing 모드와 같은 처리 순서 (발사 순)
+        rows = np.array([i for i, _ in hits], dtype=np.intp)
+        tidx = np.array([j for _, j in hits], dtype=np.intp)
+        keep[rows] = False
+        return rows, tidx, keep
+
+    # 직렬화 (휴면 스냅샷): 예약 자체는 저장하지 않고 스냅샷의 명중 틱(t1)으로 그대로 다시 예약
+    # (현재 위치에서 다시 계산하면 명중 틱이 달라져 복원한 세션이 원래 세션과 갈라짐)
+    def load(self, tick: int):
+        self.begin_step(tick)
+        p = self.projectiles
+        p.sync_positions(tick) # 스냅샷에는 x / y가 없으므로 sx..t1에서 복원
+        planned = p.col("t1") > tick # 예약 없이 발사된 투사체(타겟 없음)는 t1 = 0
+        p.col("plan")[:] = planned
+        for pid, t1 in zip(p.col("id")[planned].tolist(), p.col("t1")[planned].tolist()):
+            self.wheel.schedule(t1, (pid, 1))
@@ -0,0 +1,65 @@
+# app/services/dice_defense/lockstep.py
+import inspect
+from app.services.dice_defense.replay import apply_event
+from app.services.dice_defense.modes.solo.game import SoloGameSession, FIXED_DT, HASH_INTERVAL, STATUS_FINISHED
+
+# -------------------------------------------------------------------------
+# 결정적 락스텝 동기화
+# -------------------------------------------------------------------------
+# sync_mode="lockstep" 세션은 전체 상태 대신 (틱 번호 + 적용된 입력)만 보내고
+# 클라이언트가 같은 시드로 같은 시뮬레이션을 돌립니다. 프레임 크기가 엔티티 수와 무관하고
+# 서버는 틱마다 상태를 직렬화하지 않습니다.
+#   서버 -> 클라 LOCKSTEP_RESYNC {snapshot, hash_interval}  접속 직후 / RESYNC 요청 시 전체 상태
+#   서버 -> 클라 LOCKSTEP {tick, events, hashes}            net_rate마다 (입력은 리플레이 로그 형식)
+#   클라 -> 서버 RESYNC                                      해시 불일치 시
+# LockstepMirror는 클라이언트 쪽 동작의 기준 구현 (프로토콜 명세 + 서버 측 검증/부하 테스트용)
+
+async def build_resync(session) -> dict:
+    """전체 상태 재동기화 메시지 (샤딩 모드면 워커에서 스냅샷을 받아옴)"""
+    snapshot = session.to_snapshot()
+    if inspect.isawaitable(snapshot):
+        snapshot = await snapshot
+    return {"type": "LOCKSTEP_RESYNC", "hash_interval": HASH_INTERVAL, "snapshot": snapshot}
+
+class LockstepMirror:
+    def __init__(self):
+        self.session = None
+        self.base_tick = 0   # 마지막 재동기화 시점 (이전 틱의 입력/해시는 이미 스냅샷에 반영됨)
+        self.verified = 0    # 일치한 해시 수
+        self.mismatches = 0
+        self.waiting = False # RESYNC 요청 후 응답 대기 중
+
+    def on_message(self, message: dict):
+        """서버 메시지 처리. 서버로 보낼 응답이 있으면 반환 (해시 불일치 -> RESYNC)"""
+        mtype = message.get("type")
+        if mtype == "LOCKSTEP_RESYNC":
+            self.session = SoloGameSession.from_snapshot(message["snapshot"])
+            self.base_tick = self.session.tick
+            self.waiting = False
+        elif mtype == "LOCKSTEP" and self.session is not None and not self.waiting:
+            if not self._advance(message):
+                self.mismatches += 1
+                self.waiting = True
+                return {"type": "RESYNC"}
+        return None
+
+    def _advance(self, frame: dict) -> bool:
+        session = self.session
+        hashes = [h for h in frame.get("hashes", []) if h[0] > self.base_tick]
+
+        def run_to(tick):
+            # tick까지 진행하면서 지나가는 틱의 해시 확인
+            while session.tick < tick and session.status != STATUS_FINISHED:
+                session._step(FIXED_DT)
+                while hashes and hashes[0][0] <= session.tick:
+                    expected = hashes.pop(0)
+                    if expected[0] == session.tick:
+                        if session.state_hash() != expected[1]: return False
+                        self.verified += 1
+            return True
+
+        for event in frame.get("events", []):
+            if event[0] < self.base_tick: continue
+            if not run_to(event[0]): return False
+            self.session = session = apply_event(session, event)
+        return run_to(frame["tick"])
@@ -1,27 +1,98 @@
 # app/services/dice_defense/modes/solo/game.py
+import os
+import json
 import uuid
+import hashlib
 import random
-import time
-import math
-from app.services.dice_defense.dice import get_dice_logic
+import numpy as np
+from app.core.sim_clock import default_clock
+from app.services.dice_defense.dice import get_dice_logic, compile_dice_stats
 from app.services.dice_defense.entities import get_entity_manager
+from app.services.dice_defense.entity_store import EntityStore, ProjectileStore
+from app.services.dice_defense.spatial_hash import SpatialHash
+from app.services.dice_defense.target_index import TargetIndex
+from app.services.dice_defense.status_effects import StatusEffects
+from app.services.dice_defense.impact_scheduler import AnalyticProjectileStore, ImpactScheduler
+from app.services.dice_defense.path_geometry import get_path_geometry
+from app.services.dice_defense.replay_log import ReplayLog
+from app.services.dice_defense.wave_scheduler import WaveScheduler, DEFAULT_WAVE_TABLE
+
+# 고정 시간 간격 시뮬레이션 설정
+SIM_FPS = 30
+FIXED_DT = 1.0 / SIM_FPS
+MAX_SUBSTEPS = 5 # 한 번의 update()에서 따라잡을 수 있는 최대 스텝 수
+STEP_EPSILON = 1e-9 # 부동소수 누적 오차 보정
+NET_RATE = 15 # 기본 네트워크 전송 주기 (Hz), 시뮬레이션 주기와 별개
+MAX_PENDING_COMMANDS = 32 # 다음 틱까지 쌓아둘 수 있는 입력 수 (넘으면 버림)
+
+# 클라이언트 동기화 방식
+# - state:    net_rate마다 전체 상태(STATE_UPDATE)를 전송 (기존 방식)
+# - lockstep: 시드 + 틱 번호 + 적용된 입력만 전송 (LOCKSTEP), 클라이언트가 같은 시뮬레이션을 돌림
+#             HASH_INTERVAL 틱마다 상태 해시를 함께 보내 어긋나면 클라이언트가 RESYNC 요청
+SYNC_STATE = "state"
+SYNC_LOCKSTEP = "lockstep"
+HASH_INTERVAL = 30
+# 번들 웹 클라이언트(game.js)는 시뮬레이션을 돌리지 않으므로 락스텝은 서버 플래그로 명시적으로 켠 경우만 허용
+LOCKSTEP_ENABLED = os.environ.get("DICE_LOCKSTEP_ENABLED", "0") == "1"
+
+# 투사체 처리 방식
+# - homing:   매 틱 타겟 쪽으로 이동하며 거리로 명중 판정 (기존 방식)
+# - analytic: 발사 시 명중 틱을 계산해서 예약 (impact_scheduler.py)
+PROJECTILE_HOMING = "homing"
+PROJECTILE_ANALYTIC = "analytic"
+PROJECTILE_MODE = os.environ.get("DICE_PROJECTILE_MODE", PROJECTILE_HOMING)
+
+# 세션 상태
+STATUS_RUNNING = "running"   # 시뮬레이션 진행 중
+STATUS_PAUSED = "paused"     # 접속한 소켓이 없음 (틱 비용 0)
+STATUS_FINISHED = "finished" # 게임 오버 (TTL 후 정리)
+STATUS_EVICTED = "evicted"   # 서버 메모리에서 제거됨
+STATUS_HIBERNATED = "hibernated" # 디스크에 저장 후 메모리에서 제거됨 (재접속 시 복원)
+
+SNAPSHOT_VERSION = 5 # to_snapshot() 형식 버전 (2: entity_progress 추가, 3: seed / replay 추가, 4: waves 추가, 5: projectile_special 추가)
 
 class SoloGameSession:
-    def __init__(self, user_id: int, deck: list):
+    def __init__(self, user_id: int, deck: list, clock=None, net_rate: int = NET_RATE, class_levels: dict = None,
+                 projectile_mode: str = None, seed: int = None, wave_table: str = None, sync_mode: str = None):
         self.game_id = str(uuid.uuid4())
         self.user_id = user_id
         self.deck = deck
+        self.class_levels = class_levels or {} # dice_id -> 유저 클래스 레벨 (user_dice.class_level)
         
         self.sp = 100       
         self.spawn_cost = 10
         self.lives = 3
         self.wave = 1
+        self.status = STATUS_RUNNING
         
-        self.entities = [] 
+        # 세션 전용 난수 생성기 (직렬화/복원 시 상태까지 그대로 이어짐)
+        # 시드를 리플레이 로그에 남기므로 같은 입력이면 같은 게임이 재현됨
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        
+        self.entities = EntityStore()
         self.entity_id_counter = 0
+        self.spatial = SpatialHash() # 엔티티 위치 공간 인덱스 (스텝마다 재구성)
+        self.targets = TargetIndex(self.rng) # 경로 진행 순 타겟 선정 캐시 (스텝마다 재구성)
+        self.effects = StatusEffects(self.entities, SIM_FPS) # 상태이상 (독 DoT, 얼음 감속)
+        
+        # 시간 관리: 벽시계 대신 주입 가능한 clock 사용
+        # sim_time은 고정 스텝(FIXED_DT)만큼씩만 증가하는 게임 내부 시간
+        self.clock = clock or default_clock
+        self.sim_time = 0.0
+        self.tick = 0
+        self.accumulator = 0.0
+        self.dropped_time = 0.0 # 스텝 상한으로 버려진 누적 시간 (과부하 지표)
+        self.phase_timer = None # PhaseTimer / metrics.profiler를 지정하면 스텝 구간별 시간 측정
+        self.damage_meter = None # dice_id별 누적 유효 데미지 (track_damage() 호출 시에만 집계)
         
-        self.last_spawn_time = time.time()
-        self.spawn_interval = 1.0 
+        # 네트워크 전송 주기: net_rate Hz마다 한 번만 상태를 반환 (최대 SIM_FPS)
+        self.net_rate = max(1, min(SIM_FPS, net_rate))
+        self.net_interval_ticks = SIM_FPS / self.net_rate
+        self.last_sent_tick = 0
+        
+        # 몹 스폰: game_data.WAVE_TABLES 기반 웨이브 스케줄 (horde = 대량 스폰 부하 테스트)
+        self.waves = WaveScheduler(wave_table or DEFAULT_WAVE_TABLE, SIM_FPS)
         
         # 맵 설정
         self.width = 1080
@@ -35,15 +106,39 @@ class SoloGameSession:
             {'x': 6.5, 'y': -0.5}, {'x': 6.5, 'y': 4.0},
         ]
         self.pixel_path = [self._to_pixel(p['x'], p['y']) for p in self.path]
+        # 호 길이 기반 경로 (구간 누적 거리 / 단위 방향, 같은 맵이면 세션끼리 공유)
+        self.path_geom = get_path_geometry(tuple((p['x'], p['y']) for p in self.pixel_path))
         
         self.grid = []
         self._init_grid()
         
-        self.last_update_time = time.time()
+        # 덱 주사위 스탯 테이블 (클래스 레벨 반영, 게임 시작 시 한 번만 컴파일)
+        self.dice_stats = compile_dice_stats(self.deck, self.class_levels, dice_size=self.grid[0]['w'])
+        
+        self.last_update_time = self.clock.now()
         
         # 투사체 관리
-        self.projectiles = [] 
+        self.projectile_mode = projectile_mode or PROJECTILE_MODE
+        self.impacts = None
+        if self.projectile_mode == PROJECTILE_ANALYTIC:
+            self.projectiles = AnalyticProjectileStore()
+            self.impacts = ImpactScheduler(self.projectiles, self.entities, self.path_geom, FIXED_DT)
+            self.effects.on_speed_change = self.impacts.replan_target
+        else:
+            self.projectiles = ProjectileStore()
         self.projectile_id_counter = 0
+        
+        # 입력 큐: 소켓에서 받은 명령은 바로 적용하지 않고 다음 스텝 시작 시 한 번에 적용
+        self.pending_commands = []
+        self.command_stats = {"applied": 0, "rejected": 0, "coalesced": 0, "dropped": 0}
+        
+        # 리플레이 로그 (시드 + 틱별 입력, replay.py로 재현)
+        self.replay = ReplayLog(self.seed, self.deck, self.class_levels, self.projectile_mode, self.waves.table)
+        
+        # 락스텝 동기화: 리플레이 로그 중 아직 보내지 않은 입력 위치 + 보낼 상태 해시
+        self.sync_mode = sync_mode or SYNC_STATE
+        self.sent_events = 0
+        self.pending_hashes = []
 
     def _to_pixel(self, ux, uy):
         return { 'x': self.offset_x + ux * self.unit, 'y': self.offset_y + uy * self.unit }
@@ -67,42 +162,95 @@ class SoloGameSession:
                 })
 
     def update(self):
-        current_time = time.time()
-        dt = current_time - self.last_update_time
-        self.last_update_time = current_time
-        
-        # 1. 몹 스폰
-        if current_time - self.last_spawn_time >= self.spawn_interval:
-            self._spawn_entity('normal_mob')
-            self.last_spawn_time = current_time
-            
-        # 2. 엔티티 상태 업데이트 (이동, 사망, 도착 처리)
-        active_entities = []
-        entity_map = {} # ID로 살아있는 엔티티 조회용
-        
-        for entity in self.entities:
-            # 2-1. 이동 로직 실행
-            manager = get_entity_manager(entity['type'])
-            manager.update_move(entity, self.pixel_path, dt)
-            
-            # 2-2. 사망 체크 (HP <= 0)
-            if entity['hp'] <= 0:
-                self.sp += 500 # 사망 보상 (테스트용 50)
-                continue # 리스트에 추가하지 않음 -> 삭제됨
-            
-            # 2-3. 도착 체크
-            if entity.get('finished'):
-                self.lives -= 1
-                self.sp += 50 # 도착해도 보상 지급 (요청사항)
-                continue # 리스트에 추가하지 않음 -> 삭제됨
+        """
+        고정 시간 간격(Fixed Timestep) 업데이트.
+        실제 경과 시간을 accumulator에 쌓고 FIXED_DT 단위로 _step()을 실행합니다.
+        루프가 멈췄다가 재개되어도 큰 dt 한 번이 아니라 작은 스텝 여러 번으로 따라잡으며,
+        MAX_SUBSTEPS를 넘는 지연은 버려서 (게임이 느려질 뿐) 폭주하지 않습니다.
+        진행된 스텝이 없거나 네트워크 전송 시점(net_rate)이 아니면 None을 반환합니다 (브로드캐스트 생략).
+        일시정지/종료된 세션은 진행하지 않으며, 게임 오버가 된 스텝의 최종 상태는 항상 반환합니다.
+        """
+        if self.status != STATUS_RUNNING:
+            return None
+        
+        now = self.clock.now()
+        self.accumulator += max(0.0, now - self.last_update_time)
+        self.last_update_time = now
+        
+        lockstep = self.sync_mode == SYNC_LOCKSTEP
+        steps = 0
+        while self.accumulator + STEP_EPSILON >= FIXED_DT and steps < MAX_SUBSTEPS:
+            self._step(FIXED_DT)
+            self.accumulator -= FIXED_DT
+            steps += 1
+            if lockstep and self.tick % HASH_INTERVAL == 0:
+                self.pending_hashes.append([self.tick, self.state_hash()])
+            if self.status == STATUS_FINISHED:
+                self.last_sent_tick = self.tick
+                return self.get_lockstep_frame() if lockstep else self.get_broadcast_state()
+        
+        if self.accumulator + STEP_EPSILON >= FIXED_DT:
+            # 따라잡기 상한 초과 -> 남은 지연은 폐기
+            self.dropped_time += self.accumulator
+            self.accumulator = 0.0
+        
+        if steps == 0:
+            return None
+        if self.tick - self.last_sent_tick + STEP_EPSILON < self.net_interval_ticks:
+            return None
+        self.last_sent_tick = self.tick
+        timer = self.phase_timer
+        if timer: timer.begin()
+        state = self.get_lockstep_frame() if lockstep else self.get_broadcast_state()
+        if timer: timer.mark('serialize')
+        return state
+
+    def _step(self, dt: float):
+        """게임 로직 1스텝 진행 (dt는 항상 FIXED_DT)"""
+        timer = self.phase_timer
+        if timer: timer.begin()
+        # 0. 지난 틱 이후 들어온 입력 일괄 적용 (틱 경계에서만 상태가 바뀜)
+        if self.pending_commands:
+            self._apply_commands()
+        self.sim_time += dt
+        self.tick += 1
+        current_time = self.sim_time
+        
+        # 1. 몹 스폰 (이번 틱에 도래한 웨이브 묶음을 묶음 단위로 한 번에 추가)
+        for entity_type, count, hp_scale in self.waves.due(self.tick):
+            self._spawn_entities(entity_type, count, hp_scale)
+        self.wave = self.waves.wave
+        if timer: timer.mark('spawn')
+        
+        if self.impacts:
+            self.impacts.begin_step(self.tick)
+        
+        # 1-1. 상태이상 (이번 틱에 도래한 독 데미지 / 만료만 처리)
+        self.effects.advance(self.tick)
+        if timer: timer.mark('effects')
             
-            # 살아남은 엔티티만 유지
-            active_entities.append(entity)
-            entity_map[entity['id']] = entity
-                
-        self.entities = active_entities
+        # 2. 엔티티 상태 업데이트 (이동, 사망, 도착 처리) - 전체 행을 배열 연산으로 처리
+        entities = self.entities
+        # 2-1. 이동
+        finished = entities.move(self.path_geom, dt)
+        # 2-2. 사망 체크 (HP <= 0): 사망 보상 (테스트용 50)
+        dead = entities.col('hp') <= 0
+        # 2-3. 도착 체크 (사망하지 않은 경우만): 도착해도 보상 지급 (요청사항)
+        arrived = finished & ~dead
+        dead_count, arrived_count = int(dead.sum()), int(arrived.sum())
+        self.sp += 500 * dead_count + 50 * arrived_count
+        self.lives -= arrived_count
+        # 살아남은 엔티티만 유지
+        entities.compact(~(dead | arrived))
+        if self.impacts and (dead_count or arrived_count):
+            self.impacts.drop_orphans() # 사라진 타겟을 노리던 투사체 제거
+        # 이번 스텝 위치로 공간 인덱스 갱신 (명중 처리 중에는 위치가 변하지 않음, 첫 범위 질의 때 계산)
+        self.spatial.rebuild_lazy(entities.positions)
+        if timer: timer.mark('move')
         
         # 3. 주사위 공격 처리
+        mobs = entities.views() # 살아있는 엔티티만 타게팅 후보로 전달
+        self.targets.rebuild(mobs, entities.col('progress'), entities.col('hp'))
         for cell in self.grid:
             dice = cell['dice']
             if dice:
@@ -112,32 +260,60 @@ class SoloGameSession:
                 
                 logic = get_dice_logic(dice['id'])
                 
-                # 살아있는 엔티티(active_entities)만 타게팅 후보로 전달
                 projectiles_list = logic.update_attack(
-                    dice, self.entities, dt, current_time, dice_size=cell['w']
+                    dice, mobs, dt, current_time, dice_size=cell['w'],
+                    targets=self.targets, stats=self.dice_stats.get(dice['id'])
                 )
                 
                 if projectiles_list:
                     self._spawn_projectiles(projectiles_list)
 
+        if timer: timer.mark('attack')
+        
         # 4. 투사체 이동 및 충돌 처리
-        self._update_projectiles(dt, entity_map)
+        self._update_projectiles(dt, mobs)
+        if timer: timer.mark('projectiles')
         
-        return self.get_broadcast_state()
+        # 5. 게임 오버 체크
+        if self.lives <= 0:
+            self.status = STATUS_FINISHED
 
-    def _spawn_entity(self, entity_type: str):
-        self.entity_id_counter += 1
+    def pause(self):
+        """시뮬레이션 정지 (보는 사람이 없음)"""
+        if self.status == STATUS_RUNNING:
+            self.status = STATUS_PAUSED
+
+    def resume(self):
+        """정지된 시간만큼 한꺼번에 따라잡지 않도록 시계 기준점을 재설정"""
+        if self.status == STATUS_PAUSED:
+            self.status = STATUS_RUNNING
+            self.last_update_time = self.clock.now()
+            self.accumulator = 0.0
+
+    def _spawn_entities(self, entity_type: str, count: int, hp_scale: float = 1.0):
+        """같은 타입 엔티티 count마리를 출발점에 한 번에 추가 (id는 연속 발급)"""
         start_node = self.pixel_path[0]
-        
-        manager = get_entity_manager(entity_type)
-        new_entity_state = manager.create_state(self.entity_id_counter, start_node)
-        
-        self.entities.append(new_entity_state)
+        stats = get_entity_manager(entity_type).default_stats
+        first_id = self.entity_id_counter + 1
+        self.entity_id_counter += count
+        hp = stats["hp"] * hp_scale
+        self.entities.append_many({
+            "id": np.arange(first_id, first_id + count),
+            "type": stats["type"],
+            "hp": hp,
+            "max_hp": hp,
+            "speed": stats["speed"],
+            "radius": stats["radius"],
+            "hitbox_radius": stats["hitbox_radius"],
+            "x": start_node['x'],
+            "y": start_node['y'],
+        }, count)
 
     def _spawn_projectiles(self, proj_list):
+        impacts = self.impacts
         for info in proj_list:
             self.projectile_id_counter += 1
-            self.projectiles.append({
+            row = {
                 'id': self.projectile_id_counter,
                 'dice_id': info['dice_id'],
                 'x': info['start_x'],
@@ -145,53 +321,115 @@ class SoloGameSession:
                 'target_id': info['target_id'],
                 'speed': info['speed'],
                 'damage': info['damage'],
-                'hit': False
-            })
+                'special': info.get('special', 0),
+            }
+            if impacts: # analytic: 발사 시점에 명중 틱 계산 / 예약
+                impacts.fire(row, self.tick)
+            self.projectiles.append(row)
 
-    def _update_projectiles(self, dt, entity_map):
-        active_projectiles = []
-        
-        for proj in self.projectiles:
-            # 타겟 조회
-            target = entity_map.get(proj['target_id'])
-            
-            # [핵심 로직] 타겟이 entity_map에 없다면 (사망했거나 도착해서 사라짐)
-            # 투사체도 즉시 소멸 (continue)
-            if not target:
-                continue
-                
-            dx = target['x'] - proj['x']
-            dy = target['y'] - proj['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            move_dist = proj['speed'] * dt
-            
-            hit_threshold = target['hitbox_radius'] + 5 
-            
-            if dist <= hit_threshold or (dist <= move_dist):
-                # Hit!
+    def _update_projectiles(self, dt, mobs):
+        # 이동/명중 판정은 배열 연산으로 한 번에, 명중한 투사체만 개별 데미지 로직 실행
+        # [핵심 로직] 타겟이 살아있는 엔티티에 없다면 (사망했거나 도착해서 사라짐) 투사체도 즉시 소멸
+        if self.impacts:
+            hits, targets, flying = self.impacts.due(self.tick) # 이번 틱에 예약된 명중만
+        else:
+            hits, targets, flying = self.projectiles.advance(self.entities, dt)
+        if len(hits):
+            projectiles = self.projectiles.views()
+            meter = self.damage_meter
+            for p_idx, t_idx in zip(hits.tolist(), targets.tolist()):
+                proj = projectiles[p_idx]
                 logic = get_dice_logic(proj['dice_id'])
+                if meter is not None:
+                    before = self._alive_hp()
                 # 데미지 로직 실행 (여기서 HP를 깎음)
-                # target['hp']가 0 이하가 되어도 이번 프레임엔 살아있고, 다음 update 루프 2-2에서 처리됨
-                logic.on_hit(target, proj, self.entities)
+                # target['hp']가 0 이하가 되어도 이번 프레임엔 살아있고, 다음 스텝의 2-2에서 처리됨
+                logic.on_hit(mobs[t_idx], proj, mobs, spatial=self.spatial, effects=self.effects)
+                if meter is not None:
+                    meter[proj['dice_id']] = meter.get(proj['dice_id'], 0) + before - self._alive_hp()
+        if flying is not None:
+            self.projectiles.compact(flying)
+
+    def _alive_hp(self) -> float:
+        """0 이하로 내려간 HP를 뺀 전체 HP 합 (초과 데미지는 유효 데미지에서 제외)"""
+        return float(np.maximum(self.entities.col('hp'), 0).sum())
+
+    def track_damage(self) -> dict:
+        """dice_id별 유효 데미지 집계 시작 (밸런스 시뮬레이션용, 독 지속 데미지 포함). 집계 dict 반환"""
+        self.damage_meter = self.effects.damage_meter = {}
+        return self.damage_meter
+
+    def enqueue(self, command: dict) -> bool:
+        """
+        소켓 입력을 다음 스텝에 적용하도록 큐에 넣음. 큐가 가득 찼거나 끝난 게임이면 버림 (dropped),
+        형식이 틀린 입력은 큐에 넣기 전에 거름 (rejected) - 배치를 꺼낸 뒤 예외가 나면 배치 전체가 사라짐
+        """
+        if self.status not in (STATUS_RUNNING, STATUS_PAUSED) or len(self.pending_commands) >= MAX_PENDING_COMMANDS:
+            self.command_stats["dropped"] += 1
+            return False
+        if not self._valid_command(command):
+            self.command_stats["rejected"] += 1
+            return False
+        self.pending_commands.append(command)
+        return True
+
+    def _valid_command(self, command) -> bool:
+        """type은 SPAWN/MERGE, MERGE 인덱스는 그리드 범위 안의 int (bool 제외)"""
+        if not isinstance(command, dict): return False
+        ctype = command.get('type')
+        if ctype == 'SPAWN': return True
+        if ctype != 'MERGE': return False
+        size = len(self.grid)
+        for key in ('source_index', 'target_index'):
+            idx = command.get(key)
+            if type(idx) is not int or not (0 <= idx < size): return False
+        return True
+
+    def _apply_commands(self):
+        """
+        큐에 쌓인 입력을 도착 순서대로 적용.
+        결과가 뻔한 중복 입력은 합쳐서 건너뜀 (coalesced):
+        - 같은 (source, target) MERGE의 두 번째 이후 (첫 번째가 적용되면 source가 비어 실패)
+        - SPAWN이 한 번 실패한 뒤의 SPAWN (배치 안에서는 SP가 늘지 않음)
+          단, 그 뒤 MERGE가 성공하면 빈 칸이 생기므로 다시 시도
+        """
+        batch, self.pending_commands = self.pending_commands, []
+        stats = self.command_stats
+        merges, spawn_failed = set(), False
+        for command in batch:
+            ctype = command.get('type')
+            if ctype == 'SPAWN' and spawn_failed:
+                stats["coalesced"] += 1
+                continue
+            if ctype == 'MERGE':
+                key = (command.get('source_index'), command.get('target_index'))
+                if key in merges:
+                    stats["coalesced"] += 1
+                    continue
+                merges.add(key)
+            if self.process_command(command):
+                stats["applied"] += 1
+                if ctype == 'MERGE': spawn_failed = False
             else:
-                proj['x'] += (dx / dist) * move_dist
-                proj['y'] += (dy / dist) * move_dist
-                active_projectiles.append(proj)
-                
-        self.projectiles = active_projectiles
+                stats["rejected"] += 1
+                if ctype == 'SPAWN': spawn_failed = True
 
     def process_command(self, command: dict):
+        """명령 즉시 적용 (스텝 사이에서만 호출: 입력 큐, 헤드리스 봇, 리플레이)"""
         ctype = command.get('type')
-        if ctype == 'SPAWN': return self._spawn_dice()
-        elif ctype == 'MERGE': return self._handle_merge(command)
-        return None
+        if ctype == 'SPAWN': result = self._spawn_dice()
+        elif ctype == 'MERGE': result = self._handle_merge(command)
+        else: return None
+        if result and self.replay:
+            self.replay.record_command(self.tick, command)
+        return result
 
     def _spawn_dice(self):
         if self.sp < self.spawn_cost: return None
         empty_indices = [i for i, cell in enumerate(self.grid) if cell['dice'] is None]
         if not empty_indices: return None
-        target_idx = random.choice(empty_indices)
-        dice_id = random.choice(self.deck)
+        target_idx = self.rng.choice(empty_indices)
+        dice_id = self.rng.choice(self.deck)
         self.grid[target_idx]['dice'] = { 'id': dice_id, 'level': 1 }
         self.sp -= self.spawn_cost
         self.spawn_cost += 10
@@ -213,7 +451,7 @@ class SoloGameSession:
             
             logic = get_dice_logic(src_dice['id'])
             if logic.can_merge_with(src_dice, tgt_dice):
-                new_dice_state = logic.on_merge(src_dice, tgt_dice, self.deck)
+                new_dice_state = logic.on_merge(src_dice, tgt_dice, self.deck, rng=self.rng)
                 self.grid[tgt_idx]['dice'] = new_dice_state
                 self.grid[src_idx]['dice'] = None
                 return True
@@ -224,19 +462,157 @@ class SoloGameSession:
     def get_broadcast_state(self):
         return {
             "type": "STATE_UPDATE",
+            "status": self.status,
+            "tick": self.tick,               # 서버 시뮬레이션 틱 번호
+            "server_time": self.sim_time,    # 서버 시뮬레이션 시간 (클라이언트 보간 기준)
             "sp": int(self.sp),
             "spawn_cost": self.spawn_cost,
             "lives": self.lives,
             "wave": self.wave,
             "grid": [cell['dice'] for cell in self.grid],
-            "entities": self.entities,
-            "projectiles": self.projectiles
+            "entities": self.entities.to_dicts(),
+            "projectiles": self.projectiles.to_dicts()
         }
 
+    def get_lockstep_frame(self):
+        """
+        락스텝 프레임: 서버가 tick까지 진행했고, 그 이전 틱에 적용된 입력은 모두 전송됨.
+        events는 리플레이 로그 형식 ([tick, "S"] / [tick, "M", src, tgt]),
+        hashes는 [[tick, state_hash], ...] (그 틱의 스텝 직후 상태)
+        """
+        events = self.replay.events[self.sent_events:]
+        self.sent_events = len(self.replay.events)
+        hashes, self.pending_hashes = self.pending_hashes, []
+        frame = {"type": "LOCKSTEP", "status": self.status, "tick": self.tick, "wave": self.wave}
+        if events: frame["events"] = events
+        if hashes: frame["hashes"] = hashes
+        return frame
+
     def get_initial_state(self):
         return {
             "type": "INIT",
             "game_id": self.game_id,
             "map": { "width": self.width, "height": self.height, "path": self.pixel_path, "grid": self.grid },
+            "sim_rate": SIM_FPS,
+            "net_rate": self.net_rate,
+            "sync_mode": self.sync_mode,
             "state": self.get_broadcast_state()
-        }
\ No newline at end of file
+        }
+
+    # -------------------------------------------------------------
+    # 직렬화 (휴면 저장 / 복원)
+    # -------------------------------------------------------------
+    # 맵/그리드 좌표는 생성자에서 항상 같게 계산되므로 제외하고, 변하는 상태만 저장합니다.
+
+    def to_snapshot(self) -> dict:
+        """세션 전체 상태를 JSON 직렬화 가능한 dict로 변환"""
+        version, internal, gauss = self.rng.getstate()
+        return {
+            "v": SNAPSHOT_VERSION,
+            "game_id": self.game_id,
+            "user_id": self.user_id,
+            "deck": self.deck,
+            "class_levels": self.class_levels,
+            "sp": self.sp,
+            "spawn_cost": self.spawn_cost,
+            "lives": self.lives,
+            "wave": self.wave,
+            "status": self.status,
+            "sim_time": self.sim_time,
+            "tick": self.tick,
+            "dropped_time": self.dropped_time,
+            "net_rate": self.net_rate,
+            "projectile_mode": self.projectile_mode,
+            "last_sent_tick": self.last_sent_tick,
+            "waves": self.waves.dump(),
+            "entity_id_counter": self.entity_id_counter,
+            "projectile_id_counter": self.projectile_id_counter,
+            "entities": self.entities.to_dicts(),
+            "entity_progress": self.entities.col('progress').tolist(), # 위치의 기준 상태 (전송 형식에는 없음)
+            "projectiles": self.projectiles.to_dicts(),
+            "projectile_special": self.projectiles.col('special').tolist(), # 명중 시 효과 수치 (전송 형식에는 없음)
+            "grid": [cell['dice'] for cell in self.grid],
+            "effect_timers": self.effects.dump(),
+            "rng": [version, list(internal), gauss],
+            "seed": self.seed,
+            "replay": self.replay.to_dict() if self.replay else None,
+            "sync_mode": self.sync_mode,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict, clock=None):
+        """to_snapshot() 결과로 세션 복원 (시계 기준점은 현재 시각으로 재설정)"""
+        session = cls(data["user_id"], data["deck"], clock=clock, net_rate=data["net_rate"],
+                      class_levels=data.get("class_levels"), projectile_mode=data.get("projectile_mode"))
+        session.game_id = data["game_id"]
+        for key in ("sp", "spawn_cost", "lives", "wave", "status", "sim_time", "tick", "dropped_time",
+                    "last_sent_tick",
+                    "entity_id_counter", "projectile_id_counter"):
+            setattr(session, key, data[key])
+        session.entities.load(data["entities"])
+        if "entity_progress" in data:
+            session.entities.col('progress')[:] = data["entity_progress"]
+        else: # v1: 좌표와 지나온 웨이포인트로 경로상 거리 복원
+            geom, entities = session.path_geom, session.entities
+            pi = entities.col('path_index')
+            entities.col('progress')[:] = geom.cum[pi] + np.hypot(entities.col('x') - geom.x[pi], entities.col('y') - geom.y[pi])
+        session.projectiles.load(data["projectiles"])
+        if "projectile_special" in data: # v4 이하: 비행 중인 투사체의 독/감속 수치는 0으로 복원됨
+            session.projectiles.col('special')[:] = data["projectile_special"]
+        session.effects.load(data.get("effect_timers", []), session.tick)
+        if session.impacts:
+            session.impacts.load(session.tick)
+        for cell, dice in zip(session.grid, data["grid"]):
+            cell['dice'] = dice
+        version, internal, gauss = data["rng"]
+        session.rng.setstate((version, tuple(internal), gauss))
+        if "waves" in data:
+            session.waves = WaveScheduler.load(data["waves"], SIM_FPS)
+        else: # v3 이하 (웨이브 없이 1초마다 1마리): 기본 테이블 1웨이브부터 이어서 시작
+            session.waves.wave_start = session.tick
+        # v2 이하 스냅샷은 시드/입력 기록이 없어 재현 불가
+        session.seed = data.get("seed")
+        session.replay = ReplayLog.from_dict(data["replay"]) if data.get("replay") else None
+        if session.replay:
+            session.replay.record_restore(session.tick)
+            # 락스텝: 복원 시점에는 접속자가 없으므로 새 접속자는 RESYNC 스냅샷부터 시작 (복원 이벤트는 보내지 않음)
+            session.sync_mode = data.get("sync_mode") or SYNC_STATE
+            session.sent_events = len(session.replay.events)
+        return session
+
+    # -------------------------------------------------------------
+    # 리플레이 / 상태 검증
+    # -------------------------------------------------------------
+    def state_digest(self) -> str:
+        """
+        시뮬레이션 상태의 해시 (리플레이 검증용).
+        벽시계에 따라 달라지는 값(accumulator, dropped_time, last_sent_tick, status)은 제외.
+        """
+        state = {
+            "tick": self.tick, "sp": self.sp, "spawn_cost": self.spawn_cost, "lives": self.lives, "wave": self.wave,
+            "waves": self.waves.dump(),
+            "entity_id_counter": self.entity_id_counter, "projectile_id_counter": self.projectile_id_counter,
+            "grid": [cell['dice'] for cell in self.grid],
+            "entities": self.entities.to_dicts(),
+            "entity_progress": self.entities.col('progress').tolist(),
+            "projectiles": self.projectiles.to_dicts(),
+            "projectile_special": self.projectiles.col('special').tolist(),
+            "effect_timers": self.effects.dump(),
+            "rng": self.rng.getstate()[1],
+        }
+        return hashlib.sha1(json.dumps(state, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def state_hash(self) -> str:
+        """락스텝 검증용 짧은 상태 해시 (64bit)"""
+        return self.state_digest()[:16]
+
+    def export_replay(self):
+        """저장용 리플레이 (로그 + 마지막 틱 + 그 시점 상태 해시). 기록이 없으면 None"""
+        if not self.replay: return None
+        return {
+            "game_id": self.game_id,
+            "user_id": self.user_id,
+            "end_tick": self.tick,
+            "digest": self.state_digest(),
+            **self.replay.to_dict(),
+        }
@@ -0,0 +1,54 @@
+# app/services/dice_defense/path_geometry.py
+from functools import lru_cache
+import numpy as np
+
+# -------------------------------------------------------------------------
+# 호 길이(arc-length) 기반 경로 표현
+# -------------------------------------------------------------------------
+# 웨이포인트 경로의 구간 시작 누적 거리와 단위 방향 벡터를 맵당 한 번만 계산해 둡니다.
+# 엔티티는 "출발점부터 이동한 거리"(progress) 하나만 상태로 가지며,
+#   이동  = progress += speed * dt
+#   도착  = progress >= total
+#   최전방 = progress가 가장 큰 엔티티
+# 좌표(x, y)와 path_index는 progress에서 구간을 찾아 계산합니다 (sqrt 없음).
+
+class PathGeometry:
+    def __init__(self, points: tuple):
+        self.x = np.array([p[0] for p in points], dtype=np.float64)
+        self.y = np.array([p[1] for p in points], dtype=np.float64)
+        seg_dx, seg_dy = np.diff(self.x), np.diff(self.y)
+        seg_len = np.hypot(seg_dx, seg_dy)
+        safe_len = np.where(seg_len > 0, seg_len, 1.0)
+        self.cum = np.concatenate(([0.0], np.cumsum(seg_len))) # 웨이포인트별 누적 거리
+        self.total = float(self.cum[-1])
+        self.dir_x = seg_dx / safe_len # 구간별 단위 방향
+        self.dir_y = seg_dy / safe_len
+        self.last_segment = len(seg_len) - 1
+        # 스칼라 계산용 (투사체 1~2발씩 계산할 때 numpy 호출 오버헤드 회피)
+        # 구간별 (시작 누적 거리, 끝 누적 거리, 시작 x, 시작 y, 방향 x, 방향 y)
+        self.segments = list(zip(self.cum[:-1].tolist(), self.cum[1:].tolist(), self.x[:-1].tolist(),
+                                 self.y[:-1].tolist(), self.dir_x.tolist(), self.dir_y.tolist()))
+
+    def segment(self, progress):
+        """progress가 속한 구간 번호 (= 지나온 마지막 웨이포인트 index)"""
+        return np.clip(np.searchsorted(self.cum, progress, side="right") - 1, 0, self.last_segment)
+
+    def position(self, progress):
+        """progress -> (x, y, 구간 번호). 경로 밖은 양 끝점으로 고정"""
+        progress = np.clip(progress, 0.0, self.total)
+        seg = self.segment(progress)
+        along = progress - self.cum[seg]
+        return self.x[seg] + self.dir_x[seg] * along, self.y[seg] + self.dir_y[seg] * along, seg
+
+    def point(self, progress: float) -> tuple:
+        """position()의 스칼라 버전: progress -> (x, y)"""
+        progress = min(max(progress, 0.0), self.total)
+        for c0, c1, x0, y0, dx, dy in self.segments:
+            if progress <= c1: break
+        along = progress - c0
+        return x0 + dx * along, y0 + dy * along
+
+@lru_cache(maxsize=None)
+def get_path_geometry(points: tuple) -> PathGeometry:
+    """웨이포인트 좌표 튜플 ((x, y), ...) 별로 한 번만 계산해서 공유"""
+    return PathGeometry(points)
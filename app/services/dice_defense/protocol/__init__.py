@@ -0,0 +1,4 @@
+# app/services/dice_defense/protocol/__init__.py
+from .delta import DeltaEncoder, DeltaState, KEYFRAME_INTERVAL
+from .binary import BinaryFrame, BinaryState, encode_body, encode_for
+from .prepared import PreparedFrame
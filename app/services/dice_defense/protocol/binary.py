@@ -0,0 +1,144 @@
+# app/services/dice_defense/protocol/binary.py
+import struct
+
+# -------------------------------------------------------------------------
+# 바이너리 STATE 프레임 (소켓별 협상: /ws/game/{game_id}?proto=bin)
+# -------------------------------------------------------------------------
+# 모든 값은 little-endian. 프레임 구성:
+#   HEADER      kind u8 | tick u32 | server_time f64 | sp i32 | spawn_cost u32 | lives i16 | wave u16
+#   GRID        count u8, [dice_code u8 | level u8 | target_id u32] * count   (dice_code 255 = 빈 칸)
+#   ENTITY_DEF  count u16, [id u32 | type_code u8 | max_hp f32 | radius u16 | hitbox_radius u16] * count
+#   PROJ_DEF    count u16, [id u32 | dice_code u8 | target_id u32] * count
+#   ENTITIES    count u16, [id u32 | x f32 | y f32 | hp f32] * count
+#   PROJECTILES count u16, [id u32 | sx f32 | sy f32 | ex f32 | ey f32 | t0 u32 | t1 u32] * count
+#     analytic 투사체는 시작점(sx, sy, t0) ~ 명중점(ex, ey, t1)을 그대로 보내 클라이언트가 틱 기준으로 보간,
+#     homing 투사체는 현재 위치를 sx = ex, sy = ey, t0 = t1 = 0 으로 보냄
+# - 변하지 않는 필드(type, max_hp, radius 등)는 *_DEF에 해당 id가 처음 등장할 때 한 번만 실림
+# - 문자열(엔티티 타입, 주사위 id)은 1바이트 코드로 보내며, 코드표는 처음 등장할 때
+#   JSON 텍스트 메시지 {"type": "BIN_DICT", "strings": {code: str}} 로 먼저 전송
+# - ENTITIES / PROJECTILES 본문과 id별 DEF 레코드는 소켓과 무관하므로 프레임당 한 번만 인코딩해서 공유
+#   (encode_body 결과는 bytes / int / str로만 이루어져 샤드 워커에서 인코딩해 그대로 넘길 수 있음)
+# - 코드표는 인코딩한 프로세스마다 따로 부여되므로 body에 사용한 코드의 이름을 함께 담고,
+#   연결별로 클라이언트가 알고 있는 코드 -> 이름과 다른 항목만 BIN_DICT로 보냄
+
+FRAME_STATE = 1
+EMPTY_CODE = 255
+
+HEADER = struct.Struct("<BIdiIhH")
+GRID_CELL = struct.Struct("<BBI")
+ENTITY_DEF = struct.Struct("<IBfHH")
+PROJ_DEF = struct.Struct("<IBI")
+ENTITY = struct.Struct("<Ifff")
+PROJECTILE = struct.Struct("<IffffII")
+COUNT8 = struct.Struct("<B")
+COUNT16 = struct.Struct("<H")
+
+# 프로세스 전역 문자열 코드표 (한 번 부여된 코드는 바뀌지 않음)
+_string_codes = {}
+
+def string_code(value: str) -> int:
+    if value is None: return EMPTY_CODE
+    code = _string_codes.get(value)
+    if code is None:
+        code = len(_string_codes)
+        if code >= EMPTY_CODE:
+            raise ValueError("binary protocol string table is full")
+        _string_codes[value] = code
+    return code
+
+class BinaryFrame:
+    """송신 큐에 들어가는 바이너리 프레임. 실제 전송된 뒤에야 정의(DEF)를 '전달됨'으로 기록"""
+    __slots__ = ("data", "state", "entity_ids", "projectile_ids", "def_entities", "def_projectiles")
+    type = "STATE_BINARY"
+
+    def __init__(self, data, state, entity_ids, projectile_ids, def_entities, def_projectiles):
+        self.data = data
+        self.state = state
+        self.entity_ids = entity_ids
+        self.projectile_ids = projectile_ids
+        self.def_entities = def_entities
+        self.def_projectiles = def_projectiles
+
+    def on_sent(self):
+        # 이미 사라진 id는 정리 (id는 재사용되지 않으므로 현재 프레임에 있는 것만 유지)
+        self.state.known_entities = (self.state.known_entities | self.def_entities) & self.entity_ids
+        self.state.known_projectiles = (self.state.known_projectiles | self.def_projectiles) & self.projectile_ids
+
+class BinaryState:
+    """연결별 상태: 클라이언트가 이미 받은 정의(DEF)와 문자열 코드표"""
+    def __init__(self):
+        self.known_entities = set()
+        self.known_projectiles = set()
+        self.known_codes = {} # code -> name
+
+def encode_body(frame: dict) -> dict:
+    """소켓과 무관한 부분(그리드, 동적 레코드, id별 DEF)을 인코딩. broadcast 1회당 1번만 호출"""
+    entities = frame.get("entities", [])
+    projectiles = frame.get("projectiles", [])
+    grid = frame.get("grid", [])
+
+    parts = [
+        HEADER.pack(FRAME_STATE, frame.get("tick", 0), frame.get("server_time", 0.0),
+                    int(frame.get("sp", 0)), frame.get("spawn_cost", 0),
+                    frame.get("lives", 0), frame.get("wave", 0)),
+        COUNT8.pack(len(grid)),
+    ]
+    codes = set()
+    for dice in grid:
+        if dice:
+            code = string_code(dice["id"])
+            codes.add(code)
+            parts.append(GRID_CELL.pack(code, dice.get("level", 1), dice.get("target_id") or 0))
+        else:
+            parts.append(GRID_CELL.pack(EMPTY_CODE, 0, 0))
+
+    records = [COUNT16.pack(len(entities))]
+    records.extend(ENTITY.pack(e["id"], e["x"], e["y"], e["hp"]) for e in entities)
+    records.append(COUNT16.pack(len(projectiles)))
+    records.extend(PROJECTILE.pack(p["id"], p["sx"], p["sy"], p["ex"], p["ey"], p["t0"], p["t1"]) if "t1" in p
+                   else PROJECTILE.pack(p["id"], p["x"], p["y"], p["x"], p["y"], 0, 0) for p in projectiles)
+
+    entity_defs = {}
+    for e in entities:
+        code = string_code(e.get("type"))
+        codes.add(code)
+        entity_defs[e["id"]] = ENTITY_DEF.pack(e["id"], code, e.get("max_hp", 0), int(e.get("radius", 0)), int(e.get("hitbox_radius", 0)))
+    projectile_defs = {}
+    for p in projectiles:
+        code = string_code(p.get("dice_id"))
+        codes.add(code)
+        projectile_defs[p["id"]] = PROJ_DEF.pack(p["id"], code, p.get("target_id") or 0)
+
+    codes.discard(EMPTY_CODE)
+    names = {code: name for name, code in _string_codes.items() if code in codes}
+    return {
+        "head": b"".join(parts),
+        "records": b"".join(records),
+        "names": names,
+        "entity_defs": entity_defs,
+        "projectile_defs": projectile_defs,
+    }
+
+def encode_for(state: BinaryState, body: dict) -> list:
+    """연결별 메시지 목록 생성: [BIN_DICT(필요 시), BinaryFrame]"""
+    messages = []
+    entity_defs, projectile_defs = body["entity_defs"], body["projectile_defs"]
+
+    new_entities = entity_defs.keys() - state.known_entities
+    new_projectiles = projectile_defs.keys() - state.known_projectiles
+
+    defs = [COUNT16.pack(len(new_entities))]
+    defs.extend(entity_defs[eid] for eid in new_entities)
+    defs.append(COUNT16.pack(len(new_projectiles)))
+    defs.extend(projectile_defs[pid] for pid in new_projectiles)
+
+    known = state.known_codes
+    unknown = {code: name for code, name in body["names"].items() if known.get(code) != name}
+    if unknown:
+        messages.append({"type": "BIN_DICT", "strings": unknown})
+        known.update(unknown)
+
+    data = body["head"] + b"".join(defs) + body["records"]
+    messages.append(BinaryFrame(data, state, set(entity_defs), set(projectile_defs),
+                                set(new_entities), set(new_projectiles)))
+    return messages
@@ -0,0 +1,141 @@
+# app/services/dice_defense/protocol/delta.py
+from collections import OrderedDict
+
+# -------------------------------------------------------------------------
+# STATE_UPDATE 델타 인코딩
+# -------------------------------------------------------------------------
+# 게임(방)마다 DeltaEncoder 1개가 최근 프레임 스냅샷을 seq 번호로 보관하고,
+# 각 연결(DeltaState)은 클라이언트가 마지막으로 ACK한 seq를 기준(base)으로
+# 바뀐/추가된/삭제된 엔티티, 투사체, 그리드 칸만 담은 STATE_DELTA를 받습니다.
+# - ACK가 없거나(신규/재접속) 기준 스냅샷이 만료되었거나 keyframe_interval이 지나면
+#   기존 형식의 전체 STATE_UPDATE(keyframe)를 보냅니다.
+# - 델타는 항상 'ACK된 프레임' 기준이므로 중간 프레임이 송신 큐에서 버려져도 안전합니다.
+
+KEYFRAME_INTERVAL = 30 # 전송 프레임 수 기준
+HISTORY_SIZE = 64      # 보관할 스냅샷 수 (이보다 오래된 ACK는 keyframe으로 처리)
+
+META_KEYS = ("status", "tick", "server_time", "sp", "spawn_cost", "lives", "wave")
+
+def _copy(obj):
+    # 엔티티는 매 틱 제자리에서 수정되므로 스냅샷은 복사본으로 보관 (effects 안의 stacks 등 중첩 값까지 전부)
+    if isinstance(obj, dict):
+        return {k: _copy(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy(v) for v in obj]
+    return obj
+
+def _snapshot(frame: dict) -> dict:
+    return {
+        "meta": {k: frame.get(k) for k in META_KEYS},
+        "entities": {e["id"]: _copy(e) for e in frame.get("entities", [])},
+        "projectiles": {p["id"]: _copy(p) for p in frame.get("projectiles", [])},
+        "grid": [_copy(d) if d else None for d in frame.get("grid", [])],
+    }
+
+def _diff_objects(base: dict, new: dict) -> dict:
+    """id -> dict 맵 두 개의 차이 (추가 / 변경 필드 / 삭제)"""
+    added, updated = [], []
+    for oid, obj in new.items():
+        old = base.get(oid)
+        if old is None:
+            added.append(obj)
+        elif old != obj:
+            changed = {k: v for k, v in obj.items() if old.get(k) != v}
+            changed["id"] = oid
+            updated.append(changed)
+    removed = [oid for oid in base if oid not in new]
+    return {"add": added, "upd": updated, "rem": removed}
+
+class DeltaState:
+    """연결별 델타 상태 (ACK된 seq, 마지막 keyframe seq)"""
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.acked_seq = None
+        self.last_key_seq = None
+        self.force_key = True # 접속 직후 첫 프레임은 항상 keyframe
+
+    def ack(self, seq: int):
+        if self.acked_seq is None or seq > self.acked_seq:
+            self.acked_seq = seq
+
+    def request_keyframe(self):
+        self.force_key = True
+
+    def needs_keyframe(self, seq: int, bases) -> bool:
+        """seq 프레임을 keyframe으로 보내야 하는지 (bases: 델타 기준으로 쓸 수 있는 seq들)"""
+        base_seq = self.acked_seq
+        return (
+            self.force_key
+            or base_seq is None
+            or base_seq not in bases
+            or base_seq >= seq
+            or seq - (self.last_key_seq or 0) >= self.keyframe_interval
+        )
+
+    def keyframe_sent(self, seq: int):
+        self.force_key = False
+        self.last_key_seq = seq
+
+class DeltaEncoder:
+    """게임(방)당 1개. 프레임 스냅샷 보관 및 연결별 델타 생성"""
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self.history_size = history_size
+        self.history = OrderedDict() # seq -> snapshot
+        self.seq = 0
+
+    def push(self, frame: dict) -> int:
+        self.seq += 1
+        self.history[self.seq] = _snapshot(frame)
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        return self.seq
+
+    def _keyframe(self, state: DeltaState, seq: int, frame: dict, cache: dict = None) -> dict:
+        state.keyframe_sent(seq)
+        if cache is not None and "key" in cache:
+            return cache["key"]
+        msg = {**frame, "seq": seq, "keyframe": True}
+        if cache is not None:
+            cache["key"] = msg
+        return msg
+
+    def _delta(self, base_seq: int, seq: int) -> dict:
+        base, new = self.history[base_seq], self.history[seq]
+        grid = {
+            idx: cell for idx, cell in enumerate(new["grid"])
+            if idx >= len(base["grid"]) or base["grid"][idx] != cell
+        }
+        return {
+            "type": "STATE_DELTA",
+            "seq": seq,
+            "base": base_seq,
+            **new["meta"],
+            "entities": _diff_objects(base["entities"], new["entities"]),
+            "projectiles": _diff_objects(base["projectiles"], new["projectiles"]),
+            "grid": grid,
+        }
+
+    def encode(self, state: DeltaState, seq: int, frame: dict, cache: dict = None) -> dict:
+        """
+        state(연결)에 보낼 메시지 생성. cache는 같은 프레임을 받는 연결들끼리
+        keyframe과 base seq별 델타를 공유하기 위한 dict (같은 ACK 위치면 한 번만 계산)
+        """
+        base_seq = state.acked_seq
+        if state.needs_keyframe(seq, self.history):
+            return self._keyframe(state, seq, frame, cache)
+
+        if cache is not None and base_seq in cache:
+            return cache[base_seq]
+        msg = self._delta(base_seq, seq)
+        if cache is not None:
+            cache[base_seq] = msg
+        return msg
+
+    def prepare(self, frame: dict, bases: int):
+        """
+        연결 상태 없이 미리 인코딩 (샤드 워커): frame을 push하고
+        (seq, keyframe 메시지, 직전 bases개 seq 기준 델타 {base_seq: 메시지}) 반환
+        """
+        seq = self.push(frame)
+        deltas = {base_seq: self._delta(base_seq, seq) for base_seq in list(self.history)[-bases - 1:-1]}
+        return seq, {**frame, "seq": seq, "keyframe": True}, deltas
@@ -0,0 +1,40 @@
+# app/services/dice_defense/protocol/prepared.py
+import json
+from .binary import encode_body
+from .delta import DeltaEncoder
+
+# -------------------------------------------------------------------------
+# 미리 인코딩된 STATE_UPDATE (샤드 워커 -> 웹 프로세스)
+# -------------------------------------------------------------------------
+# 워커는 프레임 dict를 피클로 넘기지 않고, 방에 붙은 소켓 프로토콜별 전송 형태를 직접 만들어 보냅니다.
+#   text   전체 STATE_UPDATE JSON (json 연결 / INIT / 프로토콜 정보가 아직 없을 때의 대체)
+#   body   encode_body() 결과 (bin 연결이 있을 때만)
+#   delta  (seq, keyframe JSON, {base_seq: STATE_DELTA JSON}) - 직전 DELTA_BASES개 프레임 기준 (delta 연결이 있을 때만)
+# 웹 프로세스는 연결별 상태(ACK한 seq, 전달한 DEF)에 맞는 것을 골라 큐에 넣기만 합니다.
+# ACK가 DELTA_BASES 프레임보다 밀린 델타 연결은 keyframe을 받습니다.
+
+DELTA_BASES = 4
+
+def dumps(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+class PreparedFrame:
+    __slots__ = ("meta", "text", "body", "delta")
+    type = "STATE_UPDATE"
+
+    def __init__(self, frame: dict, protocols=(), encoder: DeltaEncoder = None):
+        self.meta = {"status": frame.get("status"), "tick": frame.get("tick"), "wave": frame.get("wave")}
+        self.text = dumps(frame)
+        self.body = encode_body(frame) if "bin" in protocols else None
+        self.delta = None
+        if encoder is not None:
+            seq, key, deltas = encoder.prepare(frame, DELTA_BASES)
+            self.delta = (seq, dumps(key), {base_seq: dumps(msg) for base_seq, msg in deltas.items()})
+
+    def get(self, key: str, default=None):
+        """프레임 dict처럼 메타 필드 조회 (status / tick / wave, GlobalTicker sink용)"""
+        if key == "type": return self.type
+        return self.meta.get(key, default)
+
+    def to_dict(self) -> dict:
+        return json.loads(self.text)
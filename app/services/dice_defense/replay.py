@@ -0,0 +1,99 @@
+# app/services/dice_defense/replay.py
+import sys
+import json
+import time
+import argparse
+from app.core.phase_timer import PhaseTimer
+from app.services.dice_defense.replay_log import ReplayLog
+from app.services.dice_defense.modes.solo.game import SoloGameSession, FIXED_DT, STATUS_FINISHED
+
+# -------------------------------------------------------------------------
+# 리플레이 재생 도구
+# -------------------------------------------------------------------------
+# SoloGameSession.export_replay() 결과(시드 + 틱별 입력)를 벽시계 없이 스텝 단위로 다시 돌려
+# 같은 게임을 재현합니다. 버그 재현, 실제 플레이 기록으로 성능 회귀 측정에 사용.
+#   python -m app.services.dice_defense.replay <game_id | replay.json> [--profile] [--json]
+# end_tick / digest가 있으면 재생 결과 상태 해시와 비교해서 재현 여부를 확인합니다.
+
+def replay_session(data: dict, until_tick: int = None, timer=None) -> SoloGameSession:
+    """리플레이 dict를 until_tick(기본: end_tick, 없으면 마지막 입력)까지 재생한 세션 반환"""
+    log = ReplayLog.from_dict(data)
+    session = SoloGameSession(data.get("user_id"), log.deck, class_levels=log.class_levels,
+                              projectile_mode=log.projectile_mode, seed=log.seed, wave_table=log.wave_table)
+    session.phase_timer = timer
+    if until_tick is None:
+        until_tick = data.get("end_tick", log.events[-1][0] if log.events else 0)
+
+    def run_to(tick):
+        while session.tick < tick and session.status != STATUS_FINISHED:
+            session._step(FIXED_DT)
+
+    for event in log.events:
+        if event[0] > until_tick: break
+        run_to(event[0])
+        session = apply_event(session, event)
+        session.phase_timer = timer
+    run_to(until_tick)
+    return session
+
+def apply_event(session: SoloGameSession, event: list) -> SoloGameSession:
+    """리플레이 이벤트 1개 적용 (복원 이벤트면 저장/복원 왕복을 그대로 재현한 새 세션 반환)"""
+    command = ReplayLog.to_command(event)
+    if command is None:
+        return SoloGameSession.from_snapshot(session.to_snapshot())
+    session.process_command(command)
+    return session
+
+def verify(data: dict, timer=None) -> dict:
+    """end_tick까지 재생하고 기록된 digest와 비교"""
+    started = time.perf_counter()
+    session = replay_session(data, timer=timer)
+    elapsed = time.perf_counter() - started
+    digest = session.state_digest()
+    return {
+        "game_id": data.get("game_id"),
+        "ticks": session.tick,
+        "events": len(data.get("events", [])),
+        "elapsed_s": round(elapsed, 3),
+        "ticks_per_sec": round(session.tick / elapsed, 1) if elapsed else None,
+        "digest": digest,
+        "expected": data.get("digest"),
+        "match": digest == data.get("digest") if data.get("digest") else None,
+    }
+
+def load(source: str) -> dict:
+    """JSON 파일 경로 또는 game_replays 테이블의 game_id"""
+    if source.endswith(".json"):
+        with open(source, encoding="utf-8") as f:
+            return json.load(f)
+    from app.services.dice_defense import session_store
+    data = session_store.load_replay(source)
+    if data is None:
+        raise SystemExit(f"replay not found: {source}")
+    return data
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dice Defense replay tool")
+    parser.add_argument("source", help="game_id (game_replays table) or path to a replay .json")
+    parser.add_argument("--profile", action="store_true", help="report per-phase step timings")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args(argv)
+
+    timer = PhaseTimer() if args.profile else None
+    result = verify(load(args.source), timer=timer)
+    if timer: result["phases"] = timer.report()
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"[replay] {result['game_id']}: {result['ticks']} ticks, {result['events']} events, "
+              f"{result['elapsed_s']} s ({result['ticks_per_sec']} ticks/s)")
+        print(f"  digest {result['digest']}  expected {result['expected']}  match={result['match']}")
+        for phase, stat in sorted(result.get("phases", {}).items(), key=lambda kv: -kv[1]["share"]):
+            print(f"  phase {phase:<11} {stat['share'] * 100:5.1f}%  {stat['mean_us']} us/step")
+    if result["match"] is False:
+        sys.exit(1)
+    return result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# app/services/dice_defense/replay_log.py
+
+# -------------------------------------------------------------------------
+# 게임 리플레이 로그
+# -------------------------------------------------------------------------
+# 세션의 시뮬레이션은 (시드, 덱/클래스 레벨/투사체 모드, 틱별 입력)만으로 결정되므로
+# 이것만 append-only로 기록해두면 replay.py로 같은 게임을 비트 단위로 재현할 수 있습니다.
+# - 명령은 적용된 시점의 틱 번호와 함께 기록 (tick t = t번째 스텝 직후, t+1번째 스텝 전)
+# - 상태를 바꾼 명령만 기록 (실패한 SPAWN/MERGE는 상태와 난수를 건드리지 않음)
+# - 휴면 복원은 투사체 명중 예약 등을 다시 계산하므로 그 틱도 기록 ("R")
+# 이벤트 형식 (압축용 짧은 배열):
+#   [tick, "S"]            SPAWN
+#   [tick, "M", src, tgt]  MERGE
+#   [tick, "R"]            스냅샷 복원
+
+REPLAY_VERSION = 1
+
+EVENT_SPAWN = "S"
+EVENT_MERGE = "M"
+EVENT_RESTORE = "R"
+
+class ReplayLog:
+    def __init__(self, seed: int, deck: list, class_levels: dict = None, projectile_mode: str = None,
+                 wave_table: str = None):
+        self.seed = seed
+        self.deck = list(deck)
+        self.class_levels = dict(class_levels or {})
+        self.projectile_mode = projectile_mode
+        self.wave_table = wave_table
+        self.events = []
+
+    def record_command(self, tick: int, command: dict):
+        ctype = command.get('type')
+        if ctype == 'SPAWN':
+            self.events.append([tick, EVENT_SPAWN])
+        elif ctype == 'MERGE':
+            self.events.append([tick, EVENT_MERGE, command['source_index'], command['target_index']])
+
+    def record_restore(self, tick: int):
+        self.events.append([tick, EVENT_RESTORE])
+
+    @staticmethod
+    def to_command(event: list):
+        """이벤트 -> process_command 입력 (복원 이벤트는 None)"""
+        kind = event[1]
+        if kind == EVENT_SPAWN: return {"type": "SPAWN"}
+        if kind == EVENT_MERGE: return {"type": "MERGE", "source_index": event[2], "target_index": event[3]}
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "v": REPLAY_VERSION,
+            "seed": self.seed,
+            "deck": self.deck,
+            "class_levels": self.class_levels,
+            "projectile_mode": self.projectile_mode,
+            "wave_table": self.wave_table,
+            "events": self.events,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        log = cls(data["seed"], data["deck"], data.get("class_levels"), data.get("projectile_mode"), data.get("wave_table"))
+        log.events = [list(e) for e in data.get("events", [])]
+        return log
@@ -0,0 +1,224 @@
+# app/services/dice_defense/session_lifecycle.py
+import time
+import asyncio
+import inspect
+from functools import partial
+from app.core.global_ticker import ticker
+from app.core.metrics import profiler
+from app.services.dice_defense.connection_manager import manager
+from app.services.dice_defense.shard_pool import shard_pool
+from app.services.dice_defense import session_store
+from app.services.dice_defense.modes.solo.game import (
+    SoloGameSession, STATUS_RUNNING, STATUS_PAUSED, STATUS_FINISHED, STATUS_EVICTED, STATUS_HIBERNATED
+)
+
+# -------------------------------------------------------------------------
+# 게임 세션 생명주기 관리
+# -------------------------------------------------------------------------
+#   running    --(마지막 소켓 종료)-->  paused     --(HIBERNATE_AFTER 경과)-->  hibernated
+#   paused     --(소켓 접속)------->    running
+#   hibernated --(소켓 접속)------->    (디스크에서 복원) -> running
+#   hibernated --(SNAPSHOT_TTL 경과)->  evicted (리플레이 보관 후 스냅샷 삭제)
+#   running    --(lives <= 0)------->   finished   --(FINISHED_TTL 경과)-->     evicted
+# - paused / finished 세션은 GlobalTicker에서 구독 해제되므로 틱당 비용이 0
+# - hibernated / evicted 세션은 active_games에서 제거되어 메모리에서 사라짐
+#   (휴면 저장에 실패한 세션은 IDLE_TTL 후 그냥 제거)
+# - evicted 되는 세션의 리플레이 로그는 game_replays 테이블에 보관 (replay.py로 재현)
+
+HIBERNATE_AFTER = 60 # 일시정지 후 디스크로 내리기까지의 시간 (초)
+SNAPSHOT_TTL = 3600  # 휴면 스냅샷 보관 시간 (초)
+IDLE_TTL = 300       # 일시정지 상태로 메모리에 유지하는 최대 시간 (초)
+FINISHED_TTL = 60    # 게임 오버 후 결과 확인용으로 남겨두는 시간 (초)
+REAP_INTERVAL = 5    # 정리 작업 주기 (초)
+
+# 진행 중인 솔로 게임 세션 저장소 (game_id -> session)
+active_games = {}
+
+class SessionLifecycle:
+    def __init__(self, games: dict):
+        self.games = games
+        self.since = {} # game_id -> 현재 상태(paused/finished)에 들어간 시각
+        self.hibernated = 0 # 누적 휴면 처리 수
+        self.restored = 0   # 누적 복원 수
+        manager.on_last_viewer = self.on_detach # 끊긴 소켓이 강제 정리되어 플레이어가 0이 되면 일시정지
+        shard_pool.on_shard_lost = self.fail_sessions # 시뮬레이션 워커가 죽어 상태를 잃은 세션 정리
+        self.failed = 0 # 워커 사망으로 잃은 세션 수
+
+    def register(self, session):
+        """새 세션 등록. 소켓이 붙기 전까지는 paused 상태로 대기"""
+        session.pause()
+        if hasattr(session, "phase_timer"): # 이 프로세스에서 도는 세션만 (샤딩 모드는 워커에서 실행)
+            session.phase_timer = profiler
+        self.games[session.game_id] = session
+        self.since[session.game_id] = time.monotonic()
+
+    def on_attach(self, game_id: str):
+        """소켓 접속 -> 정지된 세션 재개"""
+        session = self.games.get(game_id)
+        if not session: return
+        if session.status == STATUS_PAUSED:
+            session.resume()
+            self.since.pop(game_id, None)
+        if session.status == STATUS_RUNNING:
+            ticker.subscribe(session, sink=partial(self.on_frame, game_id))
+
+    def on_detach(self, game_id: str):
+        """소켓 종료 -> 남은 플레이어 소켓이 없으면 일시정지 (관전자만 남아도 정지)"""
+        session = self.games.get(game_id)
+        if not session or manager.player_count(game_id) > 0: return
+        if session.status == STATUS_RUNNING:
+            session.pause()
+            ticker.unsubscribe(session)
+            self.since[game_id] = time.monotonic()
+
+    async def on_frame(self, game_id: str, state: dict):
+        """GlobalTicker sink: 상태 브로드캐스트 + 게임 오버 감지"""
+        await manager.broadcast(game_id, state)
+        if state.get("status") == STATUS_FINISHED:
+            self.finish(game_id, state)
+
+    def finish(self, game_id: str, state: dict):
+        session = self.games.get(game_id)
+        if not session: return
+        ticker.unsubscribe(session)
+        self.since[game_id] = time.monotonic()
+        manager.send_all(game_id, {"type": "GAME_OVER", "game_id": game_id, "wave": state.get("wave"), "tick": state.get("tick")})
+
+    def on_protocols(self, game_id: str):
+        """방의 소켓 구성이 바뀜 -> 샤딩 모드면 워커가 필요한 프레임 형식만 인코딩하도록 전달"""
+        session = self.games.get(game_id)
+        if hasattr(session, "set_protocols"):
+            session.set_protocols(manager.protocols(game_id))
+
+    def fail_sessions(self, game_ids: list):
+        """워커 사망으로 시뮬레이션 상태를 잃은 세션 제거 (리플레이도 워커에 있었으므로 보관 불가)"""
+        for game_id in game_ids:
+            self.evict(game_id, code=1011, reason="Simulation worker crashed")
+            self.failed += 1
+
+    def evict(self, game_id: str, code: int = 1000, reason: str = "Game session closed"):
+        session = self.games.pop(game_id, None)
+        self.since.pop(game_id, None)
+        if not session: return
+        ticker.unsubscribe(session)
+        if shard_pool.enabled:
+            shard_pool.remove_session(game_id)
+        session.status = STATUS_EVICTED
+        manager.close_game(game_id, code=code, reason=reason)
+
+    async def archive(self, game_id: str) -> bool:
+        """제거 직전 세션의 리플레이 로그 저장"""
+        session = self.games.get(game_id)
+        if not session: return False
+        replay = session.export_replay()
+        if inspect.isawaitable(replay): # 샤딩 모드: 워커에서 받아옴
+            replay = await replay
+        if not replay: return False
+        session_store.save_replay(replay)
+        return True
+
+    async def retire(self, game_id: str):
+        """리플레이 보관 후 제거 (보관 실패해도 제거는 진행)"""
+        try:
+            await self.archive(game_id)
+        except Exception as e:
+            print(f"Error archiving replay {game_id}: {e}")
+        self.evict(game_id)
+
+    async def hibernate(self, game_id: str) -> bool:
+        """정지된 세션을 디스크에 저장하고 메모리에서 제거"""
+        session = self.games.get(game_id)
+        if not session or session.status != STATUS_PAUSED: return False
+        snapshot = session.to_snapshot()
+        if inspect.isawaitable(snapshot): # 샤딩 모드: 워커에서 받아옴
+            snapshot = await snapshot
+        # 저장하는 동안 누가 접속했다면 취소
+        if not snapshot or self.games.get(game_id) is not session or session.status != STATUS_PAUSED:
+            return False
+        session_store.save_snapshot(snapshot)
+        self.games.pop(game_id, None)
+        self.since.pop(game_id, None)
+        if shard_pool.enabled:
+            shard_pool.remove_session(game_id)
+        session.status = STATUS_HIBERNATED
+        self.hibernated += 1
+        return True
+
+    def restore(self, game_id: str):
+        """휴면 세션을 디스크에서 복원해서 재등록. 없으면 None"""
+        if game_id in self.games: return self.games[game_id]
+        snapshot = session_store.load_snapshot(game_id)
+        if not snapshot: return None
+        session = SoloGameSession.from_snapshot(snapshot)
+        if shard_pool.enabled:
+            session = shard_pool.add_session(session)
+        self.register(session)
+        # 복원에 성공한 뒤에만 삭제 (실패하면 스냅샷이 남아 다음 접속 / TTL 정리 때 다시 처리)
+        session_store.discard_snapshot(game_id)
+        self.restored += 1
+        return session
+
+    def purge_snapshots(self):
+        """SNAPSHOT_TTL이 지난 휴면 스냅샷 삭제. retire와 같이 리플레이를 먼저 보관 (보관 실패해도 삭제는 진행)"""
+        for game_id in session_store.expired_snapshots(SNAPSHOT_TTL):
+            try:
+                snapshot = session_store.load_snapshot(game_id)
+                replay = SoloGameSession.from_snapshot(snapshot).export_replay() if snapshot else None
+                if replay:
+                    session_store.save_replay(replay)
+            except Exception as e:
+                print(f"Error archiving replay {game_id}: {e}")
+            session_store.discard_snapshot(game_id)
+
+    async def reap(self):
+        """TTL이 지난 paused / finished 세션 휴면 처리 또는 제거"""
+        now = time.monotonic()
+        for game_id, since in list(self.since.items()):
+            session = self.games.get(game_id)
+            if not session:
+                self.since.pop(game_id, None)
+                continue
+            if session.status == STATUS_FINISHED:
+                if now - since >= FINISHED_TTL:
+                    await self.retire(game_id)
+            elif session.status == STATUS_PAUSED:
+                if now - since >= IDLE_TTL:
+                    await self.retire(game_id)
+                elif now - since >= HIBERNATE_AFTER:
+                    try:
+                        await self.hibernate(game_id)
+                    except Exception as e:
+                        print(f"Error hibernating session {game_id}: {e}")
+        self.purge_snapshots()
+
+    def get_load(self):
+        """메모리에 있는 세션들의 엔티티 / 투사체 수, 입력 처리 결과 합계"""
+        entities = projectiles = 0
+        commands = {}
+        for session in self.games.values():
+            if hasattr(session, "entities"):
+                entities += len(session.entities)
+                projectiles += len(session.projectiles)
+                for result, n in session.command_stats.items():
+                    commands[result] = commands.get(result, 0) + n
+            else: # 샤딩 모드 대리 객체: 마지막으로 받은 프레임 기준
+                state = session.get_broadcast_state() or {}
+                entities += len(state.get("entities", ()))
+                projectiles += len(state.get("projectiles", ()))
+        return {"entities": entities, "projectiles": projectiles, "commands": commands}
+
+    def get_stats(self):
+        counts = {}
+        for session in self.games.values():
+            counts[session.status] = counts.get(session.status, 0) + 1
+        return {**counts, "hibernated_total": self.hibernated, "restored_total": self.restored, "failed_total": self.failed}
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            try:
+                await self.reap()
+            except Exception as e:
+                print(f"Error in session reaper: {e}")
+
+lifecycle = SessionLifecycle(active_games)
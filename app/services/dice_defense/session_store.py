@@ -0,0 +1,70 @@
+# app/services/dice_defense/session_store.py
+import json
+import time
+import zlib
+from app.core.database import get_db_connection
+
+# -------------------------------------------------------------------------
+# 휴면 세션 저장소 (SQLite game_snapshots 테이블)
+# -------------------------------------------------------------------------
+# SoloGameSession.to_snapshot() 결과를 압축 JSON으로 저장했다가
+# 플레이어가 재접속하면 그대로 복원합니다.
+# 메모리에서 제거되는 세션의 리플레이 로그(export_replay)는 game_replays 테이블에 보관합니다.
+
+def encode_snapshot(snapshot: dict) -> bytes:
+    return zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+
+def decode_snapshot(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+def save_snapshot(snapshot: dict):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO game_snapshots (game_id, user_id, data, saved_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(game_id) DO UPDATE SET data=excluded.data, saved_at=excluded.saved_at",
+            (snapshot["game_id"], snapshot.get("user_id"), encode_snapshot(snapshot), time.time())
+        )
+        conn.commit()
+    finally: conn.close()
+
+def load_snapshot(game_id: str):
+    """저장된 스냅샷. 없으면 None (삭제하지 않음: 복원에 성공한 뒤 discard_snapshot 호출)"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT data FROM game_snapshots WHERE game_id = ?", (game_id,)).fetchone()
+        return decode_snapshot(row["data"]) if row else None
+    finally: conn.close()
+
+def discard_snapshot(game_id: str):
+    conn = get_db_connection()
+    try:
+        conn.execute("DELETE FROM game_snapshots WHERE game_id = ?", (game_id,))
+        conn.commit()
+    finally: conn.close()
+
+def save_replay(replay: dict):
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            "INSERT INTO game_replays (game_id, user_id, data, saved_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(game_id) DO UPDATE SET data=excluded.data, saved_at=excluded.saved_at",
+            (replay["game_id"], replay.get("user_id"), encode_snapshot(replay), time.time())
+        )
+        conn.commit()
+    finally: conn.close()
+
+def load_replay(game_id: str):
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT data FROM game_replays WHERE game_id = ?", (game_id,)).fetchone()
+        return decode_snapshot(row["data"]) if row else None
+    finally: conn.close()
+
+def expired_snapshots(max_age: float) -> list:
+    """max_age(초)보다 오래된 스냅샷의 game_id 목록 (리플레이 보관 후 discard_snapshot으로 삭제)"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT game_id FROM game_snapshots WHERE saved_at < ?", (time.time() - max_age,)).fetchall()
+        return [row["game_id"] for row in rows]
+    finally: conn.close()
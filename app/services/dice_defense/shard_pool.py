@@ -0,0 +1,315 @@
+# app/services/dice_defense/shard_pool.py
+import os
+import time
+import asyncio
+import threading
+import multiprocessing as mp
+from app.services.dice_defense.modes.solo.game import SIM_FPS, STATUS_RUNNING, STATUS_PAUSED, STATUS_FINISHED
+from app.services.dice_defense.protocol import DeltaEncoder, PreparedFrame
+
+# -------------------------------------------------------------------------
+# 프로세스 풀 기반 게임 시뮬레이션 샤딩
+# -------------------------------------------------------------------------
+# DICE_SIM_WORKERS > 0 이면 SoloGameSession을 워커 프로세스들에 분산하여 실행합니다.
+# - 웹 프로세스: 소켓만 유지, 입력(enqueue)을 워커로 전달, 완성된 상태 프레임을 받아 전송
+# - 워커 프로세스: 자신에게 배정된 세션들을 독자적인 30Hz 루프로 시뮬레이션하고
+#   상태 프레임은 방에 붙은 소켓 프로토콜(json / bin / delta)에 맞춰 인코딩까지 끝낸 PreparedFrame으로 보냄
+#   (웹 프로세스는 프레임 dict 언피클 / 직렬화 없이 연결별로 고르기만 함)
+# - 워커가 죽으면 (파이프 EOF / BrokenPipe) 그 워커의 세션은 복구할 수 없으므로 실패 처리(on_shard_lost)하고
+#   같은 자리에 새 워커를 띄워 이후 세션을 받음
+# 웹 프로세스 쪽에서는 ShardedSession이 SoloGameSession과 같은 인터페이스를 제공하므로
+# GlobalTicker/ConnectionManager는 모드에 상관없이 동일하게 동작합니다.
+
+SIM_WORKERS = int(os.environ.get("DICE_SIM_WORKERS", "0"))
+# 시작 후 이 시간(초) 안에 죽은 워커는 다시 띄워도 또 죽을 가능성이 높으므로 그 자리는 비워 둠 (재시작 폭주 방지)
+RESPAWN_MIN_UPTIME = 5.0
+
+def _worker_main(conn, fps):
+    """워커 프로세스 진입점: 명령 수신 + 고정 주기로 세션 업데이트 후 프레임 반환"""
+    sessions = {}
+    protocols = {} # game_id -> 방에 붙은 소켓 프로토콜 집합
+    encoders = {}  # game_id -> DeltaEncoder (delta 연결이 있는 방만)
+    interval = 1 / fps
+    next_deadline = time.perf_counter()
+
+    while True:
+        # 1. 다음 틱까지 명령 처리 (예정 시각이 지나면 중단하고 틱 실행)
+        while True:
+            timeout = next_deadline - time.perf_counter()
+            if timeout <= 0 or not conn.poll(timeout):
+                break
+            try:
+                msg = conn.recv()
+            except EOFError:
+                return
+            op = msg[0]
+            if op == 'add':
+                session = msg[1]
+                session.last_update_time = session.clock.now() # 이동 시간만큼 한번에 진행되지 않도록
+                sessions[session.game_id] = session
+            elif op == 'cmd':
+                session = sessions.get(msg[1])
+                if session: session.enqueue(msg[2])
+            elif op == 'remove':
+                sessions.pop(msg[1], None)
+                protocols.pop(msg[1], None)
+                encoders.pop(msg[1], None)
+            elif op == 'protocols':
+                protocols[msg[1]] = set(msg[2])
+                if "delta" not in msg[2]:
+                    encoders.pop(msg[1], None)
+                elif msg[1] not in encoders:
+                    encoders[msg[1]] = DeltaEncoder()
+            elif op == 'pause':
+                session = sessions.get(msg[1])
+                if session: session.pause()
+            elif op == 'resume':
+                session = sessions.get(msg[1])
+                if session: session.resume()
+            elif op in ('snapshot', 'replay'):
+                session = sessions.get(msg[1])
+                result = None
+                if session:
+                    result = session.to_snapshot() if op == 'snapshot' else session.export_replay()
+                try:
+                    conn.send(('reply', msg[2], result))
+                except (BrokenPipeError, OSError):
+                    return
+            elif op == 'stop':
+                return
+
+        # 2. 세션 업데이트 및 프레임 일괄 전송
+        frames = []
+        for gid, session in sessions.items():
+            try:
+                state = session.update()
+            except Exception as e:
+                print(f"[shard {os.getpid()}] Error in session {gid}: {e}")
+                continue
+            if state is None: continue
+            if state.get("type") == "STATE_UPDATE": # 락스텝 프레임은 작고 웹 쪽에서 합쳐야 하므로 dict 그대로
+                state = PreparedFrame(state, protocols.get(gid, ()), encoders.get(gid))
+            frames.append((gid, state))
+        if frames:
+            try:
+                conn.send(('frames', frames))
+            except (BrokenPipeError, OSError): # 웹 프로세스 종료
+                return
+
+        # 3. 드리프트 보정 (밀렸으면 현재 시각 기준으로 재정렬)
+        next_deadline += interval
+        now = time.perf_counter()
+        if now > next_deadline:
+            next_deadline = now
+
+class ShardedSession:
+    """
+    워커 프로세스에서 실행 중인 세션의 웹 프로세스 측 대리 객체.
+    update()는 워커가 보내준 최신 프레임을 반환(없으면 None)하므로 GlobalTicker에 그대로 구독됩니다.
+    """
+    def __init__(self, pool, shard_index: int, initial_state: dict):
+        self.pool = pool
+        self.shard_index = shard_index
+        self.game_id = initial_state["game_id"]
+        self.map = initial_state["map"]
+        self.last_state = initial_state["state"]
+        self.status = self.last_state.get("status")
+        self.sync_mode = initial_state.get("sync_mode")
+        self._pending = None # 아직 전송되지 않은 최신 프레임
+
+    def _on_frame(self, state: dict):
+        # 틱 사이에 여러 프레임이 도착하면 최신 것만 유지 (오래된 프레임 폐기)
+        # 락스텝 프레임은 입력/해시가 누적분이 아니므로 버리지 않고 합침
+        pending = self._pending
+        if pending is not None and state.get("type") == "LOCKSTEP":
+            for key in ("events", "hashes"):
+                if key in pending:
+                    state[key] = pending[key] + state.get(key, [])
+        self._pending = state
+        self.last_state = state
+        # 'pause' 처리 전에 워커가 만든 프레임이 늦게 도착해도 로컬 정지 상태는 유지 (게임 오버만 반영)
+        status = state.get("status", self.status)
+        if self.status != STATUS_PAUSED or status == STATUS_FINISHED:
+            self.status = status
+
+    def pause(self):
+        if self.status == STATUS_RUNNING:
+            self.status = STATUS_PAUSED
+            self._pending = None
+            self.pool.send(self.shard_index, ('pause', self.game_id))
+
+    def resume(self):
+        if self.status == STATUS_PAUSED:
+            self.status = STATUS_RUNNING
+            self.pool.send(self.shard_index, ('resume', self.game_id))
+
+    def update(self):
+        state, self._pending = self._pending, None
+        return state
+
+    def to_snapshot(self):
+        """워커에 있는 실제 세션의 스냅샷 요청 (awaitable)"""
+        return self.pool.request(self.shard_index, 'snapshot', self.game_id)
+
+    def export_replay(self):
+        """워커에 있는 실제 세션의 리플레이 로그 요청 (awaitable)"""
+        return self.pool.request(self.shard_index, 'replay', self.game_id)
+
+    def enqueue(self, command: dict):
+        """워커 세션의 입력 큐로 전달 (큐 가득 참 등 결과는 워커에서 집계)"""
+        self.pool.send(self.shard_index, ('cmd', self.game_id, command))
+        return True
+
+    def set_protocols(self, protocols: set):
+        """방에 붙은 소켓 프로토콜이 바뀜 -> 워커가 필요한 형식만 인코딩하도록 전달"""
+        self.pool.send(self.shard_index, ('protocols', self.game_id, sorted(protocols)))
+
+    def get_broadcast_state(self):
+        state = self.last_state
+        return state.to_dict() if isinstance(state, PreparedFrame) else state
+
+    def get_initial_state(self):
+        return {
+            "type": "INIT",
+            "game_id": self.game_id,
+            "map": self.map,
+            "sync_mode": self.sync_mode,
+            "state": self.get_broadcast_state()
+        }
+
+class ShardPool:
+    def __init__(self, workers: int = SIM_WORKERS, fps: int = SIM_FPS):
+        self.workers = workers
+        self.fps = fps
+        self.shards = []   # [(process, conn, lock, started_at)], 비워 둔 자리는 None
+        self.sessions = {} # game_id -> ShardedSession
+        self.loop = None
+        self._replies = {} # req_id -> (shard_index, Future)
+        self._req_seq = 0
+        self.respawned = 0 # 죽어서 다시 띄운 워커 수
+        self.on_shard_lost = None # 워커가 죽어 잃은 세션 처리 콜백 (game_id 목록) -> 세션 실패 처리
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        if not self.enabled or self.shards: return
+        self.loop = asyncio.get_running_loop()
+        for i in range(self.workers):
+            self.shards.append(self._spawn(i))
+        print(f">>> Simulation Shards Started ({self.workers} workers)")
+
+    def _spawn(self, index: int):
+        ctx = mp.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=_worker_main, args=(child_conn, self.fps), daemon=True, name=f"dice-shard-{index}")
+        proc.start()
+        child_conn.close()
+        # 파이프 수신은 블로킹이므로 샤드별 리더 스레드에서 받아 이벤트 루프로 넘김
+        threading.Thread(target=self._reader, args=(index, parent_conn), daemon=True, name=f"dice-shard-reader-{index}").start()
+        return proc, parent_conn, threading.Lock(), time.monotonic()
+
+    def stop(self):
+        shards, self.shards = self.shards, [] # 먼저 비워서 종료 중의 EOF를 워커 사망으로 처리하지 않음
+        for proc, conn, lock, _ in filter(None, shards):
+            try:
+                with lock: conn.send(('stop',))
+            except Exception: pass
+            proc.join(timeout=2)
+            if proc.is_alive(): proc.terminate()
+            conn.close()
+        self.sessions = {}
+
+    def send(self, shard_index: int, msg: tuple):
+        shard = self.shards[shard_index]
+        if shard is None: return # 비워 둔 자리 (배정된 세션은 이미 실패 처리됨)
+        _, conn, lock, _ = shard
+        try:
+            with lock:
+                conn.send(msg)
+        except (BrokenPipeError, OSError):
+            # 워커가 죽음: 리더 스레드의 EOF보다 먼저 알게 되는 경우 (처리는 한 번만 됨)
+            self.loop.call_soon_threadsafe(self._shard_lost, shard_index, conn)
+
+    async def request(self, shard_index: int, op: str, game_id: str, timeout: float = 5.0):
+        """워커에 요청을 보내고 ('reply', req_id, result) 응답을 기다림 (워커가 죽으면 ConnectionError)"""
+        self._req_seq += 1
+        req_id = self._req_seq
+        future = self.loop.create_future()
+        self._replies[req_id] = (shard_index, future)
+        try:
+            self.send(shard_index, (op, game_id, req_id))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._replies.pop(req_id, None)
+
+    def _reader(self, shard_index: int, conn):
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                try:
+                    self.loop.call_soon_threadsafe(self._shard_lost, shard_index, conn)
+                except RuntimeError: # 이벤트 루프가 이미 종료됨 (서버 종료 중)
+                    pass
+                return
+            self.loop.call_soon_threadsafe(self._dispatch, msg)
+
+    def _shard_lost(self, shard_index: int, conn):
+        """워커 사망 처리: 대기 중인 요청 실패, 배정된 세션 실패 처리, 같은 자리에 새 워커"""
+        shard = self.shards[shard_index] if shard_index < len(self.shards) else None
+        if shard is None or shard[1] is not conn:
+            return # 정상 종료 중이거나 이미 처리됨
+        proc, _, _, started_at = shard
+        proc.join(timeout=0.5)
+        conn.close()
+        if time.monotonic() - started_at < RESPAWN_MIN_UPTIME:
+            print(f"⚠️ Simulation shard {shard_index} died right after start (exitcode={proc.exitcode}), leaving it down")
+            self.shards[shard_index] = None
+        else:
+            print(f"⚠️ Simulation shard {shard_index} died (exitcode={proc.exitcode}), respawning")
+            self.shards[shard_index] = self._spawn(shard_index)
+            self.respawned += 1
+
+        for req_id, (index, future) in list(self._replies.items()):
+            if index == shard_index and not future.done():
+                future.set_exception(ConnectionError(f"simulation shard {shard_index} died"))
+        lost = [gid for gid, proxy in self.sessions.items() if proxy.shard_index == shard_index]
+        for gid in lost:
+            self.sessions.pop(gid).status = STATUS_FINISHED
+        if lost and self.on_shard_lost:
+            self.on_shard_lost(lost)
+
+    def _dispatch(self, msg):
+        if msg[0] == 'frames':
+            for gid, state in msg[1]:
+                proxy = self.sessions.get(gid)
+                if proxy: proxy._on_frame(state)
+        elif msg[0] == 'reply':
+            entry = self._replies.get(msg[1])
+            if entry and not entry[1].done():
+                entry[1].set_result(msg[2])
+
+    def _pick_shard(self) -> int:
+        load = [0 if shard else None for shard in self.shards]
+        if not any(x is not None for x in load):
+            raise RuntimeError("no simulation shard is running")
+        for proxy in self.sessions.values():
+            load[proxy.shard_index] += 1
+        return min((n, i) for i, n in enumerate(load) if n is not None)[1]
+
+    def add_session(self, session) -> ShardedSession:
+        """웹 프로세스에서 생성한 세션을 가장 한가한 워커로 이관하고 대리 객체를 반환"""
+        shard_index = self._pick_shard()
+        proxy = ShardedSession(self, shard_index, session.get_initial_state())
+        self.sessions[proxy.game_id] = proxy
+        self.send(shard_index, ('add', session))
+        return proxy
+
+    def remove_session(self, game_id: str):
+        proxy = self.sessions.pop(game_id, None)
+        if proxy:
+            self.send(proxy.shard_index, ('remove', game_id))
+
+shard_pool = ShardPool()
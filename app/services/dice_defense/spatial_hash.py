@@ -0,0 +1,85 @@
+# app/services/dice_defense/spatial_hash.py
+import math
+import numpy as np
+
+# -------------------------------------------------------------------------
+# 균일 격자 공간 인덱스 (범위 / 최근접 질의)
+# -------------------------------------------------------------------------
+# 매 스텝 엔티티 위치(EntityStore.positions)로 다시 구성하며,
+# 질의 결과는 해당 배열의 행 인덱스 = session.entities.views()의 인덱스입니다.
+# - 위치 계산과 버킷 구성은 그 스텝의 첫 질의 때 한 번만 (범위 질의가 없는 스텝은 비용 0)
+# - 스플래시 / 체인 / 전염(infection) 등 범위형 주사위 on_hit에서 사용
+
+CELL_SIZE = 200 # 가장 흔한 질의 반경(체인 200px) 기준
+KEY_STRIDE = 1 << 20 # (cx, cy) -> 정수 키 변환용
+
+class SpatialHash:
+    def __init__(self, cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self._cells = None # 셀 키 -> 행 인덱스 배열 (첫 질의 때 구성)
+        self._positions = None # 첫 질의 때 (x, y)를 돌려줄 함수 (rebuild_lazy)
+
+    @classmethod
+    def from_mobs(cls, mobs: list, cell_size: float = CELL_SIZE):
+        """dict / RowView 목록으로 바로 구성 (세션 밖에서 on_hit를 호출할 때용)"""
+        index = cls(cell_size)
+        index.rebuild(np.array([m['x'] for m in mobs], dtype=np.float64),
+                      np.array([m['y'] for m in mobs], dtype=np.float64))
+        return index
+
+    def rebuild(self, x, y):
+        """이번 스텝의 위치 배열 지정"""
+        self.x, self.y = x, y
+        self._cells = None
+        self._positions = None
+
+    def rebuild_lazy(self, positions):
+        """위치 배열 대신 (x, y)를 돌려주는 함수 지정 -> 첫 질의 때 호출"""
+        self._cells = None
+        self._positions = positions
+
+    def _build(self):
+        if self._positions is not None:
+            self.x, self.y = self._positions()
+            self._positions = None
+        keys = (np.floor(self.x / self.cell_size).astype(np.int64) * KEY_STRIDE
+                + np.floor(self.y / self.cell_size).astype(np.int64))
+        order = np.argsort(keys, kind="stable")
+        cell_keys, starts = np.unique(keys[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self._cells = {k: order[s:e] for k, s, e in zip(cell_keys.tolist(), starts.tolist(), ends.tolist())}
+
+    def _candidates(self, x: float, y: float, radius: float):
+        if self._cells is None:
+            self._build()
+        cs = self.cell_size
+        parts = []
+        for cx in range(math.floor((x - radius) / cs), math.floor((x + radius) / cs) + 1):
+            for cy in range(math.floor((y - radius) / cs), math.floor((y + radius) / cs) + 1):
+                rows = self._cells.get(cx * KEY_STRIDE + cy)
+                if rows is not None:
+                    parts.append(rows)
+        if not parts:
+            return np.zeros(0, dtype=np.intp)
+        return np.sort(np.concatenate(parts))
+
+    def query_radius(self, x: float, y: float, radius: float, with_dist: bool = False):
+        """(x, y)에서 radius 이내인 행 인덱스 (행 순서대로)"""
+        rows = self._candidates(x, y, radius)
+        dx = self.x[rows] - x
+        dy = self.y[rows] - y
+        dist = np.sqrt(dx * dx + dy * dy)
+        inside = dist <= radius
+        if with_dist:
+            return rows[inside], dist[inside]
+        return rows[inside]
+
+    def query_nearest(self, x: float, y: float, radius: float, k: int = None):
+        """radius 이내 행 인덱스를 가까운 순으로 (거리가 같으면 행 순서), 최대 k개"""
+        rows, dist = self.query_radius(x, y, radius, with_dist=True)
+        order = np.argsort(dist, kind="stable")
+        if k is not None:
+            order = order[:k]
+        return rows[order]
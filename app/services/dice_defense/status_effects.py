@@ -0,0 +1,97 @@
+# app/services/dice_defense/status_effects.py
+from app.core.timer_wheel import TimerWheel
+
+# -------------------------------------------------------------------------
+# 상태이상 엔진 (독 DoT, 얼음 감속)
+# -------------------------------------------------------------------------
+# 효과 데이터는 엔티티의 effects dict에 두고 (클라이언트 표시 / 스냅샷에 그대로 포함),
+# 다음 처리 시점(주기 데미지, 만료)은 틱 단위 TimerWheel에 예약합니다.
+# - 스텝당 비용은 그 틱에 도래한 예약 수에만 비례 (모든 엔티티를 훑지 않음)
+# - 효과 종류당 엔티티마다 예약은 항상 1개: 재적용(스택/갱신)은 dict만 고치고
+#   기존 예약이 도래했을 때 갱신된 만료 시각을 보고 다시 예약
+# - 스택 규칙: 적용할 때마다 stacks +1 (max_stacks 상한), 지속시간 갱신, value는 큰 쪽 유지
+#     poison: 매 interval마다 value * stacks 데미지
+#     ice:    이동 속도에 (1 - value%) ^ stacks 배율 (EntityStore slow 컬럼 -> move()에서 적용)
+
+EFFECT_RULES = {
+    "poison": {"duration": 5.0, "interval": 1.0, "max_stacks": 3},
+    "ice":    {"duration": 2.0, "interval": None, "max_stacks": 3},
+}
+
+class StatusEffects:
+    def __init__(self, entities, fps: int):
+        self.entities = entities # EntityStore
+        self.fps = fps
+        self.wheel = TimerWheel()
+        self.tick = 0
+        self.on_speed_change = None # 감속 배율이 바뀐 엔티티 id를 받는 콜백 (명중 예약 재계산용)
+        self.damage_meter = None # 효과 종류별 누적 유효 데미지 dict (밸런스 시뮬레이션에서만 지정)
+
+    def _ticks(self, seconds: float) -> int:
+        return max(1, round(seconds * self.fps))
+
+    def apply(self, target, kind: str, value: float):
+        """target(RowView)에 효과 적용 / 스택"""
+        rule = EFFECT_RULES[kind]
+        effects = target.get('effects')
+        if effects is None:
+            effects = target['effects'] = {}
+        expires = self.tick + self._ticks(rule["duration"])
+        effect = effects.get(kind)
+        if effect is None:
+            effects[kind] = {"value": value, "stacks": 1, "expires": expires}
+            if rule["interval"]: effects[kind]["last"] = self.tick # 마지막 주기 데미지 틱
+            first = self.tick + self._ticks(rule["interval"]) if rule["interval"] else expires
+            self.wheel.schedule(min(first, expires), (kind, target['id']))
+        else:
+            effect["stacks"] = min(effect["stacks"] + 1, rule["max_stacks"])
+            effect["value"] = max(effect["value"], value)
+            effect["expires"] = expires
+        if kind == "ice":
+            self._set_slow(target, self._slow(effects[kind]))
+
+    def _slow(self, effect) -> float:
+        return max(0.0, 1 - effect["value"] / 100) ** effect["stacks"]
+
+    def _set_slow(self, target, slow: float):
+        if target['slow'] == slow: return
+        target['slow'] = slow
+        if self.on_speed_change: self.on_speed_change(target['id'])
+
+    def advance(self, tick: int):
+        """tick에 도래한 예약 처리 (스텝 시작 시 매 틱 호출)"""
+        self.tick = tick
+        for kind, entity_id in self.wheel.pop_due(tick):
+            target = self.entities.view(entity_id)
+            if target is None: continue # 이미 사망/도착해서 제거됨
+            effect = target['effects'].get(kind)
+            if effect is None: continue
+            rule = EFFECT_RULES[kind]
+
+            interval = self._ticks(rule["interval"]) if rule["interval"] else None
+            if interval and tick - effect["last"] >= interval:
+                damage = effect["value"] * effect["stacks"]
+                if self.damage_meter is not None:
+                    self.damage_meter[kind] = self.damage_meter.get(kind, 0) + min(damage, max(target['hp'], 0))
+                target['hp'] -= damage # 0 이하가 되면 이번 스텝 사망 처리에서 제거
+                effect["last"] = tick
+
+            if tick >= effect["expires"]:
+                del target['effects'][kind]
+                if kind == "ice": self._set_slow(target, 1.0)
+                continue
+            next_tick = effect["last"] + interval if interval else effect["expires"]
+            self.wheel.schedule(min(next_tick, effect["expires"]), (kind, entity_id))
+
+    # 직렬화 (휴면 스냅샷)
+    def dump(self) -> list:
+        return [[due, kind, entity_id] for due, (kind, entity_id) in self.wheel.items()]
+
+    def load(self, timers: list, tick: int):
+        """dump() 결과 재예약 + 엔티티 effects로 감속 배율 복원"""
+        self.tick = tick
+        for due, kind, entity_id in timers:
+            self.wheel.schedule(due, (kind, entity_id))
+        for target in self.entities.views():
+            ice = target['effects'].get('ice') if 'effects' in target else None
+            if ice: target['slow'] = self._slow(ice)
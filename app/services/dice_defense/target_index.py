@@ -0,0 +1,77 @@
+# app/services/dice_defense/target_index.py
+import random
+import numpy as np
+
+# -------------------------------------------------------------------------
+# 스텝 단위 타겟 선정 캐시
+# -------------------------------------------------------------------------
+# 경로 진행 거리(EntityStore의 progress 컬럼) 내림차순 인덱스를 스텝마다 한 번만 만들고,
+# 자주 쓰는 타겟 질의(최전방, 독 없는 최전방, 최고 체력) 결과를 그 스텝 동안 모든 주사위가 공유합니다.
+# - 모든 질의는 필요할 때 처음 한 번만 계산 (공격하는 주사위가 없는 스텝은 비용 0)
+# - 타겟 선정(주사위 공격 단계) 중에는 위치/체력/상태이상이 변하지 않으므로 캐시가 유효
+#   (데미지와 독 부여는 그 다음 투사체 단계에서 일어남)
+
+def is_poisoned(mob) -> bool:
+    effects = mob.get('effects')
+    return bool(effects and effects.get('poison')) or bool(mob.get('poison_stacks'))
+
+class TargetIndex:
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng or random.Random()
+        self.rebuild([], np.zeros(0), np.zeros(0))
+
+    @classmethod
+    def from_mobs(cls, mobs: list, rng: random.Random = None):
+        """dict / RowView 목록으로 바로 구성 (세션 밖에서 find_target을 호출할 때용)"""
+        index = cls(rng)
+        index.rebuild(
+            mobs,
+            np.array([m['progress'] if 'progress' in m else m['path_index'] for m in mobs], dtype=np.float64),
+            np.array([m['hp'] for m in mobs], dtype=np.float64),
+        )
+        return index
+
+    def rebuild(self, mobs: list, progress, hp):
+        """이번 스텝의 살아있는 적 목록과 같은 순서의 progress / hp 배열 지정"""
+        self.mobs = mobs
+        self.progress = progress
+        self.hp = hp
+        self._order = None
+        self._cache = {}
+
+    @property
+    def order(self):
+        """경로 진행 거리 내림차순 행 인덱스 (같으면 먼저 스폰된 순)"""
+        if self._order is None:
+            self._order = np.argsort(-self.progress, kind="stable")
+        return self._order
+
+    def front(self):
+        """가장 앞서가는 적"""
+        if 'front' not in self._cache:
+            self._cache['front'] = self.mobs[int(self.order[0])] if self.mobs else None
+        return self._cache['front']
+
+    def front_unpoisoned(self):
+        """독에 걸리지 않은 적 중 가장 앞서가는 적 (앞에서부터 찾으므로 보통 몇 개만 확인)"""
+        if 'front_unpoisoned' not in self._cache:
+            found = None
+            for i in self.order.tolist():
+                if not is_poisoned(self.mobs[i]):
+                    found = self.mobs[i]
+                    break
+            self._cache['front_unpoisoned'] = found
+        return self._cache['front_unpoisoned']
+
+    def strongest(self):
+        """체력이 가장 높은 적 (같으면 더 앞선 적)"""
+        if 'strongest' not in self._cache:
+            found = None
+            if self.mobs:
+                found = self.mobs[int(np.lexsort((-self.progress, -self.hp))[0])]
+            self._cache['strongest'] = found
+        return self._cache['strongest']
+
+    def random(self):
+        """무작위 적 (호출마다 새로 뽑음, 세션 난수 사용)"""
+        return self.rng.choice(self.mobs) if self.mobs else None
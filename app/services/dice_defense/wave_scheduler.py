@@ -0,0 +1,104 @@
+# app/services/dice_defense/wave_scheduler.py
+from functools import lru_cache
+import numpy as np
+from app.services.dice_defense.game_data import WAVE_TABLES
+
+# -------------------------------------------------------------------------
+# 데이터 기반 웨이브 스케줄러
+# -------------------------------------------------------------------------
+# game_data.WAVE_TABLES의 웨이브 정의를 웨이브마다 한 번만 "스폰 계획"으로 컴파일해 둡니다.
+#   계획 = 웨이브 시작 기준 틱 오프셋(정렬) + 타입 + 묶음 크기 배열
+# 매 스텝은 커서 이후에서 이번 틱까지 도래한 묶음만 잘라서 (searchsorted) 돌려주고,
+# 세션은 묶음 단위로 EntityStore.append_many()에 한 번에 넣습니다.
+# 웨이브는 duration마다 시간 기준으로 넘어가며, 테이블 끝 이후는 마지막 웨이브를
+# count_growth 배율로 키워 반복합니다 (묶음 간격을 같은 배율로 줄여 웨이브 길이 안에 모두 나오게 함,
+# HP는 hp_growth 배율).
+# 웨이브 길이(duration)를 넘는 오프셋의 묶음은 나오지 않으므로 컴파일 시 ValueError로 거부.
+
+DEFAULT_WAVE_TABLE = "standard"
+
+class WavePlan:
+    __slots__ = ("offsets", "types", "counts", "duration", "hp_scale")
+
+    def __init__(self, offsets, types, counts, duration: int, hp_scale: float):
+        self.offsets = offsets   # np.int64, 웨이브 시작 후 틱 (오름차순)
+        self.types = types       # 묶음별 엔티티 타입
+        self.counts = counts     # 묶음별 마리 수
+        self.duration = duration # 웨이브 길이 (틱)
+        self.hp_scale = hp_scale
+
+@lru_cache(maxsize=256)
+def compile_wave(table_name: str, wave: int, fps: int) -> WavePlan:
+    """wave번째(1부터) 웨이브의 스폰 계획"""
+    table = WAVE_TABLES[table_name]
+    waves = table["waves"]
+    groups = waves[min(wave, len(waves)) - 1]
+    growth = table.get("count_growth", 1.0) ** max(0, wave - len(waves))
+
+    events = [] # (offset, 그룹 순서, 타입, 마리 수)
+    for order, group in enumerate(groups):
+        remaining = max(1, round(group["count"] * growth))
+        burst = group.get("burst", 1)
+        interval = group.get("interval", 0.0) / growth
+        at = group.get("delay", 0.0)
+        while remaining > 0:
+            n = min(burst, remaining)
+            events.append((round(at * fps), order, group["type"], n))
+            remaining -= n
+            at += interval
+    duration = round(table["duration"] * fps)
+    late = [e for e in events if e[0] > duration]
+    if late: # 다음 웨이브로 넘어가면 남은 묶음은 스폰되지 않음 (경계 틱은 전환 전에 스폰됨)
+        raise ValueError(f"Wave table {table_name} wave {wave}: group {late[0][1]} spawns at tick {late[0][0]}, "
+                         f"past the wave duration ({duration} ticks)")
+    events.sort(key=lambda e: (e[0], e[1]))
+    return WavePlan(
+        np.array([e[0] for e in events], dtype=np.int64),
+        [e[2] for e in events],
+        [e[3] for e in events],
+        duration,
+        table.get("hp_growth", 1.0) ** (wave - 1),
+    )
+
+class WaveScheduler:
+    def __init__(self, table: str = DEFAULT_WAVE_TABLE, fps: int = 30):
+        if table not in WAVE_TABLES:
+            raise ValueError(f"Unknown wave table: {table}")
+        self.table = table
+        self.fps = fps
+        self.wave = 1
+        self.wave_start = 0 # 현재 웨이브 시작 틱
+        self.cursor = 0     # 현재 웨이브 계획에서 다음에 나올 묶음
+        self.plan = compile_wave(table, 1, fps)
+
+    def _next_wave(self):
+        self.wave_start += self.plan.duration
+        self.wave += 1
+        self.cursor = 0
+        self.plan = compile_wave(self.table, self.wave, self.fps)
+
+    def due(self, tick: int) -> list:
+        """tick까지 도래한 스폰 묶음 [(타입, 마리 수, HP 배율)]. 웨이브 전환도 여기서 처리"""
+        batches = []
+        while True:
+            plan = self.plan
+            end = int(np.searchsorted(plan.offsets, tick - self.wave_start, side="right"))
+            for i in range(self.cursor, end):
+                batches.append((plan.types[i], plan.counts[i], plan.hp_scale))
+            self.cursor = end
+            if tick - self.wave_start < plan.duration:
+                return batches
+            self._next_wave()
+
+    # 직렬화 (휴면 스냅샷)
+    def dump(self) -> dict:
+        return {"table": self.table, "wave": self.wave, "wave_start": self.wave_start, "cursor": self.cursor}
+
+    @classmethod
+    def load(cls, data: dict, fps: int = 30):
+        scheduler = cls(data["table"], fps)
+        scheduler.wave = data["wave"]
+        scheduler.wave_start = data["wave_start"]
+        scheduler.cursor = data["cursor"]
+        scheduler.plan = compile_wave(scheduler.table, scheduler.wave, fps)
+        return scheduler
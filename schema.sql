@@ -31,4 +31,20 @@ CREATE TABLE IF NOT EXISTS user_decks (
     slot_5 TEXT NOT NULL,
     PRIMARY KEY (user_id, preset_index),
     FOREIGN KEY (user_id) REFERENCES users (id)
-);
\ No newline at end of file
+);
+
+-- 휴면(hibernate) 처리된 솔로 게임 세션 스냅샷 (zlib 압축 JSON)
+CREATE TABLE IF NOT EXISTS game_snapshots (
+    game_id TEXT PRIMARY KEY,
+    user_id INTEGER,
+    data BLOB NOT NULL,
+    saved_at REAL NOT NULL
+);
+
+-- 종료된 솔로 게임 리플레이 로그 (시드 + 틱별 입력, zlib 압축 JSON)
+CREATE TABLE IF NOT EXISTS game_replays (
+    game_id TEXT PRIMARY KEY,
+    user_id INTEGER,
+    data BLOB NOT NULL,
+    saved_at REAL NOT NULL
+);
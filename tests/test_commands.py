@@ -0,0 +1,38 @@
+# tests/test_commands.py
+import pytest
+from app.core.sim_clock import VirtualClock
+from app.services.dice_defense.modes.solo.game import SoloGameSession, FIXED_DT
+
+DECK = ['fire', 'electric', 'wind', 'ice', 'poison']
+
+def make_session():
+    clock = VirtualClock()
+    return SoloGameSession(1, DECK, clock=clock, seed=1), clock
+
+@pytest.mark.parametrize("command", [
+    {"type": "MERGE", "source_index": [0], "target_index": 1},   # unhashable
+    {"type": "MERGE", "source_index": 0},                         # 인덱스 누락
+    {"type": "MERGE", "source_index": 0, "target_index": 999},    # 범위 밖
+    {"type": "MERGE", "source_index": -1, "target_index": 1},
+    {"type": "MERGE", "source_index": True, "target_index": 1},   # bool은 int가 아님
+    {"type": "MERGE", "source_index": "0", "target_index": 1},
+    {"type": "NUKE"},
+    ["SPAWN"],
+])
+def test_malformed_command_rejected_at_enqueue(command):
+    session, _ = make_session()
+    assert session.enqueue(command) is False
+    assert session.command_stats["rejected"] == 1
+    assert session.pending_commands == []
+
+def test_malformed_command_does_not_lose_batch():
+    session, clock = make_session()
+    session.enqueue({"type": "SPAWN"})
+    session.enqueue({"type": "MERGE", "source_index": [0], "target_index": 1})
+    session.enqueue({"type": "SPAWN"})
+    clock.advance(FIXED_DT)
+    session.update()
+    stats = session.command_stats
+    assert stats["applied"] == 2
+    assert stats["rejected"] == 1
+    assert sum(1 for cell in session.grid if cell["dice"]) == 2
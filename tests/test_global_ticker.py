@@ -0,0 +1,36 @@
+# tests/test_global_ticker.py
+import asyncio
+import time
+from app.core.global_ticker import GlobalTicker
+
+class FakeSession:
+    def __init__(self, game_id, cost=0.0):
+        self.game_id = game_id
+        self.cost = cost
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+        end = time.perf_counter() + self.cost
+        while time.perf_counter() < end: pass
+        return None
+
+def test_slow_session_deferred_alone():
+    ticker = GlobalTicker(fps=30, budget_ratio=10.0, session_budget_ratio=0.1)
+    slow = FakeSession("slow", cost=ticker.session_budget * 2)
+    fast = FakeSession("fast")
+    ticker.subscribe(slow, None)
+    ticker.subscribe(fast, None)
+
+    for _ in range(4):
+        asyncio.run(ticker.run_tick())
+
+    # 상한을 넘긴 세션은 한 틱 걸러 한 번만 돌고, 다른 세션은 매 틱 업데이트됨
+    assert fast.updates == 4
+    assert slow.updates == 2
+    assert ticker.session_overruns == {slow: 2}
+    assert ticker.stats["session_overruns"] == 2
+    assert ticker.stats["deferred_updates"] == 2
+
+    ticker.unsubscribe(slow)
+    assert ticker.get_stats()["slow_sessions"] == 0
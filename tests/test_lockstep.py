@@ -0,0 +1,88 @@
+# tests/test_lockstep.py
+import json
+import random
+import asyncio
+import pytest
+from app.core.sim_clock import VirtualClock
+from app.services.dice_defense.modes.solo.game import SoloGameSession, SYNC_LOCKSTEP, FIXED_DT
+from app.services.dice_defense.lockstep import LockstepMirror
+from app.services.dice_defense.connection_manager import ConnectionManager, RESYNC_BURST
+
+DECK = ['fire', 'electric', 'wind', 'ice', 'poison']
+
+def resync_message(session):
+    # 실제 전송과 같이 JSON 왕복
+    return json.loads(json.dumps({"type": "LOCKSTEP_RESYNC", "snapshot": session.to_snapshot()}))
+
+def run_lockstep(mode, ticks=1500, corrupt_at=None):
+    clock = VirtualClock()
+    session = SoloGameSession(1, DECK, clock=clock, seed=7, projectile_mode=mode, sync_mode=SYNC_LOCKSTEP)
+    mirror = LockstepMirror()
+    mirror.on_message(resync_message(session))
+    rng = random.Random(1)
+    for i in range(ticks):
+        if rng.random() < 0.3: session.enqueue({"type": "SPAWN"})
+        if rng.random() < 0.2:
+            session.enqueue({"type": "MERGE", "source_index": rng.randrange(15), "target_index": rng.randrange(15)})
+        clock.advance(FIXED_DT)
+        frame = session.update()
+        if i == corrupt_at: mirror.session.sp += 1
+        if frame is None: continue
+        if mirror.on_message(json.loads(json.dumps(frame))):
+            mirror.on_message(resync_message(session))
+    return session, mirror
+
+@pytest.mark.parametrize("mode", ["homing", "analytic"])
+def test_mirror_hashes_agree(mode):
+    session, mirror = run_lockstep(mode)
+    assert mirror.verified > 0
+    assert mirror.mismatches == 0
+    assert mirror.session.state_digest() == session.state_digest()
+
+def test_mirror_recovers_after_divergence():
+    session, mirror = run_lockstep("homing", corrupt_at=300)
+    assert mirror.mismatches == 1
+    assert mirror.session.state_digest() == session.state_digest()
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self): pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+async def flush(conn):
+    # writer 태스크가 큐에 있는 메시지를 모두 보낼 때까지 양보
+    target = conn.sent + len(conn.queue)
+    for _ in range(100):
+        if conn.sent >= target: return
+        await asyncio.sleep(0)
+
+def test_resync_admission():
+    async def scenario():
+        manager = ConnectionManager()
+        player, viewer = FakeSocket(), FakeSocket()
+        conn = await manager.connect("g", player)
+        await manager.connect("g", viewer, spectator=True)
+        try:
+            assert not manager.admit_resync("g", viewer)
+
+            # 전송 대기 중인 재동기화가 있으면 추가 요청 거부
+            assert manager.admit_resync("g", player)
+            assert not manager.admit_resync("g", player)
+            manager.send_personal("g", player, {"type": "LOCKSTEP_RESYNC"})
+            await flush(conn)
+            assert player.sent and not conn.resync_pending
+
+            # 버킷이 비면 전송이 끝나도 거부
+            for _ in range(RESYNC_BURST - 1):
+                assert manager.admit_resync("g", player)
+                manager.send_personal("g", player, {"type": "LOCKSTEP_RESYNC"})
+                await flush(conn)
+            assert not manager.admit_resync("g", player)
+        finally:
+            for ws in (player, viewer):
+                manager.disconnect("g", ws)
+    asyncio.run(scenario())
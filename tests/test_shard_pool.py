@@ -0,0 +1,90 @@
+# tests/test_shard_pool.py
+import json
+import asyncio
+from app.core.sim_clock import VirtualClock
+from app.services.dice_defense.connection_manager import ConnectionManager
+from app.services.dice_defense.protocol import DeltaEncoder, PreparedFrame, encode_body
+from app.services.dice_defense.shard_pool import ShardPool
+from app.services.dice_defense.modes.solo.game import SoloGameSession, FIXED_DT, STATUS_FINISHED
+
+DECK = ['fire', 'electric', 'wind', 'ice', 'poison']
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self): pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+async def drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+def test_prepared_frames_per_protocol():
+    async def scenario():
+        clock = VirtualClock()
+        session = SoloGameSession(1, DECK, clock=clock, seed=1)
+        session.process_command({"type": "SPAWN"})
+        manager, encoder = ConnectionManager(), DeltaEncoder()
+        plain, binary, delta = FakeSocket(), FakeSocket(), FakeSocket()
+        await manager.connect("g", plain)
+        await manager.connect("g", binary, binary=True)
+        await manager.connect("g", delta, delta=True)
+        protocols = manager.protocols("g")
+        assert protocols == {"json", "bin", "delta"}
+        try:
+            frames = 0
+            while frames < 10:
+                clock.advance(FIXED_DT)
+                state = session.update()
+                if state is None: continue
+                frames += 1
+                prepared = PreparedFrame(state, protocols, encoder)
+                # 워커 <-> 웹 프로세스 사이 그대로 피클되는 값만 담겨야 함
+                assert prepared.body["records"] == encode_body(state)["records"]
+                await manager.broadcast("g", prepared)
+                await drain()
+                manager.ack("g", delta, delta.sent[-1]["seq"])
+        finally:
+            for ws in (plain, binary, delta):
+                manager.disconnect("g", ws)
+
+        assert {m["type"] for m in plain.sent} == {"STATE_UPDATE"}
+        assert sum(isinstance(m, bytes) for m in binary.sent) == 10
+        assert any(isinstance(m, dict) and m["type"] == "BIN_DICT" for m in binary.sent)
+        kinds = [m["type"] for m in delta.sent]
+        assert kinds[0] == "STATE_UPDATE" and "STATE_DELTA" in kinds
+        assert plain.sent[-1] == json.loads(prepared.text)
+    asyncio.run(scenario())
+
+def test_dead_worker_fails_its_sessions():
+    async def scenario():
+        pool = ShardPool(workers=1)
+        pool.start()
+        lost = []
+        pool.on_shard_lost = lost.extend
+        try:
+            proxy = pool.add_session(SoloGameSession(1, DECK, seed=1))
+            assert (await proxy.to_snapshot())["game_id"] == proxy.game_id
+            pool.shards[0] = pool.shards[0][:3] + (0.0,) # 충분히 오래 돈 워커로 취급 (재시작 대상)
+            pool.shards[0][0].kill()
+            for _ in range(50):
+                if lost: break
+                await asyncio.sleep(0.1)
+            assert lost == [proxy.game_id]
+            assert proxy.status == STATUS_FINISHED
+            assert pool.respawned == 1 and pool.shards[0][0].is_alive()
+            # 새 워커는 이후 세션을 받음
+            fresh = pool.add_session(SoloGameSession(1, DECK, seed=2))
+            assert (await fresh.to_snapshot())["game_id"] == fresh.game_id
+        finally:
+            pool.stop()
+    asyncio.run(scenario())
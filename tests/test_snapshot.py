@@ -0,0 +1,74 @@
+# tests/test_snapshot.py
+import json
+import pytest
+from app.core import database
+from app.core.sim_clock import VirtualClock
+from app.services.dice_defense import session_store, session_lifecycle
+from app.services.dice_defense.headless import ScriptedPlayer
+from app.services.dice_defense.modes.solo.game import SoloGameSession, FIXED_DT
+from app.services.dice_defense.replay import verify
+
+DECK = ['fire', 'electric', 'wind', 'ice', 'poison']
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+
+def played_session(mode, ticks=1200):
+    clock = VirtualClock()
+    session = SoloGameSession(1, DECK, clock=clock, seed=3, projectile_mode=mode)
+    player = ScriptedPlayer(session)
+    for _ in range(ticks):
+        clock.advance(FIXED_DT)
+        player.act()
+        session.update()
+    return session
+
+def step(session, ticks):
+    for _ in range(ticks):
+        session._step(FIXED_DT)
+
+@pytest.mark.parametrize("mode", ["homing", "analytic"])
+def test_snapshot_roundtrip_digest(mode):
+    session = played_session(mode)
+    restored = SoloGameSession.from_snapshot(json.loads(json.dumps(session.to_snapshot())))
+    assert restored.state_digest() == session.state_digest()
+    # 복원 후에도 같은 시뮬레이션이 이어져야 함
+    step(session, 300)
+    step(restored, 300)
+    assert restored.state_digest() == session.state_digest()
+
+@pytest.mark.parametrize("mode", ["homing", "analytic"])
+def test_replay_verify(mode):
+    session = played_session(mode)
+    restored = SoloGameSession.from_snapshot(session.to_snapshot())
+    step(restored, 300)
+    result = verify(json.loads(json.dumps(restored.export_replay())))
+    assert result["match"] is True
+
+def test_restore_keeps_snapshot_until_success(db, monkeypatch):
+    session = played_session("homing", ticks=300)
+    session_store.save_snapshot(session.to_snapshot())
+    lifecycle = session_lifecycle.SessionLifecycle({})
+
+    def broken(data, clock=None): raise ValueError("bad snapshot")
+    with monkeypatch.context() as m:
+        m.setattr(SoloGameSession, "from_snapshot", broken)
+        with pytest.raises(ValueError):
+            lifecycle.restore(session.game_id)
+    assert session_store.load_snapshot(session.game_id) is not None
+
+    restored = lifecycle.restore(session.game_id)
+    assert restored.state_digest() == session.state_digest()
+    assert session_store.load_snapshot(session.game_id) is None
+
+def test_expired_snapshot_archives_replay(db, monkeypatch):
+    session = played_session("analytic", ticks=300)
+    session_store.save_snapshot(session.to_snapshot())
+    monkeypatch.setattr(session_lifecycle, "SNAPSHOT_TTL", -1)
+    session_lifecycle.SessionLifecycle({}).purge_snapshots()
+    assert session_store.load_snapshot(session.game_id) is None
+    replay = session_store.load_replay(session.game_id)
+    assert replay["end_tick"] == session.tick
+    assert verify(replay)["match"] is True
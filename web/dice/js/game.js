@@ -15,6 +15,34 @@ let socket = null;
 let gameId = null;
 let deckInfoMap = {}; // ID -> 덱 상세정보(색상, 아이콘 등) 캐싱
 
+// 와이어 프로토콜: 'bin' (바이너리 프레임) | 'delta' (JSON 델타) | 'json' (전체 상태)
+const WIRE_PROTOCOL = 'bin';
+
+// 델타 프로토콜: seq -> 해당 프레임의 전체 상태 (STATE_DELTA 적용 기준)
+const stateHistory = new Map();
+const STATE_HISTORY_SIZE = 64;
+
+// 바이너리 프로토콜: 문자열 코드표, 한 번만 전송되는 엔티티/투사체 정적 정보
+const binDict = {};
+const entityDefs = new Map();
+const projectileDefs = new Map();
+
+// 보간: 서버는 시뮬레이션(30Hz)보다 낮은 주기(net_rate)로 전송하므로
+// 받은 스냅샷 사이를 server_time 기준으로 선형 보간해서 렌더링
+let netRate = 15;
+let simRate = 30;
+const snapshots = []; // { time, entities: Map, projectiles: Map }
+const SNAPSHOT_BUFFER_SIZE = 32;
+
+// 엔티티 타입별 색상 (서버 entities/ 의 type과 일치)
+const ENTITY_COLORS = {
+    normal_mob: '#ef4444',
+    fast_mob: '#f59e0b',
+    tank_mob: '#7c3aed',
+    boss_mob: '#111827',
+};
+let serverTimeOffset = null; // (클라이언트 시간 - 서버 시간) 추정치
+
 const API_DICE = "https://api.pyosh.cloud/api/dice";
 const myId = sessionStorage.getItem('username');
 
@@ -129,10 +157,14 @@ function connectWebSocket(gid, deckDetails) {
         const apiObj = new URL(API_DICE);
         const protocol = apiObj.protocol === 'https:' ? 'wss:' : 'ws:';
         const host = apiObj.host;
-        const wsUrl = `${protocol}//${host}/ws/game/${gid}`;
+        let query = '';
+        if (WIRE_PROTOCOL === 'bin') query = '?proto=bin';
+        else if (WIRE_PROTOCOL === 'delta') query = '?delta=1';
+        const wsUrl = `${protocol}//${host}/ws/game/${gid}${query}`;
         
         console.log("Connecting WS:", wsUrl);
         socket = new WebSocket(wsUrl);
+        socket.binaryType = 'arraybuffer';
     } catch (e) {
         console.error("Invalid API URL:", e);
         return;
@@ -144,6 +176,10 @@ function connectWebSocket(gid, deckDetails) {
     };
 
     socket.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+            handleServerMessage(decodeBinaryFrame(event.data), deckDetails);
+            return;
+        }
         const msg = JSON.parse(event.data);
         handleServerMessage(msg, deckDetails);
     };
@@ -167,6 +203,9 @@ function handleServerMessage(msg, deckDetails) {
         // [초기화 메시지]
         gameMap = msg.map;
         gameState = msg.state;
+        if (msg.net_rate) netRate = msg.net_rate;
+        if (msg.sim_rate) simRate = msg.sim_rate;
+        pushSnapshot(gameState);
         
         // 맵(그리드 레이어) 생성
         initDiceLayer();
@@ -179,10 +218,230 @@ function handleServerMessage(msg, deckDetails) {
         if(gameState.grid) syncGrid(gameState.grid);
         
     } else if (msg.type === 'STATE_UPDATE') {
-        // [상태 업데이트] 30Hz 등 주기적 수신
+        // [상태 업데이트] 30Hz 등 주기적 수신 (델타 모드에서는 keyframe)
+        if (msg.seq !== undefined) rememberState(msg.seq, msg);
         gameState = msg;
+        pushSnapshot(gameState);
         updateGameInfoUI();
         if(msg.grid) syncGrid(msg.grid);
+        
+    } else if (msg.type === 'GAME_OVER') {
+        // [게임 종료] 서버 세션은 잠시 후 정리됨
+        console.log("Game Over:", msg);
+        alert(`게임 오버! (Wave ${msg.wave})`);
+        
+    } else if (msg.type === 'PING') {
+        // [하트비트] 응답이 없으면 서버가 연결을 정리함
+        sendSocket({ type: "PONG", t: msg.t });
+        
+    } else if (msg.type === 'BIN_DICT') {
+        // [바이너리 프로토콜] 문자열 코드표 추가
+        Object.keys(msg.strings).forEach(code => { binDict[Number(code)] = msg.strings[code]; });
+        
+    } else if (msg.type === 'STATE_DELTA') {
+        // [델타 업데이트] base 프레임 기준으로 변경분만 수신
+        const base = stateHistory.get(msg.base);
+        if (!base) {
+            // 기준 프레임이 없음 -> 전체 상태 재요청
+            sendSocket({ type: "RESYNC" });
+            return;
+        }
+        const state = applyDelta(base, msg);
+        rememberState(msg.seq, state);
+        gameState = state;
+        pushSnapshot(gameState);
+        updateGameInfoUI();
+        syncGrid(state.grid);
+    }
+}
+
+// ----------------------------------------------------------------------
+// 스냅샷 보간
+// ----------------------------------------------------------------------
+function indexById(list) {
+    const map = new Map();
+    (list || []).forEach(obj => map.set(obj.id, obj));
+    return map;
+}
+
+// 예약형(analytic) 투사체: 서버는 x / y 대신 시작점(sx, sy, t0) ~ 명중점(ex, ey, t1)만 보내므로
+// 틱 기준 직선 보간으로 위치 계산 (homing 투사체는 서버 x / y 그대로)
+function isPlanned(p) {
+    return p.t1 !== undefined && p.t1 > p.t0;
+}
+
+function plannedPosition(p, tick) {
+    const a = Math.max(0, Math.min(1, (tick - p.t0) / (p.t1 - p.t0)));
+    return { x: p.sx + (p.ex - p.sx) * a, y: p.sy + (p.ey - p.sy) * a };
+}
+
+function placeProjectiles(list, tick) {
+    return list.map(p => isPlanned(p) ? { ...p, ...plannedPosition(p, tick) } : p);
+}
+
+function pushSnapshot(state) {
+    if (!state || state.server_time === undefined) return;
+    // 보간 전 기본 위치 = 프레임 시점 위치
+    (state.projectiles || []).forEach(p => { if (isPlanned(p)) Object.assign(p, plannedPosition(p, state.tick)); });
+    const last = snapshots[snapshots.length - 1];
+    if (last && state.server_time <= last.time) return; // 순서가 뒤바뀐 프레임 무시
+
+    // 가장 빨리 도착한 프레임 기준으로 시간 오프셋 추정 (늦게 온 프레임엔 천천히 따라감)
+    const offset = performance.now() / 1000 - state.server_time;
+    if (serverTimeOffset === null || offset < serverTimeOffset) serverTimeOffset = offset;
+    else serverTimeOffset += (offset - serverTimeOffset) * 0.01;
+
+    snapshots.push({ time: state.server_time, entities: indexById(state.entities), projectiles: indexById(state.projectiles) });
+    while (snapshots.length > SNAPSHOT_BUFFER_SIZE) snapshots.shift();
+}
+
+function lerpObjects(fromMap, toMap, alpha) {
+    const result = [];
+    toMap.forEach((to, id) => {
+        const from = fromMap.get(id);
+        if (!from) { result.push(to); return; }
+        result.push({ ...to, x: from.x + (to.x - from.x) * alpha, y: from.y + (to.y - from.y) * alpha });
+    });
+    return result;
+}
+
+// 현재 렌더링할 엔티티/투사체 (보간 지연 = 전송 간격 2개분)
+function getRenderState() {
+    if (!gameState) return null;
+    if (snapshots.length < 2 || serverTimeOffset === null) {
+        return { entities: gameState.entities || [], projectiles: gameState.projectiles || [] };
+    }
+    const renderTime = performance.now() / 1000 - serverTimeOffset - 2 / netRate;
+
+    let i = snapshots.length - 2;
+    while (i > 0 && snapshots[i].time > renderTime) i--;
+    const a = snapshots[i], b = snapshots[i + 1];
+    // 버퍼 범위를 벗어나면 외삽하지 않고 끝값 사용
+    const alpha = Math.max(0, Math.min(1, (renderTime - a.time) / (b.time - a.time)));
+
+    return {
+        entities: lerpObjects(a.entities, b.entities, alpha),
+        projectiles: placeProjectiles(lerpObjects(a.projectiles, b.projectiles, alpha), renderTime * simRate)
+    };
+}
+
+// ----------------------------------------------------------------------
+// 델타 프로토콜 유틸리티
+// ----------------------------------------------------------------------
+function rememberState(seq, state) {
+    stateHistory.set(seq, state);
+    // 오래된 기준 프레임 정리
+    while (stateHistory.size > STATE_HISTORY_SIZE) {
+        stateHistory.delete(stateHistory.keys().next().value);
+    }
+    // 받은 프레임을 서버에 알림 -> 다음 델타의 기준이 됨
+    sendSocket({ type: "ACK", seq: seq });
+}
+
+// id 배열(base) + {add, upd, rem} -> 새 배열 (base는 수정하지 않음)
+function applyListDelta(baseList, delta) {
+    const byId = new Map();
+    (baseList || []).forEach(obj => byId.set(obj.id, obj));
+    delta.rem.forEach(id => byId.delete(id));
+    delta.upd.forEach(changes => {
+        const prev = byId.get(changes.id);
+        byId.set(changes.id, prev ? { ...prev, ...changes } : changes);
+    });
+    delta.add.forEach(obj => byId.set(obj.id, obj));
+    return Array.from(byId.values());
+}
+
+function applyDelta(base, msg) {
+    const grid = (base.grid || []).slice();
+    Object.keys(msg.grid).forEach(idx => { grid[Number(idx)] = msg.grid[idx]; });
+    return {
+        type: 'STATE_UPDATE',
+        seq: msg.seq,
+        status: msg.status,
+        tick: msg.tick,
+        server_time: msg.server_time,
+        sp: msg.sp,
+        spawn_cost: msg.spawn_cost,
+        lives: msg.lives,
+        wave: msg.wave,
+        grid: grid,
+        entities: applyListDelta(base.entities, msg.entities),
+        projectiles: applyListDelta(base.projectiles, msg.projectiles)
+    };
+}
+
+// ----------------------------------------------------------------------
+// 바이너리 프레임 디코더 (서버 protocol/binary.py 레이아웃과 일치해야 함)
+// ----------------------------------------------------------------------
+function decodeBinaryFrame(buffer) {
+    const view = new DataView(buffer);
+    let o = 0;
+    const u8 = () => { const v = view.getUint8(o); o += 1; return v; };
+    const u16 = () => { const v = view.getUint16(o, true); o += 2; return v; };
+    const i16 = () => { const v = view.getInt16(o, true); o += 2; return v; };
+    const u32 = () => { const v = view.getUint32(o, true); o += 4; return v; };
+    const i32 = () => { const v = view.getInt32(o, true); o += 4; return v; };
+    const f32 = () => { const v = view.getFloat32(o, true); o += 4; return v; };
+
+    // HEADER
+    u8(); // kind
+    const state = { type: 'STATE_UPDATE' };
+    state.tick = u32();
+    state.server_time = view.getFloat64(o, true); o += 8;
+    state.sp = i32();
+    state.spawn_cost = u32();
+    state.lives = i16();
+    state.wave = u16();
+
+    // GRID
+    const gridCount = u8();
+    state.grid = [];
+    for (let i = 0; i < gridCount; i++) {
+        const code = u8(), level = u8(), targetId = u32();
+        state.grid.push(code === 255 ? null : { id: binDict[code], level: level, target_id: targetId || null });
+    }
+
+    // ENTITY_DEF / PROJ_DEF (처음 등장한 id만)
+    const entityDefCount = u16();
+    for (let i = 0; i < entityDefCount; i++) {
+        const id = u32();
+        entityDefs.set(id, { type: binDict[u8()], max_hp: f32(), radius: u16(), hitbox_radius: u16() });
+    }
+    const projDefCount = u16();
+    for (let i = 0; i < projDefCount; i++) {
+        const id = u32();
+        projectileDefs.set(id, { dice_id: binDict[u8()], target_id: u32() });
+    }
+
+    // ENTITIES / PROJECTILES
+    const liveEntities = new Set();
+    const entityCount = u16();
+    state.entities = [];
+    for (let i = 0; i < entityCount; i++) {
+        const id = u32();
+        liveEntities.add(id);
+        state.entities.push({ id: id, x: f32(), y: f32(), hp: f32(), ...entityDefs.get(id) });
+    }
+    const liveProjectiles = new Set();
+    const projCount = u16();
+    state.projectiles = [];
+    for (let i = 0; i < projCount; i++) {
+        const id = u32();
+        liveProjectiles.add(id);
+        const sx = f32(), sy = f32(), ex = f32(), ey = f32(), t0 = u32(), t1 = u32();
+        const p = t1 > t0 ? { sx: sx, sy: sy, ex: ex, ey: ey, t0: t0, t1: t1 } : { x: sx, y: sy };
+        state.projectiles.push({ id: id, ...p, ...projectileDefs.get(id) });
+    }
+
+    // 사라진 id의 정적 정보 정리
+    entityDefs.forEach((_, id) => { if (!liveEntities.has(id)) entityDefs.delete(id); });
+    projectileDefs.forEach((_, id) => { if (!liveProjectiles.has(id)) projectileDefs.delete(id); });
+    return state;
+}
+
+function sendSocket(payload) {
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(payload));
     }
 }
 
@@ -554,19 +813,22 @@ function gameLoop() {
         drawGrid(ctx, gameMap.grid);
     }
     
+    // 보간된 엔티티/투사체 위치
+    const view = getRenderState();
+    
     // 1. 타게팅 라인 그리기 (주사위 -> 몹)
-    if (gameState && gameState.grid) {
-        drawTargetLines(ctx, gameState.grid, gameState.entities);
+    if (gameState && gameState.grid && view) {
+        drawTargetLines(ctx, gameState.grid, view.entities);
     }
 
     // 2. 엔티티 그리기
-    if (gameState && gameState.entities) {
-        drawEntities(ctx, gameState.entities);
+    if (view) {
+        drawEntities(ctx, view.entities);
     }
     
     // 3. [NEW] 투사체 그리기
-    if (gameState && gameState.projectiles) {
-        drawProjectiles(ctx, gameState.projectiles);
+    if (view) {
+        drawProjectiles(ctx, view.projectiles);
     }
     
     animationFrameId = requestAnimationFrame(gameLoop);
@@ -645,8 +907,8 @@ function drawEntities(ctx, entities) {
 
         // --- 2. 본체 (Visual Body) ---
         ctx.beginPath();
-        // 타입별 색상 분기 가능
-        ctx.fillStyle = entity.type === 'normal_mob' ? '#ef4444' : '#64748b'; 
+        // 타입별 색상
+        ctx.fillStyle = ENTITY_COLORS[entity.type] || '#64748b'; 
         
         ctx.shadowColor = 'rgba(0, 0, 0, 0.5)';
         ctx.shadowBlur = 10;